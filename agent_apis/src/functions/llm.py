@@ -2,9 +2,10 @@ import os
 from dataclasses import dataclass
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.llm_client import create_chat_completion
+
 load_dotenv()
 
 
@@ -29,10 +30,6 @@ async def llm(function_input: FunctionInputParams) -> str:
             error_message = "RESTACK_API_KEY is not set"
             raise_exception(error_message)
 
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
-
         messages = []
         if function_input.system_content:
             messages.append(
@@ -40,7 +37,7 @@ async def llm(function_input: FunctionInputParams) -> str:
             )
         messages.append({"role": "user", "content": function_input.user_content})
 
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
             model=function_input.model or "gpt-4.1-mini", messages=messages
         )
         log.info("llm function completed", response=response)
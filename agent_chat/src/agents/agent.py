@@ -1,7 +1,13 @@
 from datetime import timedelta
 
 from pydantic import BaseModel
-from restack_ai.agent import NonRetryableError, agent, import_functions, log
+from restack_ai.agent import (
+    NonRetryableError,
+    agent,
+    agent_info,
+    import_functions,
+    log,
+)
 
 with import_functions():
     from src.functions.llm_chat import LlmChatInput, Message, llm_chat
@@ -20,19 +26,46 @@ class AgentChat:
     def __init__(self) -> None:
         self.end = False
         self.messages = []
+        # Number of messages llm_chat already holds in its conversation store.
+        self.history_length = 0
+
+    async def chat(self) -> dict[str, str]:
+        """Call llm_chat with only the messages it has not seen yet."""
+        try:
+            assistant_message = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages[self.history_length :],
+                    conversation_id=agent_info().run_id,
+                    history_length=self.history_length,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        except Exception:
+            if self.history_length == 0:
+                raise
+            # The worker serving this step may not have our history cached
+            # (restart or another replica), so resend it in full once.
+            log.warning("llm_chat failed with history delta, resending history")
+            assistant_message = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages,
+                    conversation_id=agent_info().run_id,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        self.history_length = len(self.messages)
+        return assistant_message
 
     @agent.event
     async def messages(self, messages_event: MessagesEvent) -> list[Message]:
         log.info(f"Received messages: {messages_event.messages}")
         self.messages.extend(messages_event.messages)
 
-        log.info(f"Calling llm_chat with messages: {self.messages}")
+        log.info(f"Calling llm_chat with {len(self.messages)} messages")
         try:
-            assistant_message = await agent.step(
-                function=llm_chat,
-                function_input=LlmChatInput(messages=self.messages),
-                start_to_close_timeout=timedelta(seconds=120),
-            )
+            assistant_message = await self.chat()
         except Exception as e:
             error_message = f"Error during llm_chat: {e}"
             raise NonRetryableError(error_message) from e
@@ -2,10 +2,13 @@ import os
 from typing import Literal
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.conversation_store import conversation_store
+from src.functions.utils.llm_client import create_chat_completion
+from src.functions.utils.response_cache import response_cache
+
 load_dotenv()
 
 
@@ -18,6 +21,10 @@ class LlmChatInput(BaseModel):
     system_content: str | None = None
     model: str | None = None
     messages: list[Message] | None = None
+    # When set, messages only holds what was added after the first
+    # history_length messages and the rest is read from the local store.
+    conversation_id: str | None = None
+    history_length: int = 0
 
 
 def raise_exception(message: str) -> None:
@@ -34,19 +41,25 @@ async def llm_chat(agent_input: LlmChatInput) -> dict[str, str]:
             error_message = "RESTACK_API_KEY is not set"
             raise_exception(error_message)
 
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
+        messages = [
+            message.model_dump(exclude_none=True)
+            for message in agent_input.messages or []
+        ]
+        if agent_input.conversation_id:
+            messages = conversation_store().extend(
+                agent_input.conversation_id, agent_input.history_length, messages
+            )
 
         if agent_input.system_content:
-            agent_input.messages.append(
-                {"role": "system", "content": agent_input.system_content}
-            )
+            messages.append({"role": "system", "content": agent_input.system_content})
 
-        assistant_raw_response = client.chat.completions.create(
-            model=agent_input.model or "gpt-4.1-mini",
-            messages=agent_input.messages,
-        )
+        request = {"model": agent_input.model or "gpt-4.1-mini", "messages": messages}
+        cache = response_cache()
+        if cache and (cached_response := cache.lookup(request)) is not None:
+            log.info("llm_chat cache hit", cache_stats=cache.stats())
+            return cached_response
+
+        assistant_raw_response = await create_chat_completion(**request)
     except Exception as e:
         error_message = f"LLM chat failed: {e}"
         raise NonRetryableError(error_message) from e
@@ -62,4 +75,6 @@ async def llm_chat(agent_input: LlmChatInput) -> dict[str, str]:
 
         log.info("assistant_response", assistant_response=assistant_response)
 
+        if cache:
+            cache.store(request, assistant_response)
         return assistant_response
@@ -0,0 +1,126 @@
+"""Content-addressed conversation log for llm_chat.
+
+Agents send only the messages added since their previous llm_chat call;
+the full history is materialised here from an in-process cache backed
+by a local SQLite file.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any
+
+CONVERSATION_STORE_PATH = os.getenv(
+    "CONVERSATION_STORE_PATH", ".conversations.sqlite3"
+)
+CONVERSATION_CACHE_SIZE = int(os.getenv("CONVERSATION_CACHE_SIZE", "256"))
+
+_store: "ConversationStore | None" = None
+
+
+class ConversationNotFoundError(LookupError):
+    """Raised when the local log is shorter than the agent's history."""
+
+
+def message_digest(message: dict[str, Any]) -> str:
+    body = json.dumps(message, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class ConversationStore:
+    def __init__(self, path: str, cache_size: int) -> None:
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages "
+            "(digest TEXT PRIMARY KEY, body TEXT NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS conversation_messages "
+            "(conversation_id TEXT NOT NULL, position INTEGER NOT NULL, "
+            "digest TEXT NOT NULL, PRIMARY KEY (conversation_id, position))"
+        )
+        self._cache: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+    def _load(self, conversation_id: str) -> list[dict[str, Any]]:
+        if conversation_id in self._cache:
+            self._cache.move_to_end(conversation_id)
+            return self._cache[conversation_id]
+
+        rows = self._connection.execute(
+            "SELECT m.body FROM conversation_messages c "
+            "JOIN messages m ON m.digest = c.digest "
+            "WHERE c.conversation_id = ? ORDER BY c.position",
+            (conversation_id,),
+        ).fetchall()
+        history = [json.loads(body) for (body,) in rows]
+        self._cache[conversation_id] = history
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return history
+
+    def extend(
+        self,
+        conversation_id: str,
+        history_length: int,
+        messages: list[dict[str, Any]],
+    ) -> list[dict[str, Any]]:
+        """Append messages after the first history_length entries.
+
+        Anything stored past history_length (e.g. from a retried call) is
+        replaced, so the operation is idempotent. Returns a copy of the
+        full history.
+        """
+        with self._lock:
+            history = self._load(conversation_id)
+            if len(history) < history_length:
+                error_message = (
+                    f"Conversation {conversation_id} has {len(history)} "
+                    f"cached messages, expected {history_length}"
+                )
+                raise ConversationNotFoundError(error_message)
+
+            rows = [
+                (message_digest(message), json.dumps(message))
+                for message in messages
+            ]
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._connection.execute(
+                    "DELETE FROM conversation_messages "
+                    "WHERE conversation_id = ? AND position >= ?",
+                    (conversation_id, history_length),
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO messages (digest, body) VALUES (?, ?)",
+                    rows,
+                )
+                self._connection.executemany(
+                    "INSERT INTO conversation_messages "
+                    "(conversation_id, position, digest) VALUES (?, ?, ?)",
+                    [
+                        (conversation_id, history_length + offset, digest)
+                        for offset, (digest, _) in enumerate(rows)
+                    ],
+                )
+
+            del history[history_length:]
+            history.extend(messages)
+            return list(history)
+
+
+def conversation_store() -> ConversationStore:
+    """Return the process-wide store, opening it on first use."""
+    global _store  # noqa: PLW0603
+    if _store is None:
+        _store = ConversationStore(
+            CONVERSATION_STORE_PATH, CONVERSATION_CACHE_SIZE
+        )
+    return _store
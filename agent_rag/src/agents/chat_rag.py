@@ -1,9 +1,11 @@
 from datetime import timedelta
+from typing import Any
 
 from pydantic import BaseModel
 from restack_ai.agent import (
     NonRetryableError,
     agent,
+    agent_info,
     import_functions,
     log,
 )
@@ -14,7 +16,7 @@ with import_functions():
         Message,
         llm_chat,
     )
-    from src.functions.lookup_sales import lookup_sales
+    from src.functions.lookup_sales import LookupSalesInput, lookup_sales
 
 
 class MessagesEvent(BaseModel):
@@ -30,29 +32,59 @@ class AgentRag:
     def __init__(self) -> None:
         self.end = False
         self.messages = []
+        # Number of messages llm_chat already holds in its conversation store.
+        self.history_length = 0
+
+    async def chat(self, **chat_input: Any) -> Any:
+        """Call llm_chat with only the messages it has not seen yet."""
+        try:
+            completion = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages[self.history_length :],
+                    conversation_id=agent_info().run_id,
+                    history_length=self.history_length,
+                    **chat_input,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        except Exception:
+            if self.history_length == 0:
+                raise
+            # The worker serving this step may not have our history cached
+            # (restart or another replica), so resend it in full once.
+            log.warning("llm_chat failed with history delta, resending history")
+            completion = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages,
+                    conversation_id=agent_info().run_id,
+                    **chat_input,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        self.history_length = len(self.messages)
+        return completion
 
     @agent.event
     async def messages(self, messages_event: MessagesEvent) -> list[Message]:
         log.info(f"Received messages: {messages_event.messages}")
         self.messages.extend(messages_event.messages)
+        query = self.messages[-1].content if self.messages else ""
         try:
             sales_info = await agent.step(
-                function=lookup_sales, start_to_close_timeout=timedelta(seconds=120)
+                function=lookup_sales,
+                function_input=LookupSalesInput(query=query),
+                start_to_close_timeout=timedelta(seconds=120),
             )
         except Exception as e:
             error_message = f"Error during lookup_sales: {e}"
             raise NonRetryableError(error_message) from e
         else:
-            system_content = f"You are a helpful assistant that can help with sales data. Here is the sales information: {sales_info}"
+            system_content = f"You are a helpful assistant that can help with sales data. Here are the sales items most relevant to the question: {sales_info}"
 
             try:
-                completion = await agent.step(
-                    function=llm_chat,
-                    function_input=LlmChatInput(
-                        messages=self.messages, system_content=system_content
-                    ),
-                    start_to_close_timeout=timedelta(seconds=120),
-                )
+                completion = await self.chat(system_content=system_content)
             except Exception as e:
                 error_message = f"Error during llm_chat: {e}"
                 raise NonRetryableError(error_message) from e
@@ -2,11 +2,13 @@ import os
 from typing import Literal
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from openai.types.chat.chat_completion import ChatCompletion
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.conversation_store import conversation_store
+from src.functions.utils.llm_client import create_chat_completion
+
 load_dotenv()
 
 
@@ -19,6 +21,10 @@ class LlmChatInput(BaseModel):
     system_content: str | None = None
     model: str | None = None
     messages: list[Message] | None = None
+    # When set, messages only holds what was added after the first
+    # history_length messages and the rest is read from the local store.
+    conversation_id: str | None = None
+    history_length: int = 0
 
 
 def raise_exception(message: str) -> None:
@@ -35,18 +41,25 @@ async def llm_chat(function_input: LlmChatInput) -> ChatCompletion:
             error_message = "RESTACK_API_KEY is not set"
             raise_exception(error_message)
 
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
+        messages = [
+            message.model_dump(exclude_none=True)
+            for message in function_input.messages or []
+        ]
+        if function_input.conversation_id:
+            messages = conversation_store().extend(
+                function_input.conversation_id,
+                function_input.history_length,
+                messages,
+            )
 
         if function_input.system_content:
-            function_input.messages.append(
-                Message(role="system", content=function_input.system_content or "")
+            messages.append(
+                {"role": "system", "content": function_input.system_content}
             )
 
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
             model=function_input.model or "gpt-4.1-mini",
-            messages=function_input.messages,
+            messages=messages,
         )
     except Exception as e:
         error_message = f"LLM chat failed: {e}"
@@ -1,6 +1,12 @@
+import json
+import os
+from pathlib import Path
+
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.sales_index import SalesIndex
+
 
 class SalesItem(BaseModel):
     item_id: int
@@ -11,76 +17,109 @@ class SalesItem(BaseModel):
     sale_discount_pct: int
 
 
+class LookupSalesInput(BaseModel):
+    query: str
+    k: int = 10
+
+
+SALES_INDEX_PATH = Path(os.getenv("SALES_INDEX_PATH", ".sales_index"))
+# Optional JSON lines file with one SalesItem per line, replaces the demo data.
+SALES_CATALOGUE_PATH = os.getenv("SALES_CATALOGUE_PATH")
+
+DEMO_CATALOGUE = [
+    SalesItem(
+        item_id=101,
+        type="snowboard",
+        name="Alpine Blade",
+        retail_price_usd=450,
+        sale_price_usd=360,
+        sale_discount_pct=20,
+    ),
+    SalesItem(
+        item_id=102,
+        type="snowboard",
+        name="Peak Bomber",
+        retail_price_usd=499,
+        sale_price_usd=374,
+        sale_discount_pct=25,
+    ),
+    SalesItem(
+        item_id=201,
+        type="apparel",
+        name="Thermal Jacket",
+        retail_price_usd=120,
+        sale_price_usd=84,
+        sale_discount_pct=30,
+    ),
+    SalesItem(
+        item_id=202,
+        type="apparel",
+        name="Insulated Pants",
+        retail_price_usd=150,
+        sale_price_usd=112,
+        sale_discount_pct=25,
+    ),
+    SalesItem(
+        item_id=301,
+        type="boots",
+        name="Glacier Grip",
+        retail_price_usd=250,
+        sale_price_usd=200,
+        sale_discount_pct=20,
+    ),
+    SalesItem(
+        item_id=302,
+        type="boots",
+        name="Summit Steps",
+        retail_price_usd=300,
+        sale_price_usd=210,
+        sale_discount_pct=30,
+    ),
+    SalesItem(
+        item_id=401,
+        type="accessories",
+        name="Goggles",
+        retail_price_usd=80,
+        sale_price_usd=60,
+        sale_discount_pct=25,
+    ),
+    SalesItem(
+        item_id=402,
+        type="accessories",
+        name="Warm Gloves",
+        retail_price_usd=60,
+        sale_price_usd=48,
+        sale_discount_pct=20,
+    ),
+]
+
+_index: SalesIndex | None = None
+
+
+def load_catalogue() -> list[SalesItem]:
+    if not SALES_CATALOGUE_PATH:
+        return DEMO_CATALOGUE
+    with Path(SALES_CATALOGUE_PATH).open() as file:
+        return [SalesItem(**json.loads(line)) for line in file if line.strip()]
+
+
+def sales_index() -> SalesIndex:
+    """Return the process-wide index, building it on first use."""
+    global _index  # noqa: PLW0603
+    if _index is None:
+        items = [item.model_dump() for item in load_catalogue()]
+        _index = SalesIndex.open(SALES_INDEX_PATH, items)
+    return _index
+
+
 @function.defn()
-async def lookup_sales() -> str:
+async def lookup_sales(function_input: LookupSalesInput) -> str:
     try:
-        log.info("lookup_sales function started")
+        log.info("lookup_sales function started", function_input=function_input)
 
         items = [
-            SalesItem(
-                item_id=101,
-                type="snowboard",
-                name="Alpine Blade",
-                retail_price_usd=450,
-                sale_price_usd=360,
-                sale_discount_pct=20,
-            ),
-            SalesItem(
-                item_id=102,
-                type="snowboard",
-                name="Peak Bomber",
-                retail_price_usd=499,
-                sale_price_usd=374,
-                sale_discount_pct=25,
-            ),
-            SalesItem(
-                item_id=201,
-                type="apparel",
-                name="Thermal Jacket",
-                retail_price_usd=120,
-                sale_price_usd=84,
-                sale_discount_pct=30,
-            ),
-            SalesItem(
-                item_id=202,
-                type="apparel",
-                name="Insulated Pants",
-                retail_price_usd=150,
-                sale_price_usd=112,
-                sale_discount_pct=25,
-            ),
-            SalesItem(
-                item_id=301,
-                type="boots",
-                name="Glacier Grip",
-                retail_price_usd=250,
-                sale_price_usd=200,
-                sale_discount_pct=20,
-            ),
-            SalesItem(
-                item_id=302,
-                type="boots",
-                name="Summit Steps",
-                retail_price_usd=300,
-                sale_price_usd=210,
-                sale_discount_pct=30,
-            ),
-            SalesItem(
-                item_id=401,
-                type="accessories",
-                name="Goggles",
-                retail_price_usd=80,
-                sale_price_usd=60,
-                sale_discount_pct=25,
-            ),
-            SalesItem(
-                item_id=402,
-                type="accessories",
-                name="Warm Gloves",
-                retail_price_usd=60,
-                sale_price_usd=48,
-                sale_discount_pct=20,
-            ),
+            SalesItem(**record)
+            for record in sales_index().search(function_input.query, function_input.k)
         ]
 
         return str(items)
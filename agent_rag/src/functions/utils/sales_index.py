@@ -0,0 +1,174 @@
+"""Hybrid BM25 + embedding index over sales items.
+
+The index is built once per catalogue and persisted as ``.npy`` files
+that are memory-mapped on load, so every worker process shares the same
+pages and start-up after the first build is close to free.
+
+Embeddings are hashed word and character-trigram vectors computed
+locally with NumPy; they need no model download or API call and catch
+near matches (plurals, typos, partial names) that BM25 misses.
+"""
+
+import hashlib
+import json
+import re
+import zlib
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+EMBEDDING_DIM = 256
+# Hashed vocabulary size for the BM25 postings.
+VOCABULARY_SIZE = 1 << 18
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Weight of the BM25 score in the hybrid score, the rest is cosine.
+BM25_WEIGHT = 0.6
+
+RECORD_DTYPE = np.dtype(
+    [
+        ("item_id", np.int64),
+        ("type", "U32"),
+        ("name", "U128"),
+        ("retail_price_usd", np.float64),
+        ("sale_price_usd", np.float64),
+        ("sale_discount_pct", np.int64),
+    ]
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _bucket(feature: str, size: int) -> int:
+    return zlib.crc32(feature.encode()) % size
+
+
+def _document(item: dict[str, Any]) -> str:
+    return f"{item['type']} {item['name']}"
+
+
+def embed(text: str) -> np.ndarray:
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for token in _tokens(text):
+        vector[_bucket(token, EMBEDDING_DIM)] += 1.0
+        padded = f"#{token}#"
+        for start in range(len(padded) - 2):
+            vector[_bucket(padded[start : start + 3], EMBEDDING_DIM)] += 0.5
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def catalogue_digest(items: list[dict[str, Any]]) -> str:
+    body = json.dumps(items, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+class SalesIndex:
+    def __init__(self, path: Path) -> None:
+        def load(name: str) -> np.ndarray:
+            return np.load(path / f"{name}.npy", mmap_mode="r")
+
+        self.records = load("records")
+        self.embeddings = load("embeddings")
+        self.indptr = load("indptr")
+        self.postings = load("postings")
+        self.frequencies = load("frequencies")
+        self.idf = load("idf")
+        self.length_norm = load("length_norm")
+
+    @classmethod
+    def open(cls, path: Path, items: list[dict[str, Any]]) -> "SalesIndex":
+        """Load the index at path, rebuilding it if the catalogue changed."""
+        digest = catalogue_digest(items)
+        digest_file = path / "catalogue.sha256"
+        if not digest_file.exists() or digest_file.read_text() != digest:
+            cls.build(path, items)
+            digest_file.write_text(digest)
+        return cls(path)
+
+    @staticmethod
+    def build(path: Path, items: list[dict[str, Any]]) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        records = np.array(
+            [tuple(item[field] for field in RECORD_DTYPE.names) for item in items],
+            dtype=RECORD_DTYPE,
+        )
+        embeddings = np.zeros((len(items), EMBEDDING_DIM), dtype=np.float32)
+        terms, docs, counts = [], [], []
+        lengths = np.zeros(len(items), dtype=np.float32)
+        for doc_id, item in enumerate(items):
+            text = _document(item)
+            embeddings[doc_id] = embed(text)
+            tokens = _tokens(text)
+            lengths[doc_id] = len(tokens)
+            buckets, frequency = np.unique(
+                [_bucket(token, VOCABULARY_SIZE) for token in tokens],
+                return_counts=True,
+            )
+            terms.extend(buckets.tolist())
+            docs.extend([doc_id] * len(buckets))
+            counts.extend(frequency.tolist())
+
+        terms = np.asarray(terms, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+        document_frequency = np.bincount(terms, minlength=VOCABULARY_SIZE)
+        indptr = np.concatenate(([0], np.cumsum(document_frequency)))
+        idf = np.log1p(
+            (len(items) - document_frequency + 0.5) / (document_frequency + 0.5)
+        ).astype(np.float32)
+        average_length = lengths.mean() if len(items) else 1.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+
+        arrays = {
+            "records": records,
+            "embeddings": embeddings,
+            "indptr": indptr.astype(np.int64),
+            "postings": np.asarray(docs, dtype=np.int64)[order],
+            "frequencies": np.asarray(counts, dtype=np.float32)[order],
+            "idf": idf,
+            "length_norm": length_norm.astype(np.float32),
+        }
+        for name, array in arrays.items():
+            np.save(path / f"{name}.npy", array)
+
+    def _bm25(self, query: str) -> np.ndarray:
+        scores = np.zeros(len(self.records), dtype=np.float32)
+        for term in {_bucket(token, VOCABULARY_SIZE) for token in _tokens(query)}:
+            start, end = self.indptr[term], self.indptr[term + 1]
+            if start == end:
+                continue
+            docs = self.postings[start:end]
+            frequency = self.frequencies[start:end]
+            scores[docs] += (
+                self.idf[term]
+                * frequency
+                * (BM25_K1 + 1)
+                / (frequency + self.length_norm[docs])
+            )
+        return scores
+
+    def search(self, query: str, k: int = 10) -> list[dict[str, Any]]:
+        """Return the k records that best match query, best first."""
+        if not len(self.records):
+            return []
+        bm25 = self._bm25(query)
+        if bm25.max() > 0:
+            bm25 /= bm25.max()
+        cosine = self.embeddings @ embed(query)
+        scores = BM25_WEIGHT * bm25 + (1 - BM25_WEIGHT) * cosine
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        results = []
+        for row in top:
+            record = self.records[row]
+            results.append(
+                {field: record[field].item() for field in RECORD_DTYPE.names}
+            )
+        return results
@@ -8,10 +8,12 @@ from watchfiles import run_process
 from src.agents.chat_rag import AgentRag
 from src.client import client
 from src.functions.llm_chat import llm_chat
-from src.functions.lookup_sales import lookup_sales
+from src.functions.lookup_sales import lookup_sales, sales_index
 
 
 async def main() -> None:
+    # Build or map the retrieval index once, before taking any work
+    sales_index()
     await client.start_service(agents=[AgentRag], functions=[lookup_sales, llm_chat])
 
 
@@ -1,11 +1,10 @@
-import os
 from typing import TYPE_CHECKING, Literal
 
-from openai import OpenAI
 from pydantic import BaseModel, Field
 from restack_ai.function import NonRetryableError, function, stream_to_websocket
 
 from src.client import api_address
+from src.functions.utils.llm_client import llm_client
 
 if TYPE_CHECKING:
     from openai.resources.chat.completions import ChatCompletionChunk, Stream
@@ -26,10 +25,6 @@ class LlmChatInput(BaseModel):
 @function.defn()
 async def llm_chat(function_input: LlmChatInput) -> str:
     try:
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
-
         if function_input.system_content:
             # Insert the system message at the beginning
             function_input.messages.insert(
@@ -39,7 +34,7 @@ async def llm_chat(function_input: LlmChatInput) -> str:
         # Convert Message objects to dictionaries
         messages_dicts = [message.model_dump() for message in function_input.messages]
         # Get the streamed response from OpenAI API
-        response: Stream[ChatCompletionChunk] = client.chat.completions.create(
+        response: Stream[ChatCompletionChunk] = llm_client().chat.completions.create(
             model=function_input.model or "gpt-4.1-mini",
             messages=messages_dicts,
             stream=True,
@@ -0,0 +1,85 @@
+"""Shared, pooled OpenAI-compatible client for Restack AI."""
+
+import asyncio
+import os
+from typing import Any
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, OpenAI
+
+load_dotenv()
+
+RESTACK_AI_BASE_URL = "https://ai.restack.io"
+
+# Pool size for the process-wide HTTP client. With HTTP/2 several
+# completions are multiplexed over each kept-alive connection.
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")
+)
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+# Maximum number of in-flight completions per upstream host.
+LLM_MAX_CONCURRENCY_PER_HOST = int(
+    os.getenv("LLM_MAX_CONCURRENCY_PER_HOST", "256")
+)
+
+_async_client: AsyncOpenAI | None = None
+_sync_client: OpenAI | None = None
+_host_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def async_llm_client() -> AsyncOpenAI:
+    """Return the process-wide async client, creating it on first use."""
+    global _async_client  # noqa: PLW0603
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            base_url=RESTACK_AI_BASE_URL,
+            api_key=os.environ.get("RESTACK_API_KEY"),
+            http_client=httpx.AsyncClient(http2=True, limits=_limits()),
+        )
+    return _async_client
+
+
+def llm_client() -> OpenAI:
+    """Return the process-wide sync client, creating it on first use.
+
+    Only meant for callers that must hand a synchronous stream to
+    ``stream_to_websocket``.
+    """
+    global _sync_client  # noqa: PLW0603
+    if _sync_client is None:
+        _sync_client = OpenAI(
+            base_url=RESTACK_AI_BASE_URL,
+            api_key=os.environ.get("RESTACK_API_KEY"),
+            http_client=httpx.Client(http2=True, limits=_limits()),
+        )
+    return _sync_client
+
+
+def _host_semaphore(client: AsyncOpenAI) -> asyncio.Semaphore:
+    host = client.base_url.host
+    if host not in _host_semaphores:
+        _host_semaphores[host] = asyncio.Semaphore(
+            LLM_MAX_CONCURRENCY_PER_HOST
+        )
+    return _host_semaphores[host]
+
+
+async def create_chat_completion(**kwargs: Any) -> Any:
+    """Create a chat completion on the shared client.
+
+    Calls are bounded by ``LLM_MAX_CONCURRENCY_PER_HOST`` so a busy
+    worker queues requests instead of overwhelming the upstream host.
+    """
+    client = async_llm_client()
+    async with _host_semaphore(client):
+        return await client.chat.completions.create(**kwargs)
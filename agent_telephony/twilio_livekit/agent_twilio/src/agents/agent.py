@@ -1,5 +1,5 @@
+import math
 from datetime import timedelta
-from typing import Any
 
 from pydantic import BaseModel
 from restack_ai.agent import (
@@ -19,16 +19,9 @@ with import_functions():
         LivekitCallInput,
         livekit_call,
     )
-    from src.functions.livekit_create_room import (
-        livekit_create_room,
-    )
     from src.functions.livekit_delete_room import (
         livekit_delete_room,
     )
-    from src.functions.livekit_dispatch import (
-        LivekitDispatchInput,
-        livekit_dispatch,
-    )
     from src.functions.livekit_outbound_trunk import (
         livekit_outbound_trunk,
     )
@@ -37,30 +30,35 @@ with import_functions():
         SendDataResponse,
         livekit_send_data,
     )
-    from src.functions.livekit_start_recording import (
-        EgressInfo,
-        LivekitStartRecordingInput,
-        livekit_start_recording,
-    )
-    from src.functions.livekit_token import (
-        LivekitTokenInput,
-        livekit_token,
+    from src.functions.livekit_setup_room import (
+        livekit_setup_room,
     )
     from src.functions.llm_talk import (
         LlmTalkInput,
         Message,
         llm_talk,
     )
+    from src.functions.llm_talk_speculate import (
+        llm_talk_speculate,
+    )
     from src.functions.send_agent_event import (
         SendAgentEventInput,
         send_agent_event,
     )
 
+# llm_talk keeps itself to its first-token SLO (streaming a filler phrase
+# if needed), so this only bounds the length of a whole reply.
+LLM_TALK_TIMEOUT = timedelta(seconds=15)
+
 
 class MessagesEvent(BaseModel):
     messages: list[Message]
 
 
+class SpeculateEvent(BaseModel):
+    transcript: str
+
+
 class EndEvent(BaseModel):
     end: bool
 
@@ -73,9 +71,39 @@ class ContextEvent(BaseModel):
     context: str
 
 
+class StageLatency(BaseModel):
+    count: int
+    p50: float
+    p95: float
+    p99: float
+    max: float
+    mean: float
+    # [latency_ms, count] buckets of the window's histogram.
+    histogram: list[tuple[float, int]]
+
+
 class PipelineMetricsEvent(BaseModel):
-    metrics: Any
-    latencies: str
+    window_seconds: float
+    stages: dict[str, StageLatency]
+
+
+def latency_percentiles(
+    histogram: dict[float, int], maximum: float
+) -> dict[str, float]:
+    """p50/p95/p99 and max of a merged latency histogram."""
+    count = sum(histogram.values())
+    percentiles: dict[str, float] = {"count": count}
+    for percentile in (50, 95, 99):
+        rank = max(math.ceil(percentile / 100 * count), 1)
+        seen = 0
+        for latency, bucket_count in sorted(histogram.items()):
+            seen += bucket_count
+            if seen >= rank:
+                percentiles[f"p{percentile}"] = latency
+                break
+    percentiles["max"] = maximum
+    return percentiles
+
 
 class AgentTwilioInput(BaseModel):
     phone_number: str | None = None
@@ -94,6 +122,9 @@ class AgentTwilio:
         self.messages = []
         self.context = ""
         self.room_id = ""
+        # Per stage, the call's latency histogram and maximum in ms.
+        self.latency_histograms: dict[str, dict[float, int]] = {}
+        self.latency_max: dict[str, float] = {}
 
     @agent.event
     async def messages(
@@ -116,11 +147,11 @@ class AgentTwilio:
             fast_response = await agent.step(
                 function=llm_talk,
                 function_input=LlmTalkInput(
-                    messages=self.messages[-3:],
+                    messages=self.messages,
                     context=str(self.context),
                     mode="default",
                 ),
-                start_to_close_timeout=timedelta(seconds=3),
+                start_to_close_timeout=LLM_TALK_TIMEOUT,
                 retry_policy=RetryPolicy(
                     initial_interval=timedelta(seconds=1),
                     maximum_attempts=1,
@@ -136,6 +167,37 @@ class AgentTwilio:
             error_message = f"Error during messages: {e}"
             raise NonRetryableError(error_message) from e
 
+    @agent.event
+    async def speculate(
+        self, speculate_event: SpeculateEvent
+    ) -> str:
+        """Pre-generate the reply to the user's unfinished turn.
+
+        Sent by the pipeline with the partial transcript when the user
+        pauses; messages then streams the reply at once if the
+        committed turn has the same words.
+        """
+        log.info("Received speculate")
+        return await agent.step(
+            function=llm_talk_speculate,
+            function_input=LlmTalkInput(
+                # What llm_talk will get if the turn is committed with
+                # these words; both fit it to LLM_TALK_MAX_TOKENS.
+                messages=[
+                    *self.messages,
+                    Message(
+                        role="user",
+                        content=speculate_event.transcript,
+                    ),
+                ],
+                context=str(self.context),
+                mode="default",
+                stream=False,
+            ),
+            start_to_close_timeout=LLM_TALK_TIMEOUT,
+            retry_policy=RetryPolicy(maximum_attempts=1),
+        )
+
     @agent.event
     async def call(self, call_input: CallInput) -> None:
         log.info("Call", call_input=call_input)
@@ -197,36 +259,40 @@ class AgentTwilio:
     @agent.event
     async def pipeline_metrics(
         self, pipeline_metrics: PipelineMetricsEvent
-    ) -> PipelineMetricsEvent:
+    ) -> dict[str, dict[str, float]]:
+        """Merge a window of pipeline latencies into the call's."""
         log.info(
             "Received pipeline metrics",
-            pipeline_metrics=pipeline_metrics,
+            window_seconds=pipeline_metrics.window_seconds,
+            stages={
+                stage: latency.model_dump(exclude={"histogram"})
+                for stage, latency in pipeline_metrics.stages.items()
+            },
         )
-        return pipeline_metrics
+        for stage, latency in pipeline_metrics.stages.items():
+            histogram = self.latency_histograms.setdefault(stage, {})
+            for value, count in latency.histogram:
+                histogram[value] = histogram.get(value, 0) + count
+            self.latency_max[stage] = max(
+                self.latency_max.get(stage, 0.0), latency.max
+            )
+        return self.pipeline_latency()
+
+    @agent.state
+    def pipeline_latency(self) -> dict[str, dict[str, float]]:
+        """Latency percentiles per pipeline stage so far in the call."""
+        return {
+            stage: latency_percentiles(
+                histogram, self.latency_max[stage]
+            )
+            for stage, histogram in self.latency_histograms.items()
+        }
 
     @agent.run
     async def run(self, agent_input: AgentTwilioInput) -> AgentTwilioOutput:
         try:
-            room = await agent.step(function=livekit_create_room)
-            self.room_id = room.name
-            await agent.step(
-                function=livekit_token,
-                function_input=LivekitTokenInput(
-                    room_id=self.room_id
-                ),
-            )
-            recording: EgressInfo = await agent.step(
-                function=livekit_start_recording,
-                function_input=LivekitStartRecordingInput(
-                    room_id=self.room_id
-                ),
-            )
-            await agent.step(
-                function=livekit_dispatch,
-                function_input=LivekitDispatchInput(
-                    room_id=self.room_id
-                ),
-            )
+            room = await agent.step(function=livekit_setup_room)
+            self.room_id = room.room_id
 
             if agent_input.phone_number:
                 
@@ -251,10 +317,8 @@ class AgentTwilio:
         else:
             await agent.condition(lambda: self.end)
 
-            recording_url = f"https://storage.googleapis.com/{recording.room_composite.file_outputs[0].gcp.bucket}/{recording.room_composite.file_outputs[0].filepath}"
-
             return AgentTwilioOutput(
-                recording_url=recording_url,
+                recording_url=room.recording_url,
                 livekit_room_id=self.room_id,
                 messages=self.messages,
                 context=self.context,
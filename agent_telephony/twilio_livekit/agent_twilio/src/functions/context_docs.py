@@ -1,28 +1,21 @@
-import aiohttp
+from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.docs_index import cached_docs, docs_index
 
-async def fetch_content_from_url(url: str) -> str:
-    async with (
-        aiohttp.ClientSession() as session,
-        session.get(url) as response,
-    ):
-        if response.status == 200:
-            return await response.text()
-        error_message = (
-            f"Failed to fetch content: {response.status}"
-        )
-        raise NonRetryableError(error_message)
+
+class ContextDocsSearchInput(BaseModel):
+    query: str
+    k: int = 5
 
 
 @function.defn()
 async def context_docs() -> str:
     try:
-        docs_content = await fetch_content_from_url(
-            "https://docs.restack.io/llms-full.txt"
-        )
+        await docs_index()
+        docs_content = cached_docs()
         log.info(
-            "Fetched content from URL", content=len(docs_content)
+            "Loaded docs content", content=len(docs_content)
         )
 
         return docs_content
@@ -30,3 +23,23 @@ async def context_docs() -> str:
     except Exception as e:
         error_message = f"context_docs function failed: {e}"
         raise NonRetryableError(error_message) from e
+
+
+@function.defn()
+async def context_docs_search(
+    function_input: ContextDocsSearchInput,
+) -> str:
+    try:
+        index = await docs_index()
+        passages = index.search(function_input.query, function_input.k)
+        log.info(
+            "Found docs passages",
+            passages=len(passages),
+            content=sum(len(passage) for passage in passages),
+        )
+
+        return "\n\n---\n\n".join(passages)
+
+    except Exception as e:
+        error_message = f"context_docs_search function failed: {e}"
+        raise NonRetryableError(error_message) from e
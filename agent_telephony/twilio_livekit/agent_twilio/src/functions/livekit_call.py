@@ -1,12 +1,13 @@
 from dataclasses import dataclass
 
-from livekit import api
 from livekit.protocol.sip import (
     CreateSIPParticipantRequest,
     SIPParticipantInfo,
 )
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.livekit_client import livekit_api
+
 
 @dataclass
 class LivekitCallInput:
@@ -23,8 +24,6 @@ async def livekit_call(
     function_input: LivekitCallInput,
 ) -> SIPParticipantInfo:
     try:
-        livekit_api = api.LiveKitAPI()
-
         request = CreateSIPParticipantRequest(
             sip_trunk_id=function_input.sip_trunk_id,
             sip_call_to=function_input.phone_number,
@@ -40,11 +39,9 @@ async def livekit_call(
         )
 
         participant = (
-            await livekit_api.sip.create_sip_participant(request)
+            await livekit_api().sip.create_sip_participant(request)
         )
 
-        await livekit_api.aclose()
-
         log.info(
             "livekit_call SIPParticipantInfo:",
             participant=participant,
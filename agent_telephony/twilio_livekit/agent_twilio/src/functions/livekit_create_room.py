@@ -1,6 +1,3 @@
-import os
-
-from livekit import api
 from livekit.api import CreateRoomRequest, Room
 from restack_ai.function import (
     NonRetryableError,
@@ -8,27 +5,25 @@ from restack_ai.function import (
     function_info,
 )
 
+from src.functions.utils.livekit_client import livekit_api
+
+
+async def create_room(room_id: str) -> Room:
+    return await livekit_api().room.create_room(
+        CreateRoomRequest(
+            name=room_id,
+            empty_timeout=10 * 60,
+            max_participants=20,
+        )
+    )
+
 
 @function.defn()
 async def livekit_create_room() -> Room:
     try:
-        lkapi = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_API_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET"),
-        )
-
         run_id = function_info().workflow_run_id
 
-        room = await lkapi.room.create_room(
-            CreateRoomRequest(
-                name=run_id,
-                empty_timeout=10 * 60,
-                max_participants=20,
-            )
-        )
-
-        await lkapi.aclose()
+        room = await create_room(run_id)
 
     except Exception as e:
         error_message = (
@@ -1,6 +1,3 @@
-import os
-
-from livekit import api
 from livekit.api import DeleteRoomRequest, DeleteRoomResponse
 from restack_ai.function import (
     NonRetryableError,
@@ -8,24 +5,18 @@ from restack_ai.function import (
     function_info,
 )
 
+from src.functions.utils.livekit_client import livekit_api
+
 
 @function.defn()
 async def livekit_delete_room() -> DeleteRoomResponse:
     try:
-        lkapi = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_API_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET"),
-        )
-
         run_id = function_info().workflow_run_id
 
-        deleted_room = await lkapi.room.delete_room(
+        deleted_room = await livekit_api().room.delete_room(
             DeleteRoomRequest(room=run_id)
         )
 
-        await lkapi.aclose()
-
     except Exception as e:
         error_message = (
             f"livekit_delete_room function failed: {e}"
@@ -1,4 +1,3 @@
-import os
 from dataclasses import dataclass
 
 from livekit import api
@@ -9,44 +8,40 @@ from restack_ai.function import (
     function_info,
 )
 
+from src.functions.utils.livekit_client import livekit_api
+
 
 @dataclass
 class LivekitDispatchInput:
     room_id: str | None = None
 
 
+async def create_dispatch(room_id: str | None = None) -> AgentDispatch:
+    agent_name = function_info().workflow_type
+    agent_id = function_info().workflow_id
+    run_id = function_info().workflow_run_id
+
+    metadata = {
+        "agent_name": agent_name,
+        "agent_id": agent_id,
+        "run_id": run_id,
+    }
+
+    return await livekit_api().agent_dispatch.create_dispatch(
+        api.CreateAgentDispatchRequest(
+            agent_name=agent_name,
+            room=room_id or run_id,
+            metadata=str(metadata),
+        )
+    )
+
+
 @function.defn()
 async def livekit_dispatch(
     function_input: LivekitDispatchInput,
 ) -> AgentDispatch:
     try:
-        lkapi = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_API_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET"),
-        )
-
-        agent_name = function_info().workflow_type
-        agent_id = function_info().workflow_id
-        run_id = function_info().workflow_run_id
-
-        metadata = {
-            "agent_name": agent_name,
-            "agent_id": agent_id,
-            "run_id": run_id,
-        }
-
-        room = function_input.room_id or run_id
-
-        dispatch = await lkapi.agent_dispatch.create_dispatch(
-            api.CreateAgentDispatchRequest(
-                agent_name=agent_name,
-                room=room,
-                metadata=str(metadata),
-            )
-        )
-
-        await lkapi.aclose()
+        dispatch = await create_dispatch(function_input.room_id)
 
     except Exception as e:
         error_message = f"livekit_dispatch function failed: {e}"
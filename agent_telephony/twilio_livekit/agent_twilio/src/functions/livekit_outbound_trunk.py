@@ -1,6 +1,5 @@
 import os
 
-from livekit import api
 from livekit.protocol.sip import (
     CreateSIPOutboundTrunkRequest,
     ListSIPOutboundTrunkRequest,
@@ -13,15 +12,16 @@ from restack_ai.function import (
     log,
 )
 
+from src.functions.utils.livekit_client import livekit_api
+
 
 @function.defn()
 async def livekit_outbound_trunk() -> str:
     try:
-        livekit_api = api.LiveKitAPI()
         run_id = function_info().workflow_run_id
 
         existing_trunk = (
-            await livekit_api.sip.list_sip_outbound_trunk(
+            await livekit_api().sip.list_sip_outbound_trunk(
                 list=ListSIPOutboundTrunkRequest(
                     trunk_ids=[str(run_id)]
                 )
@@ -47,7 +47,7 @@ async def livekit_outbound_trunk() -> str:
 
         request = CreateSIPOutboundTrunkRequest(trunk=trunk)
 
-        trunk = await livekit_api.sip.create_sip_outbound_trunk(
+        trunk = await livekit_api().sip.create_sip_outbound_trunk(
             request
         )
 
@@ -56,8 +56,6 @@ async def livekit_outbound_trunk() -> str:
             trunk=trunk,
         )
 
-        await livekit_api.aclose()
-
     except Exception as e:  # Consider catching a more specific exception if possible
         error_message = (
             f"livekit_outbound_trunk function failed: {e}"
@@ -0,0 +1,62 @@
+import asyncio
+
+from pydantic import BaseModel
+from restack_ai.function import (
+    NonRetryableError,
+    function,
+    function_info,
+    log,
+)
+
+from src.functions.livekit_create_room import create_room
+from src.functions.livekit_dispatch import create_dispatch
+from src.functions.livekit_start_recording import (
+    recording_url,
+    start_room_recording,
+)
+from src.functions.utils.livekit_client import room_token
+
+
+class LivekitSetupRoomOutput(BaseModel):
+    room_id: str
+    token: str
+    recording_url: str
+    dispatch_id: str
+
+
+@function.defn()
+async def livekit_setup_room() -> LivekitSetupRoomOutput:
+    """Create the call's room, then record it and dispatch the agent.
+
+    Does the work of livekit_create_room, livekit_token,
+    livekit_start_recording and livekit_dispatch in one step, with the
+    recording and dispatch requests sent concurrently.
+    """
+    try:
+        run_id = function_info().workflow_run_id
+
+        room = await create_room(run_id)
+        recording, dispatch = await asyncio.gather(
+            start_room_recording(room.name),
+            create_dispatch(room.name),
+        )
+        token = room_token(room.name)
+
+        log.info(
+            "livekit_setup_room room ready",
+            room_id=room.name,
+            egress_id=recording.egress_id,
+            dispatch_id=dispatch.id,
+        )
+
+    except Exception as e:
+        error_message = f"livekit_setup_room function failed: {e}"
+        raise NonRetryableError(error_message) from e
+
+    else:
+        return LivekitSetupRoomOutput(
+            room_id=room.name,
+            token=token,
+            recording_url=recording_url(recording),
+            dispatch_id=dispatch.id,
+        )
@@ -9,49 +9,52 @@ from livekit.api import (
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.livekit_client import livekit_api
+
 
 class LivekitStartRecordingInput(BaseModel):
     room_id: str
 
 
+async def start_room_recording(room_id: str) -> EgressInfo:
+    if os.getenv("GCP_CREDENTIALS") is None:
+        raise NonRetryableError(
+            message="GCP_CREDENTIALS is not set"
+        )
+
+    credentials = os.getenv("GCP_CREDENTIALS")
+    log.info("GCP_CREDENTIALS", credentials=credentials)
+
+    return await livekit_api().egress.start_room_composite_egress(
+        RoomCompositeEgressRequest(
+            room_name=room_id,
+            layout="grid",
+            audio_only=True,
+            file_outputs=[
+                api.EncodedFileOutput(
+                    file_type=EncodedFileType.MP4,
+                    filepath=f"{room_id}-audio.mp4",
+                    gcp=api.GCPUpload(
+                        credentials=credentials,
+                        bucket="livekit-local-recordings",
+                    ),
+                )
+            ],
+        )
+    )
+
+
+def recording_url(recording: EgressInfo) -> str:
+    file_output = recording.room_composite.file_outputs[0]
+    return f"https://storage.googleapis.com/{file_output.gcp.bucket}/{file_output.filepath}"
+
+
 @function.defn()
 async def livekit_start_recording(
     function_input: LivekitStartRecordingInput,
 ) -> EgressInfo:
     try:
-        if os.getenv("GCP_CREDENTIALS") is None:
-            raise NonRetryableError(
-                message="GCP_CREDENTIALS is not set"
-            )
-
-        credentials = os.getenv("GCP_CREDENTIALS")
-        log.info("GCP_CREDENTIALS", credentials=credentials)
-
-        lkapi = api.LiveKitAPI(
-            url=os.getenv("LIVEKIT_API_URL"),
-            api_key=os.getenv("LIVEKIT_API_KEY"),
-            api_secret=os.getenv("LIVEKIT_API_SECRET"),
-        )
-
-        recording = await lkapi.egress.start_room_composite_egress(
-            RoomCompositeEgressRequest(
-                room_name=function_input.room_id,
-                layout="grid",
-                audio_only=True,
-                file_outputs=[
-                    api.EncodedFileOutput(
-                        file_type=EncodedFileType.MP4,
-                        filepath=f"{function_input.room_id}-audio.mp4",
-                        gcp=api.GCPUpload(
-                            credentials=credentials,
-                            bucket="livekit-local-recordings",
-                        ),
-                    )
-                ],
-            )
-        )
-
-        await lkapi.aclose()
+        recording = await start_room_recording(function_input.room_id)
 
     except Exception as e:
         error_message = (
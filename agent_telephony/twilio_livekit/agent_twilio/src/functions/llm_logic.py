@@ -1,10 +1,15 @@
 import os
-from typing import Literal
+from typing import Any, Literal
 
-from openai import OpenAI
+from openai import AsyncOpenAI
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function
 
+from src.functions.utils.context_window import (
+    ContextWindow,
+    summary_messages,
+)
+
 class Message(BaseModel):
     role: str
     content: str
@@ -22,12 +27,24 @@ class LlmLogicInput(BaseModel):
     documentation: str
 
 
+LLM_LOGIC_MAX_TOKENS = int(os.getenv("LLM_LOGIC_MAX_TOKENS", "32000"))
+
+
 @function.defn()
 async def llm_logic(
     function_input: LlmLogicInput,
 ) -> LlmLogicResponse:
     try:
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+
+        async def summarize(
+            summary: str | None, messages: list[dict[str, Any]]
+        ) -> str:
+            response = await client.chat.completions.create(
+                model="gpt-4o-mini",
+                messages=summary_messages(summary, messages),
+            )
+            return response.choices[0].message.content or ""
 
         user_messages = [msg for msg in function_input.messages if msg.role == "user"]
         if len(user_messages) == 1:
@@ -35,9 +52,8 @@ async def llm_logic(
         else:
             voice_mail_detection = ""
 
-        response = client.beta.chat.completions.parse(
-            model="gpt-4o",
-            messages=[
+        messages = await ContextWindow("gpt-4o", LLM_LOGIC_MAX_TOKENS).fit(
+            [
                 {
                     "role": "system",
                     "content": (
@@ -48,8 +64,14 @@ async def llm_logic(
                         f"Restack Documentation: {function_input.documentation}"
                     ),
                 },
-                *function_input.messages,
+                *[msg.model_dump() for msg in function_input.messages],
             ],
+            summarize,
+        )
+
+        response = await client.beta.chat.completions.parse(
+            model="gpt-4o",
+            messages=messages,
             response_format=LlmLogicResponse,
         )
 
@@ -1,15 +1,26 @@
+import asyncio
 import os
-from typing import Literal
+from typing import Any, Literal
 
-from openai import OpenAI
 from pydantic import BaseModel, Field
 from restack_ai.function import (
     NonRetryableError,
     function,
-    stream_to_websocket,
+    function_info,
+    log,
 )
 
 from src.client import api_address
+from src.functions.utils.context_window import ContextWindow
+from src.functions.utils.fast_path import (
+    LLM_TALK_MODEL,
+    LLM_TALK_SLO_MS,
+    hedged_stream,
+    speculated_reply,
+    speculation_key,
+    stream_chunks_to_websocket,
+    text_chunks,
+)
 
 
 class Message(BaseModel):
@@ -24,51 +35,108 @@ class LlmTalkInput(BaseModel):
     stream: bool = True
 
 
-@function.defn()
-async def llm_talk(function_input: LlmTalkInput) -> str:
-    """Fast AI generates responses while checking for memory updates."""
-    try:
-        client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# The fast path never summarises: older turns are dropped to stay quick.
+LLM_TALK_MAX_TOKENS = int(os.getenv("LLM_TALK_MAX_TOKENS", "4000"))
 
-        common_prompt = (
-            "Your are an AI assistant helping developers build with restack: the backend framework for accurate & reliable AI agents."
-            "Your interface with users will be voice. Be friendly, helpful and avoid usage of unpronouncable punctuation."
-            "Always try to bring back the conversation to restack if the user is talking about something else. "
-            "Current context: " + function_input.context
-        )
 
-        if function_input.mode == "default":
-            system_prompt = (
-                common_prompt
-                + "If you don't know an answer, **do not make something up**. Instead, be friendly andacknowledge that "
-                "you will check for the correct response and let the user know. Keep your answer short in max 20 words"
-            )
-        else:
-            system_prompt = (
-                common_prompt
-                + "You are providing a short and precise update based on new information. "
-                "Do not re-explain everything, just deliver the most important update. Keep your answer short in max 20 words unless the user asks for more information."
-            )
+def user_turn(
+    messages: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], str]:
+    """The conversation before the last user message, and that message.
+
+    System messages are left out: they only hold the mode and context.
+    """
+    conversation = [msg for msg in messages if msg["role"] != "system"]
+    for index in range(len(conversation) - 1, -1, -1):
+        if conversation[index]["role"] == "user":
+            return conversation[:index], conversation[index]["content"]
+    return conversation, ""
+
+
+def turn_speculation_key(
+    function_input: "LlmTalkInput", messages: list[dict[str, Any]]
+) -> tuple[str, ...]:
+    """Key of the reply to the user's turn; see speculation_key.
+
+    messages is the conversation as sent to the model, after talk_messages
+    fitted it to LLM_TALK_MAX_TOKENS, so a speculated reply only matches
+    a turn whose fitted history is the same.
+    """
+    history, transcript = user_turn(messages)
+    return speculation_key(
+        function_info().workflow_id,
+        function_input.mode,
+        function_input.context,
+        history,
+        transcript,
+    )
 
-        function_input.messages.insert(
-            0, Message(role="system", content=system_prompt)
+
+async def talk_messages(
+    function_input: LlmTalkInput,
+) -> list[dict[str, Any]]:
+    """Prompt and conversation for the fast path, fitted to its window."""
+    common_prompt = (
+        "Your are an AI assistant helping developers build with restack: the backend framework for accurate & reliable AI agents."
+        "Your interface with users will be voice. Be friendly, helpful and avoid usage of unpronouncable punctuation."
+        "Always try to bring back the conversation to restack if the user is talking about something else. "
+        "Current context: " + function_input.context
+    )
+
+    if function_input.mode == "default":
+        system_prompt = (
+            common_prompt
+            + "If you don't know an answer, **do not make something up**. Instead, be friendly andacknowledge that "
+            "you will check for the correct response and let the user know. Keep your answer short in max 20 words"
+        )
+    else:
+        system_prompt = (
+            common_prompt
+            + "You are providing a short and precise update based on new information. "
+            "Do not re-explain everything, just deliver the most important update. Keep your answer short in max 20 words unless the user asks for more information."
         )
 
-        messages_dicts = [
-            msg.model_dump() for msg in function_input.messages
-        ]
+    messages = [
+        Message(role="system", content=system_prompt),
+        *function_input.messages,
+    ]
+    return await ContextWindow(
+        LLM_TALK_MODEL, LLM_TALK_MAX_TOKENS
+    ).fit([msg.model_dump() for msg in messages])
+
+
+@function.defn()
+async def llm_talk(function_input: LlmTalkInput) -> str:
+    """Fast AI generates responses while checking for memory updates.
 
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages_dicts,
-            stream=function_input.stream,
+    A reply speculated from the same user turn is used if there is one;
+    otherwise the request is hedged across endpoints, with a filler
+    phrase streamed if the first token misses LLM_TALK_SLO_MS.
+    """
+    try:
+        deadline = asyncio.get_running_loop().time() + LLM_TALK_SLO_MS / 1000
+        messages_dicts = await talk_messages(function_input)
+        reply = await speculated_reply(
+            turn_speculation_key(function_input, messages_dicts), deadline
         )
+        if reply is not None:
+            log.info("llm_talk using speculated reply")
+            chunks = text_chunks(reply)
+        else:
+            chunks = hedged_stream(
+                messages_dicts,
+                deadline if function_input.stream else None,
+            )
 
         if function_input.stream:
-            return await stream_to_websocket(
-                api_address=api_address, data=response
-            )
-        return response.choices[0].message.content
+            return await stream_chunks_to_websocket(api_address, chunks)
+        return "".join(
+            [
+                chunk.choices[0].delta.content or ""
+                async for chunk in chunks
+                if chunk.choices
+            ]
+        )
 
     except Exception as e:
         raise NonRetryableError(f"llm_talk failed: {e}") from e
@@ -0,0 +1,35 @@
+import asyncio
+
+from restack_ai.function import (
+    NonRetryableError,
+    function,
+    log,
+)
+
+from src.functions.llm_talk import (
+    LlmTalkInput,
+    talk_messages,
+    turn_speculation_key,
+    user_turn,
+)
+from src.functions.utils.fast_path import speculate
+
+
+@function.defn()
+async def llm_talk_speculate(function_input: LlmTalkInput) -> str:
+    """Pre-generate the fast path reply to a partial transcript.
+
+    The reply is kept in the worker until llm_talk is called for the
+    same user turn, or until LLM_TALK_SPECULATION_TTL passes.
+    """
+    try:
+        messages = await talk_messages(function_input)
+        _, transcript = user_turn(messages)
+        log.info("llm_talk_speculate started", transcript=transcript)
+        task = speculate(
+            turn_speculation_key(function_input, messages), messages
+        )
+        # Shielded: the task is shared with the llm_talk that claims it.
+        return await asyncio.shield(task)
+    except Exception as e:
+        raise NonRetryableError(f"llm_talk_speculate failed: {e}") from e
@@ -0,0 +1,209 @@
+"""Token-budgeted context window for chat completions.
+
+Pinned system messages are kept (truncated if they alone overflow their
+share of the budget), consecutive duplicate turns are dropped, and the
+oldest turns are rolled into a summary once the history no longer fits.
+Summaries are cached by the digest of the turns they cover so a long
+conversation is only re-summarised when the window moves.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from functools import lru_cache
+from typing import Any
+
+import tiktoken
+
+# Fixed per-message overhead of the chat format, in tokens.
+MESSAGE_OVERHEAD_TOKENS = 4
+# Used when no tiktoken encoding can be loaded (e.g. offline workers).
+APPROX_CHARS_PER_TOKEN = 4
+SUMMARY_CACHE_SIZE = 1024
+
+SUMMARY_PROMPT = (
+    "Summarise the conversation below for another assistant that will "
+    "continue it. Keep names, facts, decisions, open questions and what "
+    "the user has already been told. Be concise."
+)
+
+Summarizer = Callable[[str | None, list[dict[str, Any]]], Awaitable[str]]
+
+_summaries: OrderedDict[str, str] = OrderedDict()
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> tiktoken.Encoding | None:
+    # tiktoken downloads its BPE files on first use, so either lookup
+    # can fail offline; token counts then fall back to chars / 4.
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception:  # noqa: BLE001
+        return None
+    try:
+        # Models tiktoken does not know, e.g. custom deployments.
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def summary_messages(
+    summary: str | None, messages: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """Build the prompt that folds messages into an existing summary."""
+    transcript = "\n".join(
+        f"{message['role']}: {message.get('content') or ''}"
+        for message in messages
+    )
+    if summary:
+        transcript = f"Earlier summary: {summary}\n\n{transcript}"
+    return [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": transcript},
+    ]
+
+
+def _prefix_digests(messages: list[dict[str, Any]]) -> list[str]:
+    """Return the chained digest of every prefix of messages."""
+    digests = []
+    digest = hashlib.sha256()
+    for message in messages:
+        digest.update(json.dumps(message, sort_keys=True).encode())
+        digests.append(digest.copy().hexdigest())
+    return digests
+
+
+class ContextWindow:
+    def __init__(
+        self,
+        model: str,
+        max_tokens: int,
+        system_share: float = 0.5,
+        keep_share: float = 0.5,
+    ) -> None:
+        self.encoding = _encoding(model)
+        self.max_tokens = max_tokens
+        # Largest fraction of the budget pinned system messages may use.
+        self.system_share = system_share
+        # Fraction of the history budget left to verbatim turns after a
+        # roll-up, so the next few turns fit without summarising again.
+        self.keep_share = keep_share
+
+    def count(self, text: str) -> int:
+        if self.encoding is None:
+            return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def count_message(self, message: dict[str, Any]) -> int:
+        return MESSAGE_OVERHEAD_TOKENS + self.count(message.get("content") or "")
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        if self.encoding is None:
+            return text[: max(max_tokens, 0) * APPROX_CHARS_PER_TOKEN]
+        tokens = self.encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self.encoding.decode(tokens[: max(max_tokens, 0)])
+
+    async def fit(
+        self,
+        messages: list[dict[str, Any]],
+        summarize: Summarizer | None = None,
+    ) -> list[dict[str, Any]]:
+        """Return messages trimmed to the token budget.
+
+        Without a summarize callback the oldest turns are dropped instead
+        of being rolled into a summary.
+        """
+        pinned = [m for m in messages if m["role"] == "system"]
+        history = []
+        for message in messages:
+            if message["role"] == "system":
+                continue
+            if history and history[-1] == message:
+                continue
+            history.append(message)
+
+        system_budget = int(self.max_tokens * self.system_share)
+        pinned_tokens = sum(self.count_message(m) for m in pinned)
+        if pinned_tokens > system_budget:
+            share = system_budget // max(len(pinned), 1)
+            pinned = [
+                {**m, "content": self.truncate(m["content"], share)}
+                for m in pinned
+            ]
+            pinned_tokens = sum(self.count_message(m) for m in pinned)
+
+        budget = self.max_tokens - pinned_tokens
+        sizes = [self.count_message(m) for m in history]
+        if sum(sizes) <= budget:
+            return pinned + history
+
+        if summarize is None:
+            start = self._window_start(history, sizes, budget)
+            return pinned + self._clip(history[start:], budget)
+
+        digests = _prefix_digests(history)
+        start, summary = 0, None
+        for index in range(len(history) - 1, -1, -1):
+            if digests[index] in _summaries:
+                start, summary = index + 1, _summaries[digests[index]]
+                _summaries.move_to_end(digests[index])
+                break
+
+        summary_tokens = self.count(summary) if summary else 0
+        if summary_tokens + sum(sizes[start:]) > budget:
+            keep_budget = int(budget * self.keep_share)
+            end = max(self._window_start(history, sizes, keep_budget), start)
+            if end > start:
+                summary = await summarize(summary, history[start:end])
+                summary = self.truncate(summary, budget - keep_budget)
+                _summaries[digests[end - 1]] = summary
+                if len(_summaries) > SUMMARY_CACHE_SIZE:
+                    _summaries.popitem(last=False)
+                start = end
+
+        if summary is None:
+            return pinned + self._clip(history[start:], budget)
+
+        summary_message = {
+            "role": "system",
+            "content": f"Summary of the earlier conversation: {summary}",
+        }
+        remaining = budget - self.count_message(summary_message)
+        return [*pinned, summary_message, *self._clip(history[start:], remaining)]
+
+    def _window_start(
+        self, history: list[dict[str, Any]], sizes: list[int], budget: int
+    ) -> int:
+        """Index of the oldest turn such that the tail fits in budget."""
+        start, total = len(history), 0
+        while start > 0 and total + sizes[start - 1] <= budget:
+            start -= 1
+            total += sizes[start]
+        # Never keep a tool result without the assistant turn that asked
+        # for it.
+        while start < len(history) - 1 and history[start]["role"] == "tool":
+            start += 1
+        return min(start, len(history) - 1) if history else 0
+
+    def _clip(
+        self, history: list[dict[str, Any]], budget: int
+    ) -> list[dict[str, Any]]:
+        """Drop oldest turns, then truncate the last one, to fit budget."""
+        sizes = [self.count_message(m) for m in history]
+        start, total = 0, sum(sizes)
+        while start < len(history) - 1 and total > budget:
+            total -= sizes[start]
+            start += 1
+        history = history[start:]
+        if history and total > budget:
+            content = self.truncate(
+                history[0].get("content") or "",
+                budget - MESSAGE_OVERHEAD_TOKENS,
+            )
+            history = [{**history[0], "content": content}]
+        return history
@@ -0,0 +1,220 @@
+"""Retrieval index over the Restack documentation.
+
+llms-full.txt is kept in a local cache and revalidated with its ETag at
+most every DOCS_REFRESH_INTERVAL seconds, so it is only downloaded again
+when it changes. The text is split into heading-scoped passages whose BM25 postings
+(hashed word unigrams and bigrams) are built once and saved next to it;
+every worker memory-maps the same arrays and only touches the postings
+of the query's terms.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import zlib
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+from restack_ai.function import log
+
+DOCS_URL = os.getenv("DOCS_URL", "https://docs.restack.io/llms-full.txt")
+DOCS_CACHE_DIR = Path(os.getenv("DOCS_CACHE_DIR", ".docs_cache"))
+DOCS_REFRESH_INTERVAL = float(os.getenv("DOCS_REFRESH_INTERVAL", "300"))
+DOCS_CHUNK_CHARS = int(os.getenv("DOCS_CHUNK_CHARS", "2000"))
+# Hashed vocabulary size for the BM25 postings.
+VOCABULARY_SIZE = 1 << 20
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_HEADING = re.compile(r"^#{1,6} ")
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_index: "DocsIndex | None" = None
+_checked_at = 0.0
+_lock = asyncio.Lock()
+
+
+def _features(text: str) -> list[int]:
+    """Hashed word unigrams and bigrams of text."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return [zlib.crc32(gram.encode()) % VOCABULARY_SIZE for gram in grams]
+
+
+def split_passages(text: str, max_chars: int) -> list[str]:
+    """Split markdown into passages of at most max_chars, plus the heading.
+
+    Passages never span two sections and start with their section
+    heading, so each one can be read on its own. Paragraphs longer than
+    max_chars are cut into max_chars slices.
+    """
+    passages: list[str] = []
+    heading, paragraphs, size = "", [], 0
+
+    def flush() -> None:
+        nonlocal paragraphs, size
+        if paragraphs:
+            body = "\n\n".join(paragraphs)
+            passages.append(f"{heading}\n\n{body}" if heading else body)
+        paragraphs, size = [], 0
+
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if _HEADING.match(paragraph):
+            flush()
+            heading = paragraph.splitlines()[0]
+            paragraph = "\n".join(paragraph.splitlines()[1:]).strip()
+            if not paragraph:
+                continue
+        for start in range(0, len(paragraph), max_chars):
+            piece = paragraph[start : start + max_chars]
+            # Counting the blank line that joins it to the previous one.
+            if paragraphs and size + 2 + len(piece) > max_chars:
+                flush()
+            size += len(piece) + (2 if paragraphs else 0)
+            paragraphs.append(piece)
+    flush()
+    return passages
+
+
+class DocsIndex:
+    def __init__(self, path: Path) -> None:
+        def load(name: str) -> np.ndarray:
+            return np.load(path / f"{name}.npy", mmap_mode="r")
+
+        self.passages: list[str] = json.loads(
+            (path / "passages.json").read_text()
+        )
+        self.indptr = load("indptr")
+        self.postings = load("postings")
+        self.frequencies = load("frequencies")
+        self.idf = load("idf")
+        self.length_norm = load("length_norm")
+
+    @staticmethod
+    def build(path: Path, text: str) -> None:
+        passages = split_passages(text, DOCS_CHUNK_CHARS)
+        terms, docs, counts = [], [], []
+        lengths = np.zeros(len(passages), dtype=np.float32)
+        for doc_id, passage in enumerate(passages):
+            features = _features(passage)
+            lengths[doc_id] = len(features)
+            buckets, frequency = np.unique(features, return_counts=True)
+            terms.extend(buckets.tolist())
+            docs.extend([doc_id] * len(buckets))
+            counts.extend(frequency.tolist())
+
+        terms = np.asarray(terms, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+        document_frequency = np.bincount(terms, minlength=VOCABULARY_SIZE)
+        indptr = np.concatenate(([0], np.cumsum(document_frequency)))
+        idf = np.log1p(
+            (len(passages) - document_frequency + 0.5)
+            / (document_frequency + 0.5)
+        )
+        average_length = lengths.mean() if len(passages) else 1.0
+        length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+
+        arrays = {
+            "indptr": indptr.astype(np.int64),
+            "postings": np.asarray(docs, dtype=np.int64)[order],
+            "frequencies": np.asarray(counts, dtype=np.float32)[order],
+            "idf": idf.astype(np.float32),
+            "length_norm": length_norm.astype(np.float32),
+        }
+        # Written aside and renamed so workers still mapping the previous
+        # arrays keep reading consistent files.
+        for name, array in arrays.items():
+            np.save(path / f"{name}.tmp.npy", array)
+        (path / "passages.json.tmp").write_text(json.dumps(passages))
+        for name in arrays:
+            (path / f"{name}.tmp.npy").replace(path / f"{name}.npy")
+        (path / "passages.json.tmp").replace(path / "passages.json")
+
+    def search(self, query: str, k: int) -> list[str]:
+        """Return the k passages that best match query, best first."""
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        for term in set(_features(query)):
+            start, end = self.indptr[term], self.indptr[term + 1]
+            if start == end:
+                continue
+            docs = self.postings[start:end]
+            frequency = self.frequencies[start:end]
+            scores[docs] += (
+                self.idf[term]
+                * frequency
+                * (BM25_K1 + 1)
+                / (frequency + self.length_norm[docs])
+            )
+        k = min(k, int(np.count_nonzero(scores)))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.passages[row] for row in top]
+
+
+async def _revalidate() -> bool:
+    """Refresh the cached docs, returning True if the text changed."""
+    etag_file = DOCS_CACHE_DIR / "etag"
+    headers = {}
+    if etag_file.exists() and (DOCS_CACHE_DIR / "docs.txt").exists():
+        headers["If-None-Match"] = etag_file.read_text()
+
+    async with (
+        aiohttp.ClientSession() as session,
+        session.get(DOCS_URL, headers=headers) as response,
+    ):
+        if response.status == 304:
+            return False
+        response.raise_for_status()
+        text = await response.text()
+        etag = response.headers.get("ETag")
+
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    digest_file = DOCS_CACHE_DIR / "docs.sha256"
+    changed = not digest_file.exists() or digest_file.read_text() != digest
+    if changed:
+        (DOCS_CACHE_DIR / "docs.txt").write_text(text)
+        DocsIndex.build(DOCS_CACHE_DIR, text)
+        digest_file.write_text(digest)
+    if etag:
+        etag_file.write_text(etag)
+    else:
+        etag_file.unlink(missing_ok=True)
+    return changed
+
+
+async def docs_index() -> DocsIndex:
+    """Return the worker's index, revalidating the docs when due.
+
+    If the docs cannot be fetched the cached copy keeps being served.
+    """
+    global _index, _checked_at  # noqa: PLW0603
+    async with _lock:
+        now = time.monotonic()
+        if _index is not None and now - _checked_at < DOCS_REFRESH_INTERVAL:
+            return _index
+
+        DOCS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        try:
+            changed = await _revalidate()
+        except Exception as e:
+            if not (DOCS_CACHE_DIR / "docs.sha256").exists():
+                raise
+            log.warning("Failed to revalidate docs, using cached copy", error=e)
+            changed = False
+        _checked_at = now
+        if _index is None or changed:
+            _index = DocsIndex(DOCS_CACHE_DIR)
+        return _index
+
+
+def cached_docs() -> str:
+    return (DOCS_CACHE_DIR / "docs.txt").read_text()
@@ -0,0 +1,323 @@
+"""Latency-bounded reply generation for the fast path (llm_talk).
+
+The first words of a reply should be on the call's stream within
+LLM_TALK_SLO_MS. To stay inside it:
+
+- replies pre-generated from the caller's partial transcript (see
+  llm_talk_speculate) are served from memory when the committed user
+  turn matches;
+- the request goes to the primary endpoint and, if it has not produced
+  a token after LLM_TALK_HEDGE_MS and a hedge endpoint is configured,
+  to the hedge endpoint as well; the first to stream wins and the other
+  is cancelled;
+- if neither has produced a token when the SLO is up, a short filler
+  phrase is streamed while the reply keeps coming.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from typing import Any
+
+import websockets
+from openai import AsyncOpenAI, AsyncStream
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
+from restack_ai.function import function_info, heartbeat, log
+
+LLM_TALK_MODEL = os.getenv("LLM_TALK_MODEL", "gpt-3.5-turbo")
+# Time to first token the fast path is held to, in milliseconds.
+LLM_TALK_SLO_MS = int(os.getenv("LLM_TALK_SLO_MS", "800"))
+# Time without a token after which the hedge endpoint is also asked.
+LLM_TALK_HEDGE_MS = int(os.getenv("LLM_TALK_HEDGE_MS", "300"))
+# Hedging is off unless a separate endpoint is set: a second request to
+# a slow primary would only add to its load.
+LLM_TALK_HEDGE_BASE_URL = os.getenv("LLM_TALK_HEDGE_BASE_URL")
+LLM_TALK_HEDGE_API_KEY = os.getenv("LLM_TALK_HEDGE_API_KEY")
+LLM_TALK_HEDGE_MODEL = os.getenv("LLM_TALK_HEDGE_MODEL", LLM_TALK_MODEL)
+# Speculated replies not claimed within this many seconds are dropped.
+LLM_TALK_SPECULATION_TTL = float(
+    os.getenv("LLM_TALK_SPECULATION_TTL", "30")
+)
+SPECULATION_CACHE_SIZE = 256
+
+FILLER_PHRASES = (
+    "Let me think about that for a second.",
+    "Good question, one moment.",
+    "Sure, give me a second.",
+    "Okay, let me check.",
+)
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+_clients: dict[str, AsyncOpenAI] = {}
+_fillers = itertools.cycle(FILLER_PHRASES)
+_speculations: OrderedDict[
+    tuple[str, ...], tuple["asyncio.Task[str]", float]
+] = OrderedDict()
+
+
+def _client(name: str) -> AsyncOpenAI:
+    if name not in _clients:
+        if name == "hedge":
+            _clients[name] = AsyncOpenAI(
+                base_url=LLM_TALK_HEDGE_BASE_URL,
+                api_key=LLM_TALK_HEDGE_API_KEY
+                or os.environ.get("OPENAI_API_KEY"),
+            )
+        else:
+            _clients[name] = AsyncOpenAI(
+                api_key=os.environ.get("OPENAI_API_KEY")
+            )
+    return _clients[name]
+
+
+def text_chunk(
+    content: str | None, finish_reason: str | None = None
+) -> ChatCompletionChunk:
+    """A completion chunk for text that does not come from the model."""
+    return ChatCompletionChunk(
+        id="fast-path",
+        choices=[
+            Choice(
+                index=0,
+                delta=ChoiceDelta(role="assistant", content=content),
+                finish_reason=finish_reason,
+            )
+        ],
+        created=int(time.time()),
+        model="fast-path",
+        object="chat.completion.chunk",
+    )
+
+
+async def text_chunks(text: str) -> AsyncIterator[ChatCompletionChunk]:
+    yield text_chunk(text)
+    yield text_chunk(None, "stop")
+
+
+def _content(chunk: ChatCompletionChunk) -> str | None:
+    if chunk.choices and chunk.choices[0].delta:
+        return chunk.choices[0].delta.content
+    return None
+
+
+async def _first_token(
+    name: str, model: str, messages: list[dict[str, Any]]
+) -> tuple[AsyncStream[ChatCompletionChunk], list[ChatCompletionChunk]]:
+    """Open a stream and read it up to its first content chunk."""
+    stream = await _client(name).chat.completions.create(
+        model=model, messages=messages, stream=True
+    )
+    received = []
+    try:
+        # Read with anext so the rest of the stream can still be iterated.
+        while not received or not _content(received[-1]):
+            received.append(await anext(stream))
+    except StopAsyncIteration:
+        pass
+    except BaseException:
+        await stream.close()
+        raise
+    return stream, received
+
+
+def _discard(task: asyncio.Task) -> None:
+    """Cancel a losing request, closing its stream if it already opened."""
+
+    def close(done: asyncio.Task) -> None:
+        if not done.cancelled() and done.exception() is None:
+            asyncio.ensure_future(done.result()[0].close())
+
+    task.cancel()
+    task.add_done_callback(close)
+
+
+async def hedged_stream(
+    messages: list[dict[str, Any]], deadline: float | None = None
+) -> AsyncIterator[ChatCompletionChunk]:
+    """Stream a reply from whichever endpoint starts answering first.
+
+    deadline is the event loop time by which the first token is due; a
+    filler phrase is yielded if it passes without one.
+    """
+    loop = asyncio.get_running_loop()
+    hedge_at = loop.time() + LLM_TALK_HEDGE_MS / 1000
+    pending = {
+        asyncio.create_task(
+            _first_token("primary", LLM_TALK_MODEL, messages)
+        )
+    }
+    # Without a hedge endpoint, behave as if already hedged.
+    hedged = not LLM_TALK_HEDGE_BASE_URL
+    winner = error = None
+    try:
+        while winner is None:
+            wakeups = [] if hedged else [hedge_at]
+            if deadline is not None:
+                wakeups.append(deadline)
+            timeout = (
+                max(min(wakeups) - loop.time(), 0) if wakeups else None
+            )
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    log.warning("llm_talk request failed", error=error)
+                elif winner is None:
+                    winner = task.result()
+                else:
+                    await task.result()[0].close()
+            if winner is not None:
+                break
+
+            if not hedged and (loop.time() >= hedge_at or not pending):
+                hedged = True
+                pending.add(
+                    asyncio.create_task(
+                        _first_token(
+                            "hedge", LLM_TALK_HEDGE_MODEL, messages
+                        )
+                    )
+                )
+                log.info("llm_talk hedged to second endpoint")
+            elif not pending:
+                raise error
+            if deadline is not None and loop.time() >= deadline:
+                deadline = None
+                log.info("llm_talk missed its SLO, sending filler")
+                yield text_chunk(next(_fillers) + " ")
+    finally:
+        for task in pending:
+            _discard(task)
+
+    stream, received = winner
+    try:
+        for chunk in received:
+            yield chunk
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await stream.close()
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", text.lower())).strip()
+
+
+def speculation_key(
+    agent_id: str,
+    mode: str,
+    context: str | None,
+    history: list[dict[str, Any]],
+    transcript: str,
+) -> tuple[str, ...]:
+    """Key a reply by what it answers, ignoring case and punctuation.
+
+    Interim and final transcripts of the same words then share a key.
+    history is the conversation before the user's turn; a reply
+    speculated on different history misses.
+    """
+    history_digest = hashlib.sha256(
+        json.dumps(history, sort_keys=True).encode()
+    ).hexdigest()
+    return (
+        agent_id,
+        mode,
+        context or "",
+        history_digest,
+        _normalize(transcript),
+    )
+
+
+def _evict_speculations() -> None:
+    now = time.monotonic()
+    for key, (task, created_at) in list(_speculations.items()):
+        if now - created_at > LLM_TALK_SPECULATION_TTL:
+            task.cancel()
+            del _speculations[key]
+    while len(_speculations) > SPECULATION_CACHE_SIZE:
+        _speculations.popitem(last=False)[1][0].cancel()
+
+
+def speculate(
+    key: tuple[str, ...], messages: list[dict[str, Any]]
+) -> "asyncio.Task[str]":
+    """Start generating the reply for key, unless already under way."""
+    _evict_speculations()
+    if key in _speculations:
+        return _speculations[key][0]
+
+    async def generate() -> str:
+        return "".join(
+            [_content(chunk) or "" async for chunk in hedged_stream(messages)]
+        )
+
+    task = asyncio.create_task(generate())
+    _speculations[key] = (task, time.monotonic())
+    return task
+
+
+async def speculated_reply(
+    key: tuple[str, ...], deadline: float
+) -> str | None:
+    """Claim the reply speculated for key, waiting for it until deadline."""
+    _evict_speculations()
+    entry = _speculations.pop(key, None)
+    if entry is None:
+        return None
+    task = entry[0]
+    timeout = max(deadline - asyncio.get_running_loop().time(), 0)
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout)
+    except asyncio.TimeoutError:
+        # Not cancelled: llm_talk_speculate is still waiting for it.
+        log.info("Speculated reply not ready within SLO")
+    except Exception as e:  # noqa: BLE001
+        log.warning("Speculated reply failed", error=e)
+    return None
+
+
+async def stream_chunks_to_websocket(
+    api_address: str | None, chunks: AsyncIterator[ChatCompletionChunk]
+) -> str:
+    """Forward chunks to the agent's websocket stream as they arrive.
+
+    Same protocol as restack_ai's stream_to_websocket, which only reads
+    synchronous OpenAI streams and so would block the worker's event
+    loop between chunks.
+    """
+    if api_address is None:
+        api_address = "localhost:9233"
+    info = function_info()
+    protocol = "ws" if api_address.startswith("localhost") else "wss"
+    websocket_url = (
+        f"{protocol}://{api_address}/stream/ws/agent"
+        f"?agentId={info.workflow_id}&runId={info.workflow_run_id}"
+    )
+
+    collected = []
+    async with websockets.connect(websocket_url) as websocket:
+        try:
+            heartbeat(info.activity_id)
+            async for chunk in chunks:
+                raw_chunk_json = chunk.model_dump_json()
+                heartbeat(raw_chunk_json)
+                await websocket.send(raw_chunk_json)
+                content = _content(chunk)
+                if content:
+                    collected.append(content)
+        finally:
+            await websocket.send("[DONE]")
+    return "".join(collected)
@@ -0,0 +1,88 @@
+"""Shared LiveKit API client for the livekit_* functions.
+
+One LiveKitAPI per worker keeps its HTTP session, and the connections
+in it, open across calls instead of opening and closing one per call.
+Participant join tokens are cached and reused until shortly before they
+expire.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from livekit import api
+
+LIVEKIT_TOKEN_TTL = timedelta(
+    seconds=int(os.getenv("LIVEKIT_TOKEN_TTL", str(6 * 60 * 60)))
+)
+# A cached token is replaced once it has less than this left to live.
+LIVEKIT_TOKEN_REFRESH_MARGIN = int(
+    os.getenv("LIVEKIT_TOKEN_REFRESH_MARGIN", "300")
+)
+TOKEN_CACHE_SIZE = 1024
+
+_livekit_api: api.LiveKitAPI | None = None
+_livekit_api_loop: asyncio.AbstractEventLoop | None = None
+_tokens: OrderedDict[tuple[str, str, str], tuple[str, float]] = (
+    OrderedDict()
+)
+
+
+def livekit_api() -> api.LiveKitAPI:
+    """Return the worker's LiveKit API client.
+
+    The client's HTTP session belongs to the event loop it was created
+    on, so a new one is made if the loop changes.
+    """
+    global _livekit_api, _livekit_api_loop  # noqa: PLW0603
+    loop = asyncio.get_running_loop()
+    if _livekit_api is None or _livekit_api_loop is not loop:
+        _livekit_api = api.LiveKitAPI(
+            url=os.getenv("LIVEKIT_API_URL"),
+            api_key=os.getenv("LIVEKIT_API_KEY"),
+            api_secret=os.getenv("LIVEKIT_API_SECRET"),
+        )
+        _livekit_api_loop = loop
+    return _livekit_api
+
+
+async def close_livekit_api() -> None:
+    global _livekit_api  # noqa: PLW0603
+    if _livekit_api is not None:
+        await _livekit_api.aclose()
+        _livekit_api = None
+
+
+def room_token(
+    room_id: str, identity: str = "identity", name: str = "dev_user"
+) -> str:
+    """Return a join token for room_id, reusing a cached one if fresh."""
+    key = (room_id, identity, name)
+    now = time.time()
+    cached = _tokens.get(key)
+    if cached is not None and cached[1] - LIVEKIT_TOKEN_REFRESH_MARGIN > now:
+        _tokens.move_to_end(key)
+        return cached[0]
+
+    jwt = (
+        api.AccessToken(
+            os.getenv("LIVEKIT_API_KEY"),
+            os.getenv("LIVEKIT_API_SECRET"),
+        )
+        .with_identity(identity)
+        .with_name(name)
+        .with_ttl(LIVEKIT_TOKEN_TTL)
+        .with_grants(
+            api.VideoGrants(
+                room_join=True,
+                room=room_id,
+            )
+        )
+        .to_jwt()
+    )
+    _tokens[key] = (jwt, now + LIVEKIT_TOKEN_TTL.total_seconds())
+    if len(_tokens) > TOKEN_CACHE_SIZE:
+        _tokens.popitem(last=False)
+    return jwt
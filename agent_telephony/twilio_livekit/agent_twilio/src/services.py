@@ -7,7 +7,10 @@ from watchfiles import run_process
 
 from src.agents.agent import AgentTwilio
 from src.client import client
-from src.functions.context_docs import context_docs
+from src.functions.context_docs import (
+    context_docs,
+    context_docs_search,
+)
 from src.functions.livekit_call import livekit_call
 from src.functions.livekit_create_room import livekit_create_room
 from src.functions.livekit_delete_room import livekit_delete_room
@@ -16,35 +19,44 @@ from src.functions.livekit_outbound_trunk import (
     livekit_outbound_trunk,
 )
 from src.functions.livekit_send_data import livekit_send_data
+from src.functions.livekit_setup_room import livekit_setup_room
 from src.functions.livekit_start_recording import (
     livekit_start_recording,
 )
 from src.functions.livekit_token import livekit_token
 from src.functions.llm_logic import llm_logic
 from src.functions.llm_talk import llm_talk
+from src.functions.llm_talk_speculate import llm_talk_speculate
 from src.functions.send_agent_event import send_agent_event
+from src.functions.utils.livekit_client import close_livekit_api
 from src.workflows.logic import LogicWorkflow
 
 
 async def main() -> None:
-    await client.start_service(
-        agents=[AgentTwilio],
-        workflows=[LogicWorkflow],
-        functions=[
-            llm_talk,
-            llm_logic,
-            livekit_dispatch,
-            livekit_call,
-            livekit_create_room,
-            livekit_delete_room,
-            livekit_outbound_trunk,
-            livekit_token,
-            context_docs,
-            livekit_send_data,
-            send_agent_event,
-            livekit_start_recording,
-        ],
-    )
+    try:
+        await client.start_service(
+            agents=[AgentTwilio],
+            workflows=[LogicWorkflow],
+            functions=[
+                llm_talk,
+                llm_talk_speculate,
+                llm_logic,
+                livekit_dispatch,
+                livekit_call,
+                livekit_create_room,
+                livekit_setup_room,
+                livekit_delete_room,
+                livekit_outbound_trunk,
+                livekit_token,
+                context_docs,
+                context_docs_search,
+                livekit_send_data,
+                send_agent_event,
+                livekit_start_recording,
+            ],
+        )
+    finally:
+        await close_livekit_api()
 
 
 def run_services() -> None:
@@ -10,7 +10,10 @@ from restack_ai.workflow import (
 )
 
 with import_functions():
-    from src.functions.context_docs import context_docs
+    from src.functions.context_docs import (
+        ContextDocsSearchInput,
+        context_docs_search,
+    )
     from src.functions.livekit_send_data import (
         LivekitSendDataInput,
         livekit_send_data,
@@ -31,6 +34,11 @@ with import_functions():
     )
 
 
+# Trailing messages used as the docs search query, and passages sent.
+DOCS_QUERY_MESSAGES = 3
+DOCS_PASSAGES = 6
+
+
 class LogicWorkflowInput(BaseModel):
     messages: list[Message]
     room_id: str
@@ -54,8 +62,18 @@ class LogicWorkflow:
 
         log.info("LogicWorkflow started")
         try:
+            # Search with the latest user turns rather than sending the
+            # whole documentation to llm_logic.
+            query = " ".join(
+                msg.content
+                for msg in workflow_input.messages[-DOCS_QUERY_MESSAGES:]
+                if msg.role == "user"
+            )
             documentation = await workflow.step(
-                function=context_docs
+                function=context_docs_search,
+                function_input=ContextDocsSearchInput(
+                    query=query, k=DOCS_PASSAGES
+                ),
             )
 
             slow_response: LlmLogicResponse = await workflow.step(
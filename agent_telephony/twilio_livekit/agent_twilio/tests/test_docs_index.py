@@ -0,0 +1,31 @@
+from src.functions.utils.docs_index import split_passages
+
+MAX_CHARS = 2000
+
+
+def assert_bounded(passages: list[str], heading: str = "") -> None:
+    bound = MAX_CHARS + (len(heading) + 2 if heading else 0)
+    assert passages
+    assert all(len(passage) <= bound for passage in passages)
+
+
+def test_long_paragraph_is_split_within_max_chars():
+    text = "# Agents\n\n" + "word " * 2000 + "\n\nShort closing paragraph."
+    passages = split_passages(text, MAX_CHARS)
+    assert_bounded(passages, "# Agents")
+    assert all(passage.startswith("# Agents\n\n") for passage in passages)
+
+
+def test_paragraphs_are_packed_within_max_chars():
+    text = "\n\n".join(("x" * 700) for _ in range(10))
+    passages = split_passages(text, MAX_CHARS)
+    assert_bounded(passages)
+    assert len(passages) == 5
+
+
+def test_text_is_kept():
+    paragraphs = ["a" * 4446, "b" * 30, "c" * 1999]
+    passages = split_passages("## Heading\n\n" + "\n\n".join(paragraphs), MAX_CHARS)
+    assert_bounded(passages, "## Heading")
+    bodies = [passage.removeprefix("## Heading\n\n") for passage in passages]
+    assert "".join(body.replace("\n\n", "") for body in bodies) == "".join(paragraphs)
@@ -0,0 +1,321 @@
+"""Voice latency benchmark for the LiveKit pipeline.
+
+Builds the STT, LLM and TTS services with the same factories as
+create_livekit_pipeline, points them at local stub APIs, and plays
+audio fixtures through them as N concurrent simulated calls, in real
+time. Each turn follows the path VoicePipelineAgent takes: audio goes
+to VAD and STT; the reply is requested once VAD has seen the end of
+speech (plus the agent's minimum endpointing delay) and the final
+transcript is in; LLM tokens are streamed into TTS as they arrive.
+
+Per turn, measured from the end of the user's speech:
+
+- vad: VAD end-of-speech event
+- stt: final transcript
+- endpointing: reply requested
+- mouth_to_ear: first synthesised audio frame
+
+and per stage: llm_ttft (request to first token) and tts_ttfb (first
+token to first audio frame).
+
+Usage, from the project directory:
+
+    uv run python -m benchmark --calls 8 --turns 5
+"""
+
+import argparse
+import asyncio
+import collections
+import logging
+import os
+import random
+import time
+from pathlib import Path
+
+import aiohttp
+import numpy as np
+from livekit import rtc
+from livekit.agents import llm, stt, vad
+from livekit.plugins import silero
+
+from benchmark.fixtures import Fixture, load_fixtures
+from benchmark.report import (
+    load,
+    render,
+    render_comparison,
+    save,
+    summarize,
+)
+from benchmark.stubs import StubLatency, StubServer
+from src.pipeline import create_llm, create_stt, create_tts
+
+FRAME_MS = 10
+# VoicePipelineAgent's default min_endpointing_delay.
+MIN_ENDPOINTING_DELAY = 0.5
+TURN_TIMEOUT = 30.0
+# Silence between the end of a reply and the next utterance.
+TURN_GAP = 1.0
+TRANSCRIPT = "How do I build a voice agent with restack?"
+REPLY = (
+    "Restack agents stream replies from a workflow. "
+    "Start a LiveKit room and connect the pipeline to it."
+)
+
+
+class Call:
+    """One simulated call: a continuous real-time audio stream."""
+
+    def __init__(
+        self,
+        vad_model: vad.VAD,
+        http_session: aiohttp.ClientSession,
+        stub_url: str,
+    ) -> None:
+        self.stt = create_stt(
+            http_session, base_url=f"{stub_url}/v1/listen"
+        )
+        self.llm = create_llm("benchmark", f"{stub_url}/v1")
+        self.tts = create_tts(http_session, base_url=f"{stub_url}/v1")
+        self._vad_stream = vad_model.stream()
+        self._stt_stream = self.stt.stream()
+        self._vad_ends: asyncio.Queue[float] = asyncio.Queue()
+        self._finals: asyncio.Queue[tuple[float, str]] = asyncio.Queue()
+        self._frames: collections.deque[
+            tuple[rtc.AudioFrame, asyncio.Future | None]
+        ] = collections.deque()
+        self._sample_rate = 16000
+        self._tasks = [
+            asyncio.create_task(self._feed()),
+            asyncio.create_task(self._read_vad()),
+            asyncio.create_task(self._read_stt()),
+        ]
+
+    async def aclose(self) -> None:
+        feeder, *readers = self._tasks
+        feeder.cancel()
+        self._vad_stream.end_input()
+        self._stt_stream.end_input()
+        # Let the streams drain and close their connections cleanly.
+        await asyncio.wait(readers, timeout=5)
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self._vad_stream.aclose()
+        await self._stt_stream.aclose()
+        await self.tts.aclose()
+
+    async def _feed(self) -> None:
+        """Push a frame every FRAME_MS, silence when nothing is queued."""
+        loop = asyncio.get_running_loop()
+        next_at = loop.time()
+        while True:
+            if self._frames:
+                frame, spoken = self._frames.popleft()
+            else:
+                size = self._sample_rate * FRAME_MS // 1000
+                frame = rtc.AudioFrame(
+                    bytes(size * 2), self._sample_rate, 1, size
+                )
+                spoken = None
+            self._vad_stream.push_frame(frame)
+            self._stt_stream.push_frame(frame)
+            if spoken is not None:
+                spoken.set_result(loop.time())
+            next_at += FRAME_MS / 1000
+            await asyncio.sleep(max(next_at - loop.time(), 0))
+
+    async def _read_vad(self) -> None:
+        loop = asyncio.get_running_loop()
+        async for event in self._vad_stream:
+            if event.type == vad.VADEventType.END_OF_SPEECH:
+                self._vad_ends.put_nowait(loop.time())
+
+    async def _read_stt(self) -> None:
+        loop = asyncio.get_running_loop()
+        async for event in self._stt_stream:
+            if event.type == stt.SpeechEventType.FINAL_TRANSCRIPT:
+                self._finals.put_nowait(
+                    (loop.time(), event.alternatives[0].text)
+                )
+
+    def _play(self, fixture: Fixture) -> asyncio.Future:
+        """Queue a fixture; the future resolves when its speech has been sent."""
+        self._sample_rate = fixture.sample_rate
+        size = fixture.sample_rate * FRAME_MS // 1000
+        samples = fixture.samples
+        frame_count = -(-len(samples) // size)
+        # The frame holding the last voiced sample.
+        last_voiced = min(
+            max(-(-int(fixture.speech_end * fixture.sample_rate) // size) - 1, 0),
+            frame_count - 1,
+        )
+        spoken = asyncio.get_running_loop().create_future()
+        for index, start in enumerate(range(0, len(samples), size)):
+            chunk = samples[start : start + size]
+            if len(chunk) < size:
+                chunk = np.pad(chunk, (0, size - len(chunk)))
+            frame = rtc.AudioFrame(
+                chunk.tobytes(), fixture.sample_rate, 1, size
+            )
+            self._frames.append(
+                (frame, spoken if index == last_voiced else None)
+            )
+        return spoken
+
+    @staticmethod
+    async def _after(queue: asyncio.Queue, moment: float) -> tuple:
+        """The first queued event at or after moment."""
+        while True:
+            item = await queue.get()
+            event_at = item[0] if isinstance(item, tuple) else item
+            if event_at >= moment:
+                return item if isinstance(item, tuple) else (item,)
+
+    async def turn(self, fixture: Fixture) -> dict[str, float]:
+        loop = asyncio.get_running_loop()
+        speech_end = await self._play(fixture)
+        (vad_end,) = await self._after(self._vad_ends, speech_end)
+        final_at, transcript = await self._after(self._finals, speech_end)
+
+        committed = max(vad_end + MIN_ENDPOINTING_DELAY, final_at)
+        await asyncio.sleep(max(committed - loop.time(), 0))
+        committed = loop.time()
+
+        chat_ctx = llm.ChatContext().append(role="user", text=transcript)
+        llm_stream = self.llm.chat(chat_ctx=chat_ctx)
+        tts_stream = self.tts.stream()
+        first_token = first_audio = None
+
+        async def speak() -> None:
+            nonlocal first_audio
+            async for _ in tts_stream:
+                if first_audio is None:
+                    first_audio = loop.time()
+
+        speaking = asyncio.create_task(speak())
+        try:
+            async for chunk in llm_stream:
+                content = chunk.choices[0].delta.content if chunk.choices else None
+                if content:
+                    if first_token is None:
+                        first_token = loop.time()
+                    tts_stream.push_text(content)
+            tts_stream.flush()
+            tts_stream.end_input()
+            await speaking
+        finally:
+            speaking.cancel()
+            await llm_stream.aclose()
+            await tts_stream.aclose()
+
+        return {
+            "vad": vad_end - speech_end,
+            "stt": final_at - speech_end,
+            "endpointing": committed - speech_end,
+            "llm_ttft": first_token - committed,
+            "tts_ttfb": first_audio - first_token,
+            "mouth_to_ear": first_audio - speech_end,
+        }
+
+
+async def run_call(
+    call_id: int,
+    fixtures: list[Fixture],
+    turns: int,
+    vad_model: vad.VAD,
+    http_session: aiohttp.ClientSession,
+    stub_url: str,
+    results: list[dict[str, float]],
+    failures: list[Exception],
+) -> None:
+    # Spread call starts so turns do not line up across calls.
+    await asyncio.sleep(random.uniform(0, 1))
+    call = Call(vad_model, http_session, stub_url)
+    try:
+        for index in range(turns):
+            fixture = fixtures[(call_id + index) % len(fixtures)]
+            try:
+                results.append(
+                    await asyncio.wait_for(call.turn(fixture), TURN_TIMEOUT)
+                )
+            except Exception as e:  # noqa: BLE001
+                logging.warning("Call %s turn %s failed: %r", call_id, index, e)
+                failures.append(e)
+            await asyncio.sleep(TURN_GAP)
+    finally:
+        await call.aclose()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark")
+    os.environ.setdefault("ELEVEN_API_KEY", "benchmark")
+    random.seed(args.seed)
+    fixtures = load_fixtures(args.fixtures)
+    latency = StubLatency(
+        stt_final_ms=args.stt_ms,
+        llm_ttft_ms=args.llm_ttft_ms,
+        llm_token_ms=args.llm_token_ms,
+        tts_ttfb_ms=args.tts_ms,
+        jitter=args.jitter,
+    )
+    vad_model = silero.VAD.load()
+    results: list[dict[str, float]] = []
+    failures: list[Exception] = []
+
+    with StubServer(latency, TRANSCRIPT, REPLY, seed=args.seed) as stubs:
+        async with aiohttp.ClientSession() as http_session:
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    run_call(
+                        call_id,
+                        fixtures,
+                        args.turns,
+                        vad_model,
+                        http_session,
+                        stubs.url,
+                        results,
+                        failures,
+                    )
+                    for call_id in range(args.calls)
+                )
+            )
+            wall_seconds = time.perf_counter() - started
+
+    return summarize(results, len(failures), args.calls, wall_seconds)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--calls", type=int, default=1, help="concurrent calls")
+    parser.add_argument("--turns", type=int, default=5, help="turns per call")
+    parser.add_argument(
+        "--fixtures", type=Path, help="directory of mono 16-bit .wav utterances"
+    )
+    parser.add_argument("--stt-ms", type=float, default=150, help="stub final transcript delay")
+    parser.add_argument("--llm-ttft-ms", type=float, default=300, help="stub time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=20, help="stub time between tokens")
+    parser.add_argument("--tts-ms", type=float, default=150, help="stub time to first audio")
+    parser.add_argument("--jitter", type=float, default=0.0, help="stub delay variation, 0-1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the summary here")
+    parser.add_argument(
+        "--baseline", type=Path, help="summary from --json to compare with"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    # Keep per-request logs out of the report.
+    logging.getLogger().setLevel(logging.WARNING)
+    args = parse_args()
+    summary = asyncio.run(run(args))
+    print(render(summary))
+    if args.baseline:
+        print(render_comparison(summary, load(args.baseline)))
+    if args.json:
+        save(summary, args.json)
+
+
+if __name__ == "__main__":
+    main()
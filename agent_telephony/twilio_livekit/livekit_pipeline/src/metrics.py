@@ -1,73 +1,206 @@
 """Metrics.
 
-Provides functions for handling and sending metrics data from Livekit to Restack.
+Aggregates pipeline latency metrics from Livekit and sends them to Restack.
+
+Latencies are recorded per stage into in-memory histograms and sent to
+the agent as one compact summary per window (every
+METRICS_FLUSH_INTERVAL seconds, or sooner once METRICS_FLUSH_SIZE
+samples are in) instead of one event per metrics callback.
 """
 
 import asyncio
-import json
+import math
+import os
+import time
 
 from livekit.agents import metrics
 from livekit.agents.pipeline import VoicePipelineAgent
 from src.restack.client import client
 from src.utils import logger, track_task
 
+METRICS_FLUSH_INTERVAL = float(
+    os.getenv("METRICS_FLUSH_INTERVAL", "60")
+)
+METRICS_FLUSH_SIZE = int(os.getenv("METRICS_FLUSH_SIZE", "500"))
+# Significant bits kept per recorded value: buckets are at most 1/32
+# of their values wide.
+HISTOGRAM_PRECISION_BITS = 6
+PERCENTILES = (50, 95, 99)
 
-async def send_metrics(
-    pipeline_metrics: metrics.AgentMetrics,
-    agent_id: str,
-    run_id: str,
-) -> None:
-    """Send metrics data to restack asynchronously.
 
-    Args:
-    pipeline_metrics (metrics.AgentMetrics): The metrics data to be sent.
-    agent_id (str): The identifier for the agent.
-    run_id (str): The current execution run identifier.
+class LatencyHistogram:
+    """Log-linear latency histogram, in the manner of HdrHistogram.
 
+    Values are recorded in microseconds into buckets whose width grows
+    with the value, so memory stays bounded and percentiles keep a
+    fixed relative precision whatever the range.
     """
-    try:
-        latencies = []
-        if isinstance(
-            pipeline_metrics, metrics.PipelineEOUMetrics
-        ):
-            total_latency = (
-                pipeline_metrics.end_of_utterance_delay
-            )
-            latencies.append(total_latency * 1000)
-        elif isinstance(
-            pipeline_metrics, metrics.PipelineLLMMetrics
-        ):
-            total_latency = pipeline_metrics.ttft
-            latencies.append(total_latency * 1000)
-        elif isinstance(
-            pipeline_metrics, metrics.PipelineTTSMetrics
-        ):
-            total_latency = pipeline_metrics.ttfb
-            latencies.append(total_latency * 1000)
-        if latencies:
-            metrics_latencies = str(
-                json.dumps({"latencies": latencies})
-            )
-            logger.info(
-                "Sending pipeline metrics: %s", metrics_latencies
-            )
+
+    def __init__(self) -> None:
+        # Lowest value of each bucket, in microseconds, to its count.
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @staticmethod
+    def _bucket(value_us: int) -> int:
+        shift = max(value_us.bit_length() - HISTOGRAM_PRECISION_BITS, 0)
+        return (value_us >> shift) << shift
+
+    @staticmethod
+    def _midpoint_ms(bucket: int) -> float:
+        shift = max(bucket.bit_length() - HISTOGRAM_PRECISION_BITS, 0)
+        return (bucket + ((1 << shift) - 1) / 2) / 1000
+
+    def record(self, value_ms: float) -> None:
+        bucket = self._bucket(round(value_ms * 1000))
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percentile: float) -> float:
+        rank = max(math.ceil(percentile / 100 * self.count), 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return self._midpoint_ms(bucket)
+        return 0.0
+
+    def summary(self) -> dict:
+        """Percentiles plus the buckets, for the agent to merge."""
+        return {
+            "count": self.count,
+            **{
+                f"p{percentile}": round(self.percentile(percentile), 1)
+                for percentile in PERCENTILES
+            },
+            "max": round(self.max_ms, 1),
+            "mean": round(self.total_ms / self.count, 1),
+            "histogram": [
+                [round(self._midpoint_ms(bucket), 2), count]
+                for bucket, count in sorted(self.counts.items())
+            ],
+        }
+
+
+def stage_latencies(
+    pipeline_metrics: metrics.AgentMetrics,
+) -> dict[str, float]:
+    """Return the latencies, in milliseconds, carried by a metrics event."""
+    if isinstance(pipeline_metrics, metrics.PipelineEOUMetrics):
+        latencies = {
+            "end_of_utterance": pipeline_metrics.end_of_utterance_delay,
+            "transcription": pipeline_metrics.transcription_delay,
+        }
+    elif isinstance(pipeline_metrics, metrics.PipelineLLMMetrics):
+        latencies = {"llm_ttft": pipeline_metrics.ttft}
+    elif isinstance(pipeline_metrics, metrics.PipelineTTSMetrics):
+        latencies = {"tts_ttfb": pipeline_metrics.ttfb}
+    else:
+        return {}
+    # Failed requests report negative latencies.
+    return {
+        stage: seconds * 1000
+        for stage, seconds in latencies.items()
+        if seconds >= 0
+    }
+
+
+class MetricsAggregator:
+    """Collects a call's stage latencies and sends them in windows."""
+
+    def __init__(
+        self,
+        agent_id: str,
+        run_id: str,
+        flush_interval: float = METRICS_FLUSH_INTERVAL,
+        flush_size: int = METRICS_FLUSH_SIZE,
+    ) -> None:
+        self.agent_id = agent_id
+        self.run_id = run_id
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._window: dict[str, LatencyHistogram] = {}
+        self._samples = 0
+        self._window_started = time.monotonic()
+        self._timer: asyncio.Task | None = None
+        # A size-triggered flush is scheduled and has not run yet.
+        self._flush_pending = False
+
+    def start(self) -> None:
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_periodically())
+
+    def record(self, stage: str, value_ms: float) -> None:
+        self._window.setdefault(stage, LatencyHistogram()).record(value_ms)
+        self._samples += 1
+        if self._samples >= self.flush_size and not self._flush_pending:
+            self._flush_pending = True
+            track_task(asyncio.create_task(self.flush()))
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Send the current window to the agent and start a new one."""
+        self._flush_pending = False
+        if not self._samples:
+            return
+        window, started = self._window, self._window_started
+        self._window, self._samples = {}, 0
+        self._window_started = time.monotonic()
+
+        stages = {
+            stage: histogram.summary()
+            for stage, histogram in window.items()
+        }
+        logger.info(
+            "Sending pipeline metrics: %s",
+            {
+                stage: {k: v for k, v in summary.items() if k != "histogram"}
+                for stage, summary in stages.items()
+            },
+        )
+        try:
             await client.send_agent_event(
                 event_name="pipeline_metrics",
-                agent_id=agent_id,
-                run_id=run_id,
+                agent_id=self.agent_id,
+                run_id=self.run_id,
                 event_input={
-                    "metrics": pipeline_metrics,
-                    "latencies": metrics_latencies,
+                    "window_seconds": round(
+                        self._window_started - started, 1
+                    ),
+                    "stages": stages,
                 },
             )
-    except (TypeError, ValueError) as exc:
-        logger.exception("Error processing metrics data: %s", exc)
-        raise
-    except Exception as exc:
-        logger.exception(
-            "Unexpected error sending pipeline metrics: %s", exc
-        )
-        raise
+        except Exception as exc:
+            logger.warning("Error sending pipeline metrics: %s", exc)
+            # Keep the samples for the next window rather than lose them.
+            for stage, histogram in window.items():
+                self._window.setdefault(
+                    stage, LatencyHistogram()
+                ).merge(histogram)
+                self._samples += histogram.count
+            self._window_started = started
+
+    async def aclose(self) -> None:
+        """Stop the timer and send what is left of the window."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()
 
 
 def setup_pipeline_metrics(
@@ -75,10 +208,11 @@ def setup_pipeline_metrics(
     agent_id: str,
     run_id: str,
     usage_collector: metrics.UsageCollector,
-) -> None:
-    """Configure the pipeline to send metrics when they are collected.
+) -> MetricsAggregator:
+    """Configure the pipeline to aggregate metrics as they are collected.
 
-    Attaches a callback to the pipeline that logs metrics data and sends it to restack.
+    Attaches a callback to the pipeline that logs metrics data and
+    records its latencies in an aggregator, which sends them to restack.
 
     Args:
     pipeline (VoicePipelineAgent): The pipeline instance.
@@ -86,7 +220,12 @@ def setup_pipeline_metrics(
     run_id (str): The current run identifier.
     usage_collector (metrics.UsageCollector): Collector for aggregating usage metrics.
 
+    Returns:
+    MetricsAggregator: The started aggregator, to be closed at the end of the call.
+
     """
+    aggregator = MetricsAggregator(agent_id, run_id)
+    aggregator.start()
 
     @pipeline.on("metrics_collected")
     def on_metrics_collected(
@@ -94,13 +233,10 @@ def setup_pipeline_metrics(
     ) -> None:
         try:
             metrics.log_metrics(pipeline_metrics)
-            track_task(
-                asyncio.create_task(
-                    send_metrics(
-                        pipeline_metrics, agent_id, run_id
-                    )
-                )
-            )
+            for stage, value_ms in stage_latencies(
+                pipeline_metrics
+            ).items():
+                aggregator.record(stage, value_ms)
             usage_collector.collect(pipeline_metrics)
         except (TypeError, ValueError) as exc:
             logger.exception(
@@ -113,3 +249,5 @@ def setup_pipeline_metrics(
                 exc,
             )
             raise
+
+    return aggregator
@@ -3,6 +3,7 @@
 This module provides functions to create and configure LiveKit pipeline.
 """
 
+import aiohttp
 from livekit.agents import JobContext
 from livekit.agents.pipeline import VoicePipelineAgent
 from livekit.plugins import (
@@ -14,6 +15,73 @@ from livekit.plugins import (
 from src.utils import logger
 
 
+def create_stt(
+    http_session: aiohttp.ClientSession | None = None,
+    base_url: str = deepgram.stt.BASE_URL,
+) -> deepgram.STT:
+    """Create the pipeline's speech-to-text service.
+
+    Args:
+        http_session (aiohttp.ClientSession | None): Session to connect with, outside a job.
+        base_url (str): The Deepgram listen endpoint.
+
+    Returns:
+        deepgram.STT: The configured STT service.
+    """
+    return deepgram.STT(
+        model="nova-3-general",
+        http_session=http_session,
+        base_url=base_url,
+    )
+
+
+def create_llm(agent_id: str, agent_url: str) -> openai.LLM:
+    """Create the LLM client that streams replies from the Restack agent.
+
+    Args:
+        agent_id (str): The identifier for the agent.
+        agent_url (str): The URL for the agent backend.
+
+    Returns:
+        openai.LLM: The configured LLM client.
+    """
+    return openai.LLM(
+        api_key=f"{agent_id}-livekit",
+        base_url=agent_url,
+    )
+
+
+def create_tts(
+    http_session: aiohttp.ClientSession | None = None,
+    base_url: str | None = None,
+) -> elevenlabs.TTS:
+    """Create the pipeline's text-to-speech service.
+
+    Args:
+        http_session (aiohttp.ClientSession | None): Session to connect with, outside a job.
+        base_url (str | None): The ElevenLabs API URL, if not the default.
+
+    Returns:
+        elevenlabs.TTS: The configured TTS service.
+    """
+    return elevenlabs.TTS(
+        voice=elevenlabs.tts.Voice(
+            id="UgBBYS2sOqTuMpoF3BR0",
+            name="Mark",
+            category="premade",
+            settings=elevenlabs.tts.VoiceSettings(
+                stability=0,
+                similarity_boost=0,
+                style=0,
+                speed=1.01,
+                use_speaker_boost=False
+            ),
+        ),
+        http_session=http_session,
+        base_url=base_url,
+    )
+
+
 def create_livekit_pipeline(
     ctx: JobContext, agent_id: str, agent_url: str
 ) -> VoicePipelineAgent:
@@ -35,27 +103,9 @@ def create_livekit_pipeline(
         )
         return VoicePipelineAgent(
             vad=ctx.proc.userdata["vad"],
-            stt=deepgram.STT(
-                model="nova-3-general",
-            ),
-            llm=openai.LLM(
-                api_key=f"{agent_id}-livekit",
-                base_url=agent_url,
-            ),
-            tts=elevenlabs.TTS(
-                voice=elevenlabs.tts.Voice(
-                    id="UgBBYS2sOqTuMpoF3BR0",
-                    name="Mark",
-                    category="premade",
-                    settings=elevenlabs.tts.VoiceSettings(
-                        stability=0,
-                        similarity_boost=0,
-                        style=0,
-                        speed=1.01,
-                        use_speaker_boost=False
-                    ),
-                ),
-            ),
+            stt=create_stt(),
+            llm=create_llm(agent_id, agent_url),
+            tts=create_tts(),
             turn_detector=turn_detector.EOUModel(),
         )
     except Exception as e:
@@ -0,0 +1,197 @@
+"""Pool.
+
+Lets one worker host many calls at once.
+
+With WORKER_MODE=shared every call runs as a thread of the worker
+process rather than in a process of its own, so what is loaded once per
+process is shared by all of its calls: the Silero VAD model, and the
+Restack client's connection to the engine. The turn detector already
+runs in the worker's inference process in both modes, and each call
+only holds a handle to it.
+
+In either mode calls are admitted against measured CPU headroom: the
+worker reports itself full, and turns down job requests, once its CPU
+use plus what another call is measured to cost would go over
+WORKER_LOAD_THRESHOLD.
+"""
+
+import os
+import threading
+
+import aiohttp
+from livekit.agents import (
+    JobExecutorType,
+    JobProcess,
+    JobRequest,
+    Worker,
+    utils,
+)
+from livekit.plugins import silero
+from src.utils import logger
+
+WORKER_MODE = os.getenv("WORKER_MODE", "process")
+# Share of the machine's CPU above which no more calls are taken.
+WORKER_LOAD_THRESHOLD = float(
+    os.getenv("WORKER_LOAD_THRESHOLD", "0.75")
+)
+# Hard cap on concurrent calls per worker, 0 for none.
+WORKER_MAX_CALLS = int(os.getenv("WORKER_MAX_CALLS", "0"))
+# Starting estimate of a call's share of the CPU, refined as calls run.
+CALL_CPU_ESTIMATE = float(os.getenv("CALL_CPU_ESTIMATE", "0.05"))
+# Processes kept prewarmed for new calls in process mode.
+WORKER_IDLE_PROCESSES = int(os.getenv("WORKER_IDLE_PROCESSES", "3"))
+CPU_SAMPLE_INTERVAL = 0.5
+# Weight of each new measurement in the per-call estimate.
+CALL_CPU_SMOOTHING = 0.2
+# Provider endpoints connected to while waiting for the participant.
+PROVIDER_URLS = (
+    "https://api.deepgram.com",
+    "https://api.elevenlabs.io",
+)
+
+_vad: silero.VAD | None = None
+_vad_lock = threading.Lock()
+
+
+def shared_vad() -> silero.VAD:
+    """Return the process's Silero VAD, loading it on first use.
+
+    Each stream of the VAD keeps its own state and executor, so one
+    model serves any number of concurrent calls.
+    """
+    global _vad  # noqa: PLW0603
+    with _vad_lock:
+        if _vad is None:
+            logger.info("Loading VAD model...")
+            _vad = silero.VAD.load()
+            logger.info("VAD model loaded successfully.")
+        return _vad
+
+
+def prewarm(proc: JobProcess) -> None:
+    """Prewarm the system by loading necessary models before the agent starts."""
+    proc.userdata["vad"] = shared_vad()
+
+
+async def warm_connections(http_session: aiohttp.ClientSession) -> None:
+    """Open the call's connections to the STT and TTS providers.
+
+    The connections stay in the session's pool, so the first transcript
+    and the welcome message skip the TCP and TLS handshakes.
+    """
+    for url in PROVIDER_URLS:
+        try:
+            async with http_session.head(url) as response:
+                await response.read()
+        except aiohttp.ClientError as exc:
+            logger.warning("Could not warm connection to %s: %s", url, exc)
+
+
+class CpuHeadroom:
+    """Tracks the worker's CPU use and what one call adds to it."""
+
+    def __init__(self) -> None:
+        self._monitor = utils.hw.get_cpu_monitor()
+        self._cpu = utils.MovingAverage(5)
+        self._idle_cpu = 0.0
+        self._call_cpu = CALL_CPU_ESTIMATE
+        self._calls = 0
+        # Calls accepted since the worker last reported its jobs.
+        self._admitted = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._sample,
+                daemon=True,
+                name="worker_cpu_headroom",
+            )
+            self._thread.start()
+
+    def _sample(self) -> None:
+        while True:
+            cpu = self._monitor.cpu_percent(interval=CPU_SAMPLE_INTERVAL)
+            with self._lock:
+                self._cpu.add_sample(cpu)
+
+    def _projected_load(self) -> float:
+        """CPU use once the calls already accepted and one more are running."""
+        return self._cpu.get_avg() + self._call_cpu * (self._admitted + 1)
+
+    def load(self, worker: Worker) -> float:
+        """Load reported to LiveKit; at WORKER_LOAD_THRESHOLD it is full."""
+        self._start()
+        calls = len(worker.active_jobs)
+        with self._lock:
+            cpu = self._cpu.get_avg()
+            # Only measure once the running calls have been sampled.
+            if calls == self._calls and self._cpu.size() == 5:
+                if calls == 0:
+                    self._idle_cpu = cpu
+                else:
+                    measured = max(cpu - self._idle_cpu, 0) / calls
+                    self._call_cpu += CALL_CPU_SMOOTHING * (
+                        measured - self._call_cpu
+                    )
+            elif calls != self._calls:
+                self._cpu.reset()
+            self._calls = calls
+            self._admitted = 0
+            if WORKER_MAX_CALLS and calls >= WORKER_MAX_CALLS:
+                return 1.0
+            return min(self._projected_load(), 1.0)
+
+    def admit(self) -> bool:
+        """Reserve room for one more call, if there is any left."""
+        self._start()
+        with self._lock:
+            if WORKER_MAX_CALLS and (
+                self._calls + self._admitted >= WORKER_MAX_CALLS
+            ):
+                return False
+            if self._projected_load() >= WORKER_LOAD_THRESHOLD:
+                return False
+            self._admitted += 1
+            return True
+
+
+cpu_headroom = CpuHeadroom()
+
+
+def load_fnc(worker: Worker) -> float:
+    return cpu_headroom.load(worker)
+
+
+async def request_fnc(req: JobRequest) -> None:
+    """Accept the job only if the worker has headroom for another call.
+
+    LiveKit offers a rejected job to another worker.
+    """
+    if cpu_headroom.admit():
+        await req.accept()
+    else:
+        logger.warning("Rejecting job %s: no CPU headroom", req.id)
+        await req.reject()
+
+
+def worker_options() -> dict:
+    """WorkerOptions for the configured WORKER_MODE.
+
+    Only module-level functions are passed, as WorkerOptions has to be
+    picklable.
+    """
+    options = {
+        "prewarm_fnc": prewarm,
+        "request_fnc": request_fnc,
+        "load_fnc": load_fnc,
+        "load_threshold": WORKER_LOAD_THRESHOLD,
+    }
+    if WORKER_MODE == "shared":
+        # Calls start in a thread, with the models already loaded.
+        options["job_executor_type"] = JobExecutorType.THREAD
+        options["num_idle_processes"] = 0
+    else:
+        options["num_idle_processes"] = WORKER_IDLE_PROCESSES
+    return options
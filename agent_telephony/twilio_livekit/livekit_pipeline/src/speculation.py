@@ -0,0 +1,75 @@
+"""Speculation.
+
+Sends the user's partial transcript to the Restack agent as soon as they
+pause, so the reply can be generated while the turn detector is still
+deciding whether the turn is over.
+"""
+
+import asyncio
+
+from livekit.agents.pipeline import VoicePipelineAgent
+from src.restack.client import client
+from src.utils import logger, track_task
+
+
+def partial_transcript(pipeline: VoicePipelineAgent) -> str:
+    """Return what the user has said so far in the current turn.
+
+    VoicePipelineAgent only exposes the transcript once the turn is
+    committed, so this reads the text it has accumulated: the final
+    transcripts plus the interim one of the segment still in progress.
+    """
+    final = pipeline._transcribed_text  # noqa: SLF001
+    interim = pipeline._transcribed_interim_text  # noqa: SLF001
+    if not interim or final.endswith(interim):
+        return final
+    return f"{final} {interim}".strip()
+
+
+async def send_speculation(
+    transcript: str, agent_id: str, run_id: str
+) -> None:
+    """Send a partial transcript to the agent's speculate event.
+
+    Args:
+        transcript (str): The user's words so far.
+        agent_id (str): The identifier for the agent.
+        run_id (str): The current execution run identifier.
+
+    """
+    try:
+        await client.send_agent_event(
+            event_name="speculate",
+            agent_id=agent_id,
+            run_id=run_id,
+            event_input={"transcript": transcript},
+        )
+    except Exception as exc:
+        # Speculation only saves time; the committed turn is still
+        # answered without it.
+        logger.warning("Error sending speculation: %s", exc)
+
+
+def setup_speculation(
+    pipeline: VoicePipelineAgent, agent_id: str, run_id: str
+) -> None:
+    """Speculate on the reply whenever the user stops speaking.
+
+    Args:
+    pipeline (VoicePipelineAgent): The pipeline instance.
+    agent_id (str): The identifier for the agent.
+    run_id (str): The current run identifier.
+
+    """
+
+    @pipeline.on("user_stopped_speaking")
+    def on_user_stopped_speaking() -> None:
+        transcript = partial_transcript(pipeline)
+        if not transcript:
+            return
+        logger.info("Speculating on partial transcript: %s", transcript)
+        track_task(
+            asyncio.create_task(
+                send_speculation(transcript, agent_id, run_id)
+            )
+        )
@@ -11,19 +11,20 @@ from typing import Any
 from livekit.agents import (
     AutoSubscribe,
     JobContext,
-    JobProcess,
     WorkerOptions,
     cli,
     metrics,
+    utils,
 )
-from livekit.plugins import silero
 from src.env_check import check_env_vars
 from src.metrics import setup_pipeline_metrics
 from src.pipeline import create_livekit_pipeline
+from src.pool import warm_connections, worker_options
 from src.restack.utils import (
     extract_restack_agent_info,
     get_restack_agent_url,
 )
+from src.speculation import setup_speculation
 from src.utils import (
     logger,
     parse_metadata,
@@ -31,13 +32,6 @@ from src.utils import (
 )
 
 
-def prewarm(proc: JobProcess) -> None:
-    """Prewarm the system by loading necessary models before the agent starts."""
-    logger.info("Prewarming: loading VAD model...")
-    proc.userdata["vad"] = silero.VAD.load()
-    logger.info("VAD model loaded successfully.")
-
-
 async def entrypoint(ctx: JobContext) -> None:
     """Run main entrypoint for LiveKit.
 
@@ -67,6 +61,14 @@ async def entrypoint(ctx: JobContext) -> None:
 
     await ctx.connect(auto_subscribe=AutoSubscribe.AUDIO_ONLY)
 
+    # Open provider connections while the participant joins
+
+    track_task(
+        asyncio.create_task(
+            warm_connections(utils.http_context.http_session())
+        )
+    )
+
     participant = await ctx.wait_for_participant()
 
     logger.info(
@@ -80,12 +82,17 @@ async def entrypoint(ctx: JobContext) -> None:
 
     usage_collector = metrics.UsageCollector()
 
-    setup_pipeline_metrics(
+    metrics_aggregator = setup_pipeline_metrics(
         pipeline, agent_id, run_id, usage_collector
     )
+    ctx.add_shutdown_callback(metrics_aggregator.aclose)
 
     usage_collector.get_summary()
 
+    # Pre-generate replies from partial transcripts
+
+    setup_speculation(pipeline, agent_id, run_id)
+
     # Allow pipeline to speak when receiving data
 
     async def say(text: str) -> None:
@@ -134,6 +141,6 @@ if __name__ == "__main__":
         WorkerOptions(
             entrypoint_fnc=entrypoint,
             agent_name="AgentTwilio",
-            prewarm_fnc=prewarm,
+            **worker_options(),
         )
     )
@@ -1,13 +1,16 @@
 from datetime import timedelta
+from typing import Any
 
 from pydantic import BaseModel
 from restack_ai.agent import (
     NonRetryableError,
     agent,
+    agent_info,
     import_functions,
     log,
 )
 
+from src.agents.tool_registry import ToolRegistry
 from src.workflows.todo_execute import (
     TodoExecute,
     TodoExecuteParams,
@@ -43,31 +46,89 @@ class AgentTodo:
             role="system",
             content="You are an AI assistant that creates and execute todos. Eveything the user asks needs to be a todo, that needs to be created and then executed if the user wants to.",
         )]
+        # Number of messages llm_chat already holds in its conversation store.
+        self.history_length = 0
+        self.tools = ToolRegistry()
+        self.tools.register(
+            pydantic_function_tool(
+                model=TodoCreateParams,
+                name=todo_create.__name__,
+                description="Create a new todo",
+            ),
+            self.todo_create_tool,
+        )
+        self.tools.register(
+            pydantic_function_tool(
+                model=TodoExecuteParams,
+                name=TodoExecute.__name__,
+                description="Execute a todo, needs to be created first and need confirmation from user before executing.",
+            ),
+            self.todo_execute_tool,
+        )
+
+    async def chat(self, **chat_input: Any) -> Any:
+        """Call llm_chat with only the messages it has not seen yet."""
+        try:
+            completion = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages[self.history_length :],
+                    conversation_id=agent_info().run_id,
+                    history_length=self.history_length,
+                    **chat_input,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        except Exception:
+            if self.history_length == 0:
+                raise
+            # The worker serving this step may not have our history cached
+            # (restart or another replica), so resend it in full once.
+            log.warning("llm_chat failed with history delta, resending history")
+            completion = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages,
+                    conversation_id=agent_info().run_id,
+                    **chat_input,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        self.history_length = len(self.messages)
+        return completion
+
+    async def todo_create_tool(self, tool_call_id: str, arguments: str) -> Any:
+        args = TodoCreateParams.model_validate_json(arguments)
+        log.info(f"calling {todo_create.__name__} with args: {args}", tool_call_id=tool_call_id)
+        try:
+            return await agent.step(
+                function=todo_create,
+                function_input=args,
+            )
+        except Exception as e:
+            error_message = f"Error during todo_create: {e}"
+            raise NonRetryableError(error_message) from e
 
+    async def todo_execute_tool(self, tool_call_id: str, arguments: str) -> Any:
+        args = TodoExecuteParams.model_validate_json(arguments)
+        log.info(f"calling {TodoExecute.__name__} with args: {args}", tool_call_id=tool_call_id)
+        try:
+            return await agent.child_execute(
+                workflow=TodoExecute,
+                workflow_id=tool_call_id,
+                workflow_input=args,
+            )
+        except Exception as e:
+            error_message = f"Error during TodoExecute: {e}"
+            raise NonRetryableError(error_message) from e
 
     @agent.event
     async def messages(self, messages_event: MessagesEvent) -> list[Message]:
         try:
             self.messages.extend(messages_event.messages)
 
-            tools = [
-                pydantic_function_tool(
-                    model=TodoCreateParams,
-                    name=todo_create.__name__,
-                    description="Create a new todo",
-                ),
-                pydantic_function_tool(
-                    model=TodoExecuteParams,
-                    name=TodoExecute.__name__,
-                    description="Execute a todo, needs to be created first and need confirmation from user before executing.",
-                ),
-            ]
             try:
-                completion = await agent.step(
-                    function=llm_chat,
-                    function_input=LlmChatInput(messages=self.messages, tools=tools),
-                    start_to_close_timeout=timedelta(seconds=120),
-                )
+                completion = await self.chat(tools=self.tools.definitions)
             except Exception as e:
                 error_message = f"Error during llm_chat: {e}"
                 raise NonRetryableError(error_message) from e
@@ -85,105 +146,31 @@ class AgentTodo:
                 log.info(f"tool_calls: {tool_calls}")
 
                 if tool_calls:
-                    for tool_call in tool_calls:
-                        log.info(f"tool_call: {tool_call}")
-
-                        name = tool_call.function.name
-
-                        match name:
-                            case todo_create.__name__:
-                                args = TodoCreateParams.model_validate_json(
-                                    tool_call.function.arguments
-                                )
-
-                                try:
-                                    result = await agent.step(
-                                        function=todo_create,
-                                        function_input=args,
-                                    )
-                                except Exception as e:
-                                    error_message = f"Error during todo_create: {e}"
-                                    raise NonRetryableError(error_message) from e
-                                else:
-                                    self.messages.append(
-                                        Message(
-                                            role="tool",
-                                            tool_call_id=tool_call.id,
-                                            content=str(result),
-                                        )
-                                    )
-                                    try:
-                                        completion_with_tool_call = await agent.step(
-                                            function=llm_chat,
-                                            function_input=LlmChatInput(
-                                                messages=self.messages, tools=tools
-                                            ),
-                                            start_to_close_timeout=timedelta(seconds=120),
-                                        )
-                                    except Exception as e:
-                                        error_message = f"Error during llm_chat: {e}"
-                                        raise NonRetryableError(error_message) from e
-                                    else:
-                                        self.messages.append(
-                                            Message(
-                                                role="assistant",
-                                                content=completion_with_tool_call.choices[
-                                                    0
-                                                ].message.content
-                                                or "",
-                                            )
-                                        )
-                            case TodoExecute.__name__:
-                                args = TodoExecuteParams.model_validate_json(
-                                    tool_call.function.arguments
-                                )
-
-                                try:
-                                    result = await agent.child_execute(
-                                        workflow=TodoExecute,
-                                        workflow_id=tool_call.id,
-                                        workflow_input=args,
-                                    )
-                                except Exception as e:
-                                    error_message = f"Error during TodoExecute: {e}"
-                                    raise NonRetryableError(error_message) from e
-                                else:
-                                    self.messages.append(
-                                        Message(
-                                            role="tool",
-                                            tool_call_id=tool_call.id,
-                                            content=str(result),
-                                        )
-                                    )
-
-                                    try:
-                                        completion_with_tool_call = await agent.step(
-                                            function=llm_chat,
-                                            function_input=LlmChatInput(
-                                            messages=self.messages, tools=tools
-                                        ),
-                                        start_to_close_timeout=timedelta(seconds=120),
-                                        )
-                                    except Exception as e:
-                                        error_message = f"Error during llm_chat: {e}"
-                                        raise NonRetryableError(error_message) from e
-                                    else:
-                                        self.messages.append(
-                                            Message(
-                                                role="assistant",
-                                                content=completion_with_tool_call.choices[
-                                                    0
-                                                ].message.content
-                                                or "",
-                                            )
-                                        )
-                else:
-                    self.messages.append(
-                        Message(
-                            role="assistant",
-                            content=completion.choices[0].message.content or "",
-                        )
+                    # Run every tool call of the turn at once, then answer
+                    # with a single completion over all of their results.
+                    results = await self.tools.execute(tool_calls)
+                    self.messages.extend(
+                        Message(role="tool", tool_call_id=tool_call.id, content=result)
+                        for tool_call, result in zip(tool_calls, results, strict=True)
                     )
+
+                    try:
+                        completion_with_tool_calls = await self.chat(
+                            tools=self.tools.definitions
+                        )
+                    except Exception as e:
+                        error_message = f"Error during llm_chat: {e}"
+                        raise NonRetryableError(error_message) from e
+                    else:
+                        self.messages.append(
+                            Message(
+                                role="assistant",
+                                content=completion_with_tool_calls.choices[
+                                    0
+                                ].message.content
+                                or "",
+                            )
+                        )
         except Exception as e:
             log.error(f"Error during message event: {e}")
             raise
@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from openai.types.chat.chat_completion_message_tool_call import (
+        ChatCompletionMessageToolCall,
+    )
+    from openai.types.chat.chat_completion_tool_param import (
+        ChatCompletionToolParam,
+    )
+
+# Called with the tool call id and the raw JSON arguments from the model.
+ToolHandler = Callable[[str, str], Awaitable[Any]]
+
+
+class ToolRegistry:
+    """Maps tool names to handlers and runs a turn's tool calls together."""
+
+    def __init__(self) -> None:
+        self._definitions: dict[str, "ChatCompletionToolParam"] = {}
+        self._handlers: dict[str, ToolHandler] = {}
+
+    def register(
+        self, definition: "ChatCompletionToolParam", handler: ToolHandler
+    ) -> None:
+        name = definition["function"]["name"]
+        self._definitions[name] = definition
+        self._handlers[name] = handler
+
+    @property
+    def definitions(self) -> list["ChatCompletionToolParam"]:
+        return list(self._definitions.values())
+
+    async def _run(self, tool_call: "ChatCompletionMessageToolCall") -> str:
+        handler = self._handlers.get(tool_call.function.name)
+        if handler is None:
+            return f"Unknown tool: {tool_call.function.name}"
+        result = await handler(tool_call.id, tool_call.function.arguments)
+        return str(result)
+
+    async def execute(
+        self, tool_calls: list["ChatCompletionMessageToolCall"]
+    ) -> list[str]:
+        """Run all tool calls concurrently, results in call order."""
+        return list(
+            await asyncio.gather(*(self._run(tool_call) for tool_call in tool_calls))
+        )
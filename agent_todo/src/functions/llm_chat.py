@@ -2,7 +2,6 @@ import os
 from typing import Literal
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from openai.types.chat.chat_completion import ChatCompletion
 from openai.types.chat.chat_completion_message_tool_call import (
     ChatCompletionMessageToolCall,
@@ -13,6 +12,9 @@ from openai.types.chat.chat_completion_tool_param import (
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.conversation_store import conversation_store
+from src.functions.utils.llm_client import create_chat_completion
+
 load_dotenv()
 
 
@@ -27,6 +29,10 @@ class LlmChatInput(BaseModel):
     system_content: str | None = None
     model: str | None = None
     messages: list[Message] | None = None
+    # When set, messages only holds what was added after the first
+    # history_length messages and the rest is read from the local store.
+    conversation_id: str | None = None
+    history_length: int = 0
     tools: list[ChatCompletionToolParam] | None = None
 
 
@@ -43,20 +49,27 @@ async def llm_chat(function_input: LlmChatInput) -> ChatCompletion:
         if os.environ.get("RESTACK_API_KEY") is None:
             raise_exception("RESTACK_API_KEY is not set")
 
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
-
         log.info("pydantic_function_tool", tools=function_input.tools)
 
+        messages = [
+            message.model_dump(exclude_none=True)
+            for message in function_input.messages or []
+        ]
+        if function_input.conversation_id:
+            messages = conversation_store().extend(
+                function_input.conversation_id,
+                function_input.history_length,
+                messages,
+            )
+
         if function_input.system_content:
-            function_input.messages.append(
-                Message(role="system", content=function_input.system_content or "")
+            messages.append(
+                {"role": "system", "content": function_input.system_content}
             )
 
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
             model=function_input.model or "gpt-4.1-mini",
-            messages=function_input.messages,
+            messages=messages,
             tools=function_input.tools,
         )
     except Exception as e:
@@ -1,13 +1,17 @@
 from datetime import timedelta
+from typing import Any
 
 from pydantic import BaseModel
 from restack_ai.agent import (
     NonRetryableError,
     agent,
+    agent_info,
     import_functions,
     log,
 )
 
+from src.agents.tool_registry import ToolRegistry
+
 with import_functions():
     from openai import pydantic_function_tool
 
@@ -38,28 +42,69 @@ class AgentChatToolFunctions:
             role="system",
             content="You are a helpful assistant that can help with sales data."
         )]
-
-    @agent.event
-    async def messages(self, messages_event: MessagesEvent) -> list[Message]:
-        log.info(f"Received messages: {messages_event.messages}")
-        self.messages.extend(messages_event.messages)
-
-        tools = [
+        # Number of messages llm_chat already holds in its conversation store.
+        self.history_length = 0
+        self.tools = ToolRegistry()
+        self.tools.register(
             pydantic_function_tool(
                 model=LookupSalesInput,
                 name=lookup_sales.__name__,
-                description="Lookup sales for a given category",
+                description="Lookup sales for a given category, optionally filtered by price and discount",
             ),
-        ]
+            self.lookup_sales_tool,
+        )
 
+    async def chat(self, **chat_input: Any) -> Any:
+        """Call llm_chat with only the messages it has not seen yet."""
         try:
             completion = await agent.step(
                 function=llm_chat,
                 function_input=LlmChatInput(
-                    messages=self.messages, tools=tools
+                    messages=self.messages[self.history_length :],
+                    conversation_id=agent_info().run_id,
+                    history_length=self.history_length,
+                    **chat_input,
                 ),
                 start_to_close_timeout=timedelta(seconds=120),
             )
+        except Exception:
+            if self.history_length == 0:
+                raise
+            # The worker serving this step may not have our history cached
+            # (restart or another replica), so resend it in full once.
+            log.warning("llm_chat failed with history delta, resending history")
+            completion = await agent.step(
+                function=llm_chat,
+                function_input=LlmChatInput(
+                    messages=self.messages,
+                    conversation_id=agent_info().run_id,
+                    **chat_input,
+                ),
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        self.history_length = len(self.messages)
+        return completion
+
+    async def lookup_sales_tool(self, tool_call_id: str, arguments: str) -> Any:
+        args = LookupSalesInput.model_validate_json(arguments)
+        log.info(f"calling {lookup_sales.__name__} with args: {args}", tool_call_id=tool_call_id)
+        try:
+            return await agent.step(
+                function=lookup_sales,
+                function_input=args,
+                start_to_close_timeout=timedelta(seconds=120),
+            )
+        except Exception as e:
+            error_message = f"Error during lookup_sales: {e}"
+            raise NonRetryableError(error_message) from e
+
+    @agent.event
+    async def messages(self, messages_event: MessagesEvent) -> list[Message]:
+        log.info(f"Received messages: {messages_event.messages}")
+        self.messages.extend(messages_event.messages)
+
+        try:
+            completion = await self.chat(tools=self.tools.definitions)
         except Exception as e:
             error_message = f"Error during llm_chat: {e}"
             raise NonRetryableError(error_message) from e
@@ -78,60 +123,27 @@ class AgentChatToolFunctions:
             log.info(f"tool_calls: {tool_calls}")
 
             if tool_calls:
-                for tool_call in tool_calls:
-                    log.info(f"tool_call: {tool_call}")
-
-                    name = tool_call.function.name
-
-                    match name:
-                        case lookup_sales.__name__:
-                            args = LookupSalesInput.model_validate_json(
-                                tool_call.function.arguments
-                            )
-
-                            log.info(f"calling {name} with args: {args}")
-
-                            try:
-                                result = await agent.step(
-                                    function=lookup_sales,
-                                    function_input=LookupSalesInput(category=args.category),
-                                    start_to_close_timeout=timedelta(seconds=120),
-                                )
-                            except Exception as e:
-                                error_message = f"Error during lookup_sales: {e}"
-                                raise NonRetryableError(error_message) from e
-                            else:
-                                self.messages.append(
-                                    Message(
-                                        role="tool",
-                                        tool_call_id=tool_call.id,
-                                        content=str(result),
-                                    )
-                                )
-
-                                try:
-                                    completion_with_tool_call = await agent.step(
-                                        function=llm_chat,
-                                        function_input=LlmChatInput(
-                                            messages=self.messages
-                                        ),
-                                        start_to_close_timeout=timedelta(seconds=120),
-                                    )
-                                except Exception as e:
-                                    error_message = f"Error during llm_chat: {e}"
-                                    raise NonRetryableError(error_message) from e
-                                else:
-                                    self.messages.append(
-                                        Message(
-                                            role="assistant",
-                                            content=completion_with_tool_call.choices[
-                                                0
-                                            ].message.content
-                                            or "",
-                                        )
-                                    )
-            else:
-                pass
+                # Run every tool call of the turn at once, then answer with a
+                # single completion over all of their results.
+                results = await self.tools.execute(tool_calls)
+                self.messages.extend(
+                    Message(role="tool", tool_call_id=tool_call.id, content=result)
+                    for tool_call, result in zip(tool_calls, results, strict=True)
+                )
+
+                try:
+                    completion_with_tool_calls = await self.chat()
+                except Exception as e:
+                    error_message = f"Error during llm_chat: {e}"
+                    raise NonRetryableError(error_message) from e
+                else:
+                    self.messages.append(
+                        Message(
+                            role="assistant",
+                            content=completion_with_tool_calls.choices[0].message.content
+                            or "",
+                        )
+                    )
 
             return self.messages
 
@@ -1,8 +1,19 @@
-from typing import Literal
+import json
+import os
+from pathlib import Path
+from typing import Any, Literal
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.sales_table import (
+    ColumnarSalesTable,
+    SalesBackend,
+    SalesQuery,
+    get_sales_backend,
+    set_sales_backend,
+)
+
 
 class SalesItem(BaseModel):
     item_id: int
@@ -15,95 +26,135 @@ class SalesItem(BaseModel):
 
 class LookupSalesInput(BaseModel):
     category: Literal["snowboard", "apparel", "boots", "accessories", "any"]
+    min_price_usd: float | None = Field(
+        default=None, description="Minimum sale price in USD"
+    )
+    max_price_usd: float | None = Field(
+        default=None, description="Maximum sale price in USD"
+    )
+    min_discount_pct: int | None = Field(
+        default=None, description="Minimum discount in percent"
+    )
+    limit: int | None = Field(
+        default=None, ge=0, description="Maximum number of items to return"
+    )
+    offset: int | None = Field(
+        default=None, ge=0, description="Number of matching items to skip"
+    )
 
 
 class LookupSalesOutput(BaseModel):
     sales: list[SalesItem]
 
 
+DEFAULT_LIMIT = 10
+# Optional JSON lines file with one sales item per line, replaces the demo data.
+SALES_CATALOGUE_PATH = os.getenv("SALES_CATALOGUE_PATH")
+
+DEMO_CATALOGUE = [
+    SalesItem(
+        item_id=101,
+        type="snowboard",
+        name="Alpine Blade",
+        retail_price_usd=450,
+        sale_price_usd=360,
+        sale_discount_pct=20,
+    ),
+    SalesItem(
+        item_id=102,
+        type="snowboard",
+        name="Peak Bomber",
+        retail_price_usd=499,
+        sale_price_usd=374,
+        sale_discount_pct=25,
+    ),
+    SalesItem(
+        item_id=201,
+        type="apparel",
+        name="Thermal Jacket",
+        retail_price_usd=120,
+        sale_price_usd=84,
+        sale_discount_pct=30,
+    ),
+    SalesItem(
+        item_id=202,
+        type="apparel",
+        name="Insulated Pants",
+        retail_price_usd=150,
+        sale_price_usd=112,
+        sale_discount_pct=25,
+    ),
+    SalesItem(
+        item_id=301,
+        type="boots",
+        name="Glacier Grip",
+        retail_price_usd=250,
+        sale_price_usd=200,
+        sale_discount_pct=20,
+    ),
+    SalesItem(
+        item_id=302,
+        type="boots",
+        name="Summit Steps",
+        retail_price_usd=300,
+        sale_price_usd=210,
+        sale_discount_pct=30,
+    ),
+    SalesItem(
+        item_id=401,
+        type="accessories",
+        name="Goggles",
+        retail_price_usd=80,
+        sale_price_usd=60,
+        sale_discount_pct=25,
+    ),
+    SalesItem(
+        item_id=402,
+        type="accessories",
+        name="Warm Gloves",
+        retail_price_usd=60,
+        sale_price_usd=48,
+        sale_discount_pct=20,
+    ),
+]
+
+
+def load_catalogue() -> list[dict[str, Any]]:
+    if not SALES_CATALOGUE_PATH:
+        return [item.model_dump() for item in DEMO_CATALOGUE]
+    with Path(SALES_CATALOGUE_PATH).open() as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def sales_backend() -> SalesBackend:
+    """Return the process-wide backend, loading the columnar table once."""
+    backend = get_sales_backend()
+    if backend is None:
+        backend = ColumnarSalesTable(load_catalogue())
+        set_sales_backend(backend)
+    return backend
+
+
 @function.defn()
 async def lookup_sales(function_input: LookupSalesInput) -> LookupSalesOutput:
     try:
         log.info("lookup_sales function started", function_input=function_input)
 
-        items = [
-            SalesItem(
-                item_id=101,
-                type="snowboard",
-                name="Alpine Blade",
-                retail_price_usd=450,
-                sale_price_usd=360,
-                sale_discount_pct=20,
-            ),
-            SalesItem(
-                item_id=102,
-                type="snowboard",
-                name="Peak Bomber",
-                retail_price_usd=499,
-                sale_price_usd=374,
-                sale_discount_pct=25,
-            ),
-            SalesItem(
-                item_id=201,
-                type="apparel",
-                name="Thermal Jacket",
-                retail_price_usd=120,
-                sale_price_usd=84,
-                sale_discount_pct=30,
-            ),
-            SalesItem(
-                item_id=202,
-                type="apparel",
-                name="Insulated Pants",
-                retail_price_usd=150,
-                sale_price_usd=112,
-                sale_discount_pct=25,
-            ),
-            SalesItem(
-                item_id=301,
-                type="boots",
-                name="Glacier Grip",
-                retail_price_usd=250,
-                sale_price_usd=200,
-                sale_discount_pct=20,
-            ),
-            SalesItem(
-                item_id=302,
-                type="boots",
-                name="Summit Steps",
-                retail_price_usd=300,
-                sale_price_usd=210,
-                sale_discount_pct=30,
-            ),
-            SalesItem(
-                item_id=401,
-                type="accessories",
-                name="Goggles",
-                retail_price_usd=80,
-                sale_price_usd=60,
-                sale_discount_pct=25,
-            ),
-            SalesItem(
-                item_id=402,
-                type="accessories",
-                name="Warm Gloves",
-                retail_price_usd=60,
-                sale_price_usd=48,
-                sale_discount_pct=20,
-            ),
-        ]
-
-        if function_input.category == "any":
-            filtered_items = items
-        else:
-            filtered_items = [
-                item for item in items if item.type == function_input.category
-            ]
-
-        # Sort by largest discount first
-        filtered_items.sort(key=lambda x: x.sale_discount_pct, reverse=True)
-
-        return LookupSalesOutput(sales=filtered_items)
+        # Largest discount first
+        rows = sales_backend().query(
+            SalesQuery(
+                category=function_input.category,
+                min_price_usd=function_input.min_price_usd,
+                max_price_usd=function_input.max_price_usd,
+                min_discount_pct=function_input.min_discount_pct,
+                limit=DEFAULT_LIMIT
+                if function_input.limit is None
+                else function_input.limit,
+                offset=function_input.offset or 0,
+            )
+        )
+
+        return LookupSalesOutput(sales=[SalesItem(**row) for row in rows])
     except Exception as e:
         error_message = f"lookup_sales function failed: {e}"
         raise NonRetryableError(error_message) from e
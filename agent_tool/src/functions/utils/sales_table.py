@@ -0,0 +1,132 @@
+"""Columnar sales data store behind lookup_sales.
+
+Rows are held as NumPy columns, stored in descending discount order, with
+a precomputed row index per category. A query therefore never sorts and
+only looks at rows of the requested category. It scans them in chunks
+and stops as soon as offset + limit matches are found. Nothing is
+materialised for rows that are filtered out or past the page.
+
+Other backends (a database, a search service) can be plugged in with
+set_sales_backend as long as they implement SalesBackend.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+import numpy as np
+
+SCAN_CHUNK_ROWS = 4096
+
+
+@dataclass
+class SalesQuery:
+    category: str | None = None
+    min_price_usd: float | None = None
+    max_price_usd: float | None = None
+    min_discount_pct: int | None = None
+    limit: int = 10
+    offset: int = 0
+
+
+class SalesBackend(Protocol):
+    def query(self, sales_query: SalesQuery) -> list[dict[str, Any]]:
+        """Return matching rows, largest discount first."""
+        ...
+
+
+class ColumnarSalesTable:
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        discount = np.array([row["sale_discount_pct"] for row in rows], dtype=np.int64)
+        # Stable so equal discounts keep catalogue order
+        order = np.argsort(-discount, kind="stable")
+
+        self.item_id = np.array([row["item_id"] for row in rows], dtype=np.int64)[order]
+        self.name = np.array([row["name"] for row in rows], dtype=object)[order]
+        self.retail_price_usd = np.array(
+            [row["retail_price_usd"] for row in rows], dtype=np.float64
+        )[order]
+        self.sale_price_usd = np.array(
+            [row["sale_price_usd"] for row in rows], dtype=np.float64
+        )[order]
+        self.sale_discount_pct = discount[order]
+
+        self.categories, codes = np.unique(
+            np.array([row["type"] for row in rows], dtype=object),
+            return_inverse=True,
+        )
+        self.type_code = codes.reshape(-1)[order]
+        # Per category: row positions and their negated discounts, both in
+        # descending discount order, so a minimum discount is a binary search.
+        all_rows = np.arange(len(rows), dtype=np.int64)
+        self.category_rows = {None: (all_rows, -self.sale_discount_pct)}
+        for code, category in enumerate(self.categories):
+            category_rows = np.flatnonzero(self.type_code == code)
+            self.category_rows[category] = (
+                category_rows,
+                -self.sale_discount_pct[category_rows],
+            )
+
+    def __len__(self) -> int:
+        return len(self.item_id)
+
+    def _candidates(self, sales_query: SalesQuery) -> np.ndarray:
+        category = None if sales_query.category == "any" else sales_query.category
+        if category not in self.category_rows:
+            return np.empty(0, dtype=np.int64)
+        rows, negated_discount = self.category_rows[category]
+        if sales_query.min_discount_pct is not None:
+            end = np.searchsorted(
+                negated_discount, -sales_query.min_discount_pct, side="right"
+            )
+            rows = rows[:end]
+        return rows
+
+    def query(self, sales_query: SalesQuery) -> list[dict[str, Any]]:
+        rows = self._candidates(sales_query)
+        wanted = sales_query.offset + sales_query.limit
+        if sales_query.min_price_usd is None and sales_query.max_price_usd is None:
+            return self._materialise(rows[sales_query.offset : wanted])
+
+        matches = []
+        found = 0
+        for start in range(0, len(rows), SCAN_CHUNK_ROWS):
+            chunk = rows[start : start + SCAN_CHUNK_ROWS]
+            price = self.sale_price_usd[chunk]
+            mask = np.ones(len(chunk), dtype=bool)
+            if sales_query.min_price_usd is not None:
+                mask &= price >= sales_query.min_price_usd
+            if sales_query.max_price_usd is not None:
+                mask &= price <= sales_query.max_price_usd
+            chunk = chunk[mask]
+            matches.append(chunk)
+            found += len(chunk)
+            if found >= wanted:
+                break
+
+        selected = np.concatenate(matches) if matches else rows
+        return self._materialise(selected[sales_query.offset : wanted])
+
+    def _materialise(self, rows: np.ndarray) -> list[dict[str, Any]]:
+        return [
+            {
+                "item_id": int(self.item_id[row]),
+                "type": str(self.categories[self.type_code[row]]),
+                "name": str(self.name[row]),
+                "retail_price_usd": float(self.retail_price_usd[row]),
+                "sale_price_usd": float(self.sale_price_usd[row]),
+                "sale_discount_pct": int(self.sale_discount_pct[row]),
+            }
+            for row in rows
+        ]
+
+
+_backend: SalesBackend | None = None
+
+
+def set_sales_backend(backend: SalesBackend) -> None:
+    global _backend  # noqa: PLW0603
+    _backend = backend
+
+
+def get_sales_backend() -> SalesBackend | None:
+    return _backend
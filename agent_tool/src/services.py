@@ -8,10 +8,12 @@ from watchfiles import run_process
 from src.agents.chat_tool_functions import AgentChatToolFunctions
 from src.client import client
 from src.functions.llm_chat import llm_chat
-from src.functions.lookup_sales import lookup_sales
+from src.functions.lookup_sales import lookup_sales, sales_backend
 
 
 async def main() -> None:
+    # Load the sales table once, before taking any work
+    sales_backend()
     await client.start_service(
         agents=[AgentChatToolFunctions],
         functions=[lookup_sales, llm_chat],
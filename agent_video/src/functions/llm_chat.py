@@ -1,11 +1,15 @@
 import os
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
-from openai import OpenAI
 from pydantic import BaseModel, Field
 from restack_ai.function import NonRetryableError, function, stream_to_websocket
 
 from src.client import api_address
+from src.functions.utils.context_window import (
+    ContextWindow,
+    summary_messages,
+)
+from src.functions.utils.llm_client import create_chat_completion, llm_client
 
 if TYPE_CHECKING:
     from openai.resources.chat.completions import ChatCompletionChunk, Stream
@@ -23,13 +27,20 @@ class LlmChatInput(BaseModel):
     stream: bool = True
 
 
+LLM_CHAT_MAX_TOKENS = int(os.getenv("LLM_CHAT_MAX_TOKENS", "16000"))
+
+
+async def summarize(summary: str | None, messages: list[dict[str, Any]]) -> str:
+    response = await create_chat_completion(
+        model="gpt-4.1-mini",
+        messages=summary_messages(summary, messages),
+    )
+    return response.choices[0].message.content or ""
+
+
 @function.defn()
 async def llm_chat(function_input: LlmChatInput) -> str:
     try:
-        client = OpenAI(
-            base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY")
-        )
-
         if function_input.system_content:
             # Insert the system message at the beginning
             function_input.messages.insert(
@@ -38,9 +49,14 @@ async def llm_chat(function_input: LlmChatInput) -> str:
 
         # Convert Message objects to dictionaries
         messages_dicts = [message.model_dump() for message in function_input.messages]
+        # Keep the prompt within budget as the conversation grows
+        model = function_input.model or "gpt-4.1-mini"
+        messages_dicts = await ContextWindow(model, LLM_CHAT_MAX_TOKENS).fit(
+            messages_dicts, summarize
+        )
         # Get the streamed response from OpenAI API
-        response: Stream[ChatCompletionChunk] = client.chat.completions.create(
-            model=function_input.model or "gpt-4.1-mini",
+        response: Stream[ChatCompletionChunk] = llm_client().chat.completions.create(
+            model=model,
             messages=messages_dicts,
             stream=True,
         )
@@ -0,0 +1,89 @@
+"""Audio fixtures for the benchmark.
+
+A fixture is one user utterance: a mono 16-bit WAV recording, followed
+by the silence that ends the turn. Without recordings, a synthetic
+voiced signal that VAD treats as speech is used instead.
+"""
+
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+# Frames of this length are measured to find where speech ends.
+ANALYSIS_FRAME_MS = 20
+# Relative to the loudest frame, quieter frames are not speech.
+SPEECH_LEVEL = 0.1
+
+
+@dataclass
+class Fixture:
+    name: str
+    samples: np.ndarray
+    sample_rate: int
+    # Seconds from the start of the recording to the end of speech.
+    speech_end: float
+
+
+def speech_end(samples: np.ndarray, sample_rate: int) -> float:
+    """Return the end time of the last frame loud enough to be speech."""
+    size = sample_rate * ANALYSIS_FRAME_MS // 1000
+    count = len(samples) // size
+    if count == 0:
+        return 0.0
+    frames = samples[: count * size].astype(np.float32).reshape(count, size)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    voiced = np.flatnonzero(rms >= SPEECH_LEVEL * rms.max())
+    return (voiced[-1] + 1) * size / sample_rate if len(voiced) else 0.0
+
+
+def synthetic_speech(
+    seconds: float, sample_rate: int = SAMPLE_RATE, seed: int = 0
+) -> np.ndarray:
+    """A harmonic signal with a gliding pitch and syllable-rate envelope."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    pitch = 120 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 30))
+    envelope = 0.4 + 0.6 * np.abs(np.sin(2 * np.pi * 2 * t))
+    signal = voiced * envelope + 0.02 * rng.standard_normal(len(t))
+    return (signal / np.abs(signal).max() * 0.5 * 32767).astype(np.int16)
+
+
+def load_wav(path: Path) -> Fixture:
+    with wave.open(str(path), "rb") as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            msg = f"{path} must be mono 16-bit PCM"
+            raise ValueError(msg)
+        sample_rate = wav.getframerate()
+        samples = np.frombuffer(
+            wav.readframes(wav.getnframes()), dtype=np.int16
+        )
+    return Fixture(
+        name=path.stem,
+        samples=samples,
+        sample_rate=sample_rate,
+        speech_end=speech_end(samples, sample_rate),
+    )
+
+
+def load_fixtures(directory: Path | None) -> list[Fixture]:
+    """Load every *.wav in directory, or a synthetic utterance if None."""
+    if directory is None:
+        samples = synthetic_speech(2.0)
+        return [
+            Fixture(
+                name="synthetic",
+                samples=samples,
+                sample_rate=SAMPLE_RATE,
+                speech_end=speech_end(samples, SAMPLE_RATE),
+            )
+        ]
+    fixtures = [load_wav(path) for path in sorted(directory.glob("*.wav"))]
+    if not fixtures:
+        msg = f"No .wav fixtures in {directory}"
+        raise ValueError(msg)
+    return fixtures
@@ -0,0 +1,87 @@
+"""Latency percentiles and throughput of a benchmark run."""
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+# Stage latencies per turn, in seconds; see run.py for how each is timed.
+STAGES = (
+    "vad",
+    "stt",
+    "endpointing",
+    "llm_ttft",
+    "tts_ttfb",
+    "mouth_to_ear",
+)
+
+
+def summarize(
+    turns: list[dict[str, float]],
+    failures: int,
+    calls: int,
+    wall_seconds: float,
+) -> dict:
+    """Percentiles in milliseconds per stage, and turns per second."""
+    stages = {}
+    for stage in STAGES:
+        values = np.array([turn[stage] for turn in turns]) * 1000
+        if len(values) == 0:
+            continue
+        stages[stage] = {
+            **{
+                f"p{q}": float(np.percentile(values, q))
+                for q in PERCENTILES
+            },
+            "mean": float(values.mean()),
+        }
+    return {
+        "calls": calls,
+        "turns": len(turns),
+        "failures": failures,
+        "wall_seconds": wall_seconds,
+        "turns_per_second": len(turns) / wall_seconds if wall_seconds else 0.0,
+        "stages_ms": stages,
+    }
+
+
+def render(summary: dict) -> str:
+    columns = [f"p{q}" for q in PERCENTILES] + ["mean"]
+    lines = [
+        f"{summary['calls']} concurrent calls, {summary['turns']} turns, "
+        f"{summary['failures']} failed, "
+        f"{summary['turns_per_second']:.2f} turns/s",
+        f"{'stage (ms)':<16}" + "".join(f"{c:>10}" for c in columns),
+    ]
+    for stage, values in summary["stages_ms"].items():
+        lines.append(
+            f"{stage:<16}"
+            + "".join(f"{values[c]:>10.1f}" for c in columns)
+        )
+    return "\n".join(lines)
+
+
+def render_comparison(summary: dict, baseline: dict) -> str:
+    """Change of each percentile against a saved summary, in ms."""
+    columns = [f"p{q}" for q in PERCENTILES]
+    lines = [
+        f"{'change (ms)':<16}" + "".join(f"{c:>10}" for c in columns)
+    ]
+    for stage, values in summary["stages_ms"].items():
+        before = baseline["stages_ms"].get(stage)
+        if before is None:
+            continue
+        lines.append(
+            f"{stage:<16}"
+            + "".join(f"{values[c] - before[c]:>+10.1f}" for c in columns)
+        )
+    return "\n".join(lines)
+
+
+def save(summary: dict, path: Path) -> None:
+    path.write_text(json.dumps(summary, indent=2))
+
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text())
@@ -0,0 +1,355 @@
+"""Voice latency benchmark for the Pipecat pipeline.
+
+Builds the pipeline with the same factories as main, swaps the Daily
+transport for one that plays audio fixtures in real time, points the
+STT, LLM and TTS services at local stub APIs, and runs N concurrent
+simulated calls. Turn detection, transcript aggregation and LLM to TTS
+streaming are the pipeline's own.
+
+Per turn, measured from the end of the user's speech:
+
+- vad: UserStoppedSpeakingFrame from the transport
+- stt: final transcript
+- endpointing: context frame reaching the LLM
+- mouth_to_ear: first synthesised audio frame reaching the transport
+
+and per stage: llm_ttft (context frame to first token) and tts_ttfb
+(first token to first audio frame).
+
+Usage, from the project directory:
+
+    uv run python -m benchmark --calls 8 --turns 5
+"""
+
+import argparse
+import asyncio
+import collections
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.frames.frames import (
+    EndFrame,
+    Frame,
+    InputAudioRawFrame,
+    LLMTextFrame,
+    StartFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    TTSStoppedFrame,
+    UserStoppedSpeakingFrame,
+)
+from pipecat.observers.base_observer import BaseObserver
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.processors.aggregators.openai_llm_context import (
+    OpenAILLMContextFrame,
+)
+from pipecat.processors.frame_processor import FrameDirection, FrameProcessor
+from pipecat.transports.base_input import BaseInputTransport
+from pipecat.transports.base_transport import TransportParams
+
+from benchmark.fixtures import SAMPLE_RATE, Fixture, load_fixtures
+from benchmark.report import (
+    load,
+    render,
+    render_comparison,
+    save,
+    summarize,
+)
+from benchmark.stubs import StubLatency, StubServer
+from src.pipeline import create_pipeline, create_services, create_task
+
+FRAME_MS = 10
+TURN_TIMEOUT = 30.0
+# Silence between the end of a reply and the next utterance.
+TURN_GAP = 1.0
+TRANSCRIPT = "How do I build a voice agent with restack?"
+REPLY = (
+    "Restack agents stream replies from a workflow. "
+    "Start a Daily room and connect the pipeline to it."
+)
+
+
+class FixtureInput(BaseInputTransport):
+    """Input transport sending a frame every FRAME_MS, silence when idle."""
+
+    def __init__(self) -> None:
+        super().__init__(
+            TransportParams(
+                audio_in_enabled=True,
+                audio_in_sample_rate=SAMPLE_RATE,
+                vad_enabled=True,
+                vad_analyzer=SileroVADAnalyzer(),
+                vad_audio_passthrough=True,
+            )
+        )
+        self._frames: collections.deque[
+            tuple[bytes, asyncio.Future | None]
+        ] = collections.deque()
+        self._feed_task: asyncio.Task | None = None
+        self.started = asyncio.Event()
+
+    async def start(self, frame: StartFrame) -> None:
+        await super().start(frame)
+        self.started.set()
+        if not self._feed_task:
+            self._feed_task = self.create_task(self._feed())
+
+    async def stop(self, frame: EndFrame) -> None:
+        if self._feed_task:
+            await self.cancel_task(self._feed_task)
+            self._feed_task = None
+        await super().stop(frame)
+
+    async def _feed(self) -> None:
+        loop = asyncio.get_running_loop()
+        size = self.sample_rate * FRAME_MS // 1000
+        next_at = loop.time()
+        while True:
+            if self._frames:
+                audio, spoken = self._frames.popleft()
+            else:
+                audio, spoken = bytes(size * 2), None
+            await self.push_audio_frame(
+                InputAudioRawFrame(
+                    audio=audio, sample_rate=self.sample_rate, num_channels=1
+                )
+            )
+            if spoken is not None:
+                spoken.set_result(loop.time())
+            next_at += FRAME_MS / 1000
+            await asyncio.sleep(max(next_at - loop.time(), 0))
+
+    def play(self, fixture: Fixture) -> asyncio.Future:
+        """Queue a fixture; the future resolves when its speech has been sent."""
+        if fixture.sample_rate != self.sample_rate:
+            raise ValueError(
+                f"{fixture.name} is {fixture.sample_rate} Hz, "
+                f"the transport takes {self.sample_rate} Hz"
+            )
+        size = fixture.sample_rate * FRAME_MS // 1000
+        samples = fixture.samples
+        frame_count = -(-len(samples) // size)
+        # The frame holding the last voiced sample.
+        last_voiced = min(
+            max(-(-int(fixture.speech_end * fixture.sample_rate) // size) - 1, 0),
+            frame_count - 1,
+        )
+        spoken = asyncio.get_running_loop().create_future()
+        for index, start in enumerate(range(0, len(samples), size)):
+            chunk = samples[start : start + size]
+            if len(chunk) < size:
+                chunk = np.pad(chunk, (0, size - len(chunk)))
+            self._frames.append(
+                (chunk.tobytes(), spoken if index == last_voiced else None)
+            )
+        return spoken
+
+
+class FixtureOutput(FrameProcessor):
+    """Output transport that drops the bot's audio instead of playing it."""
+
+    async def process_frame(self, frame: Frame, direction: FrameDirection) -> None:
+        await super().process_frame(frame, direction)
+        if not isinstance(frame, TTSAudioRawFrame):
+            await self.push_frame(frame, direction)
+
+
+class TurnObserver(BaseObserver):
+    """Timestamps the frames that mark each stage of a turn."""
+
+    def __init__(
+        self,
+        transport_input: FrameProcessor,
+        transport_output: FrameProcessor,
+        stt: FrameProcessor,
+        llm: FrameProcessor,
+        tts: FrameProcessor,
+    ) -> None:
+        self._marks = {
+            # (source, destination) filters; None matches any processor.
+            UserStoppedSpeakingFrame: ("vad", transport_input, None),
+            TranscriptionFrame: ("stt", stt, None),
+            OpenAILLMContextFrame: ("endpointing", None, llm),
+            LLMTextFrame: ("llm_token", llm, None),
+            TTSAudioRawFrame: ("audio", None, transport_output),
+            TTSStoppedFrame: ("reply_end", tts, None),
+        }
+        self.events: dict[str, asyncio.Queue[float]] = {
+            name: asyncio.Queue() for name, _, _ in self._marks.values()
+        }
+
+    async def on_push_frame(
+        self,
+        src: FrameProcessor,
+        dst: FrameProcessor,
+        frame: Frame,
+        direction: FrameDirection,
+        timestamp: int,
+    ) -> None:
+        mark = self._marks.get(type(frame))
+        if mark is None:
+            return
+        name, source, destination = mark
+        if (source is None or src is source) and (
+            destination is None or dst is destination
+        ):
+            self.events[name].put_nowait(asyncio.get_running_loop().time())
+
+    async def after(self, name: str, moment: float) -> float:
+        """The first event named name at or after moment."""
+        while True:
+            event_at = await self.events[name].get()
+            if event_at >= moment:
+                return event_at
+
+
+class Call:
+    """One simulated call: a pipeline fed a continuous real-time stream."""
+
+    def __init__(self, stub_url: str) -> None:
+        self.input = FixtureInput()
+        output = FixtureOutput()
+        stt, llm, tts = create_services(
+            deepgram_url=stub_url,
+            openai_base_url=f"{stub_url}/v1",
+            elevenlabs_url=stub_url.replace("http", "ws", 1),
+        )
+        pipeline, _, _ = create_pipeline(self.input, output, stt, llm, tts)
+        self.observer = TurnObserver(self.input, output, stt, llm, tts)
+        self.task = create_task(pipeline, [self.observer])
+        self._runner = asyncio.create_task(
+            PipelineRunner(handle_sigint=False).run(self.task)
+        )
+
+    async def aclose(self) -> None:
+        await self.task.queue_frame(EndFrame())
+        try:
+            await asyncio.wait_for(self._runner, 5)
+        except asyncio.TimeoutError:
+            await self.task.cancel()
+
+    async def turn(self, fixture: Fixture) -> dict[str, float]:
+        await self.input.started.wait()
+        speech_end = await self.input.play(fixture)
+        vad_end = await self.observer.after("vad", speech_end)
+        final_at = await self.observer.after("stt", speech_end)
+        committed = await self.observer.after("endpointing", speech_end)
+        first_token = await self.observer.after("llm_token", committed)
+        first_audio = await self.observer.after("audio", first_token)
+        await self.observer.after("reply_end", first_audio)
+        return {
+            "vad": vad_end - speech_end,
+            "stt": final_at - speech_end,
+            "endpointing": committed - speech_end,
+            "llm_ttft": first_token - committed,
+            "tts_ttfb": first_audio - first_token,
+            "mouth_to_ear": first_audio - speech_end,
+        }
+
+
+async def run_call(
+    call_id: int,
+    fixtures: list[Fixture],
+    turns: int,
+    stub_url: str,
+    results: list[dict[str, float]],
+    failures: list[Exception],
+) -> None:
+    # Spread call starts so turns do not line up across calls.
+    await asyncio.sleep(random.uniform(0, 1))
+    call = Call(stub_url)
+    try:
+        for index in range(turns):
+            fixture = fixtures[(call_id + index) % len(fixtures)]
+            try:
+                results.append(
+                    await asyncio.wait_for(call.turn(fixture), TURN_TIMEOUT)
+                )
+            except Exception as e:  # noqa: BLE001
+                logging.warning("Call %s turn %s failed: %r", call_id, index, e)
+                failures.append(e)
+            await asyncio.sleep(TURN_GAP)
+    finally:
+        await call.aclose()
+
+
+async def run(args: argparse.Namespace) -> dict:
+    os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark")
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+    random.seed(args.seed)
+    fixtures = load_fixtures(args.fixtures)
+    latency = StubLatency(
+        stt_final_ms=args.stt_ms,
+        llm_ttft_ms=args.llm_ttft_ms,
+        llm_token_ms=args.llm_token_ms,
+        tts_ttfb_ms=args.tts_ms,
+        jitter=args.jitter,
+    )
+    results: list[dict[str, float]] = []
+    failures: list[Exception] = []
+
+    with StubServer(latency, TRANSCRIPT, REPLY, seed=args.seed) as stubs:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                run_call(
+                    call_id,
+                    fixtures,
+                    args.turns,
+                    stubs.url,
+                    results,
+                    failures,
+                )
+                for call_id in range(args.calls)
+            )
+        )
+        wall_seconds = time.perf_counter() - started
+
+    return summarize(results, len(failures), args.calls, wall_seconds)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--calls", type=int, default=1, help="concurrent calls")
+    parser.add_argument("--turns", type=int, default=5, help="turns per call")
+    parser.add_argument(
+        "--fixtures", type=Path, help="directory of mono 16-bit 16 kHz .wav utterances"
+    )
+    parser.add_argument("--stt-ms", type=float, default=150, help="stub final transcript delay")
+    parser.add_argument("--llm-ttft-ms", type=float, default=300, help="stub time to first token")
+    parser.add_argument("--llm-token-ms", type=float, default=20, help="stub time between tokens")
+    parser.add_argument("--tts-ms", type=float, default=150, help="stub time to first audio")
+    parser.add_argument("--jitter", type=float, default=0.0, help="stub delay variation, 0-1")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="also write the summary here")
+    parser.add_argument(
+        "--baseline", type=Path, help="summary from --json to compare with"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    # Keep per-frame logs, and the Deepgram SDK's complaints about its
+    # tasks being cancelled at hang-up, out of the report.
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+    logging.getLogger("deepgram").setLevel(logging.CRITICAL)
+    args = parse_args()
+    summary = asyncio.run(run(args))
+    print(render(summary))
+    if args.baseline:
+        print(render_comparison(summary, load(args.baseline)))
+    if args.json:
+        save(summary, args.json)
+
+
+if __name__ == "__main__":
+    main()
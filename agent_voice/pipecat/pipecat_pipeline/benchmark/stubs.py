@@ -0,0 +1,364 @@
+"""Local stand-ins for the Deepgram, OpenAI and ElevenLabs streaming APIs.
+
+They speak enough of each wire protocol for the pipeline's own STT, LLM
+and TTS clients to run unchanged, and answer after configurable delays,
+so a benchmark measures the pipeline rather than the providers. The
+server runs on its own thread and event loop so that it does not compete
+with the pipeline under test.
+"""
+
+import asyncio
+import base64
+import io
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from types import TracebackType
+
+import numpy as np
+from aiohttp import WSMsgType, web
+
+# Frames quieter than this RMS (int16) count as silence.
+SPEECH_RMS = 500
+# Synthesised speech per character of text.
+TTS_MS_PER_CHAR = 60
+TTS_TONE_HZ = 220
+
+
+@dataclass
+class StubLatency:
+    """Delays of the stub services, in milliseconds."""
+
+    # Silence after speech before the transcript is finalised, unless
+    # the client asks for it earlier with a Finalize message.
+    stt_endpointing_ms: float = 300
+    # From end of speech (or Finalize) to the final transcript.
+    stt_final_ms: float = 150
+    llm_ttft_ms: float = 300
+    llm_token_ms: float = 20
+    tts_ttfb_ms: float = 150
+    # Each delay varies uniformly by up to this fraction either way.
+    jitter: float = 0.0
+
+
+class StubServer:
+    """Serves the stub APIs on 127.0.0.1 from a background thread.
+
+    Use as a context manager; url is the server's http:// base URL.
+    """
+
+    def __init__(
+        self,
+        latency: StubLatency,
+        transcript: str,
+        reply: str,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.transcript = transcript
+        self.reply = reply
+        self.url = ""
+        self._random = random.Random(seed)
+        self._mp3: dict[str, bytes] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="stubs", daemon=True
+        )
+        self._runner: web.AppRunner | None = None
+
+    def __enter__(self) -> "StubServer":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(
+            self._start(), self._loop
+        ).result()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        asyncio.run_coroutine_threadsafe(
+            self._runner.cleanup(), self._loop
+        ).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/v1/listen", self._listen)
+        app.router.add_post(
+            "/v1/chat/completions", self._chat_completions
+        )
+        app.router.add_get(
+            "/v1/text-to-speech/{voice_id}/stream-input",
+            self._stream_input,
+        )
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        self.url = f"http://127.0.0.1:{port}"
+
+    async def _sleep(self, milliseconds: float) -> None:
+        jitter = self.latency.jitter
+        factor = 1 + self._random.uniform(-jitter, jitter)
+        await asyncio.sleep(max(milliseconds * factor, 0) / 1000)
+
+    async def _listen(self, request: web.Request) -> web.WebSocketResponse:
+        """Deepgram live transcription."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        sample_rate = int(request.query.get("sample_rate", "16000"))
+        endpointing_ms = self.latency.stt_endpointing_ms
+        request_id = str(uuid.uuid4())
+        received = speech_start = silence_ms = 0.0
+        speaking = False
+        pending: set[asyncio.Task] = set()
+
+        async def finalize(start: float, end: float, *, from_finalize: bool) -> None:
+            await self._sleep(self.latency.stt_final_ms)
+            await ws.send_json(
+                {
+                    "type": "Results",
+                    "channel_index": [0, 1],
+                    "duration": end - start,
+                    "start": start,
+                    "is_final": True,
+                    "speech_final": True,
+                    "from_finalize": from_finalize,
+                    "channel": {
+                        "alternatives": [
+                            {
+                                "transcript": self.transcript,
+                                "confidence": 0.99,
+                                "words": [],
+                            }
+                        ]
+                    },
+                    "metadata": {
+                        "request_id": request_id,
+                        "model_info": {
+                            "name": "stub",
+                            "version": "stub",
+                            "arch": "stub",
+                        },
+                        "model_uuid": request_id,
+                    },
+                }
+            )
+
+        def end_speech(*, from_finalize: bool) -> None:
+            nonlocal speaking
+            speaking = False
+            task = asyncio.create_task(
+                finalize(speech_start, received, from_finalize=from_finalize)
+            )
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        async for message in ws:
+            if message.type == WSMsgType.BINARY:
+                samples = np.frombuffer(message.data, dtype=np.int16)
+                duration = len(samples) / sample_rate
+                rms = np.sqrt(np.mean(samples.astype(np.float32) ** 2)) if len(samples) else 0.0
+                if rms >= SPEECH_RMS:
+                    if not speaking:
+                        speaking, speech_start = True, received
+                        await ws.send_json(
+                            {
+                                "type": "SpeechStarted",
+                                "channel": [0],
+                                "timestamp": received,
+                            }
+                        )
+                    silence_ms = 0.0
+                elif speaking:
+                    silence_ms += duration * 1000
+                    if silence_ms >= endpointing_ms:
+                        end_speech(from_finalize=False)
+                received += duration
+            elif message.type == WSMsgType.TEXT:
+                control = json.loads(message.data).get("type")
+                if control == "Finalize" and speaking:
+                    end_speech(from_finalize=True)
+                elif control == "CloseStream":
+                    break
+
+        if pending:
+            await asyncio.wait(pending)
+        if not ws.closed:
+            await ws.send_json(
+                {
+                    "type": "Metadata",
+                    "transaction_key": "deprecated",
+                    "request_id": request_id,
+                    "sha256": "",
+                    "created": "",
+                    "duration": received,
+                    "channels": 1,
+                    "models": [],
+                    "model_info": {},
+                }
+            )
+            await ws.close()
+        return ws
+
+    async def _chat_completions(self, request: web.Request) -> web.StreamResponse:
+        """OpenAI chat completions, streamed or not."""
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        words = self.reply.split(" ")
+
+        await self._sleep(self.latency.llm_ttft_ms)
+        if not body.get("stream"):
+            await self._sleep(self.latency.llm_token_ms * (len(words) - 1))
+            return web.json_response(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": self.reply},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/event-stream"}
+        )
+        await response.prepare(request)
+
+        async def send(choices: list[dict], **extra: object) -> None:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": body["model"],
+                "choices": choices,
+                **extra,
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+
+        for index, word in enumerate(words):
+            if index:
+                await self._sleep(self.latency.llm_token_ms)
+            content = f" {word}" if index else word
+            delta = {"role": "assistant", "content": content} if index == 0 else {"content": content}
+            await send([{"index": 0, "delta": delta, "finish_reason": None}])
+        await send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if body.get("stream_options", {}).get("include_usage"):
+            await send(
+                [],
+                usage={
+                    "prompt_tokens": 0,
+                    "completion_tokens": len(words),
+                    "total_tokens": len(words),
+                },
+            )
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    def _audio(
+        self, output_format: str, start_ms: float, milliseconds: float
+    ) -> bytes:
+        """Tone audio in an ElevenLabs output format (pcm_* or mp3_*).
+
+        start_ms is the audio already sent on the connection, so
+        consecutive calls continue the same stream.
+        """
+        codec, sample_rate, *rest = output_format.split("_")
+        sample_rate = int(sample_rate)
+        if codec == "pcm":
+            start = int(sample_rate * start_ms / 1000)
+            count = int(sample_rate * milliseconds / 1000)
+            t = np.arange(start, start + count) / sample_rate
+            tone = 0.1 * np.sin(2 * np.pi * TTS_TONE_HZ * t)
+            return (tone * 32767).astype(np.int16).tobytes()
+
+        kbps = int(rest[0])
+        if output_format not in self._mp3:
+            self._mp3[output_format] = _encode_mp3(sample_rate, kbps)
+        mp3 = self._mp3[output_format]
+        start = int(kbps * start_ms / 8) % len(mp3)
+        end = start + int(kbps * milliseconds / 8)
+        return (mp3 * 2)[start:end] if end > len(mp3) else mp3[start:end]
+
+    async def _stream_input(self, request: web.Request) -> web.WebSocketResponse:
+        """ElevenLabs streaming text-to-speech."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        output_format = request.query.get("output_format", "mp3_22050_32")
+        first = True
+        sent_ms = 0.0
+
+        async for message in ws:
+            if message.type != WSMsgType.TEXT:
+                continue
+            text = json.loads(message.data).get("text")
+            if text == "":
+                break
+            # The initial message, keepalives and flushes carry only a space.
+            if not text or not text.strip():
+                continue
+            if first:
+                await self._sleep(self.latency.tts_ttfb_ms)
+                first = False
+
+            chars = list(text)
+            alignment = {
+                "chars": chars,
+                "charStartTimesMs": [i * TTS_MS_PER_CHAR for i in range(len(chars))],
+                "charDurationsMs": [TTS_MS_PER_CHAR] * len(chars),
+            }
+            duration_ms = TTS_MS_PER_CHAR * len(chars)
+            audio = self._audio(output_format, sent_ms, duration_ms)
+            sent_ms += duration_ms
+            await ws.send_json(
+                {
+                    "audio": base64.b64encode(audio).decode(),
+                    "isFinal": None,
+                    "alignment": alignment,
+                    "normalizedAlignment": alignment,
+                }
+            )
+        if not ws.closed:
+            await ws.send_json({"isFinal": True})
+            await ws.close()
+        return ws
+
+
+def _encode_mp3(sample_rate: int, kbps: int, seconds: int = 30) -> bytes:
+    """A constant-bitrate mp3 tone, long enough to slice replies from."""
+    import av  # only needed for mp3 output formats
+
+    t = np.arange(sample_rate * seconds) / sample_rate
+    tone = (0.1 * np.sin(2 * np.pi * TTS_TONE_HZ * t) * 32767).astype(np.int16)
+
+    buffer = io.BytesIO()
+    output = av.open(buffer, mode="w", format="mp3")
+    stream = output.add_stream("mp3", rate=sample_rate)
+    stream.bit_rate = kbps * 1000
+    stream.layout = "mono"
+    frame = av.AudioFrame.from_ndarray(
+        tone[None, :], format="s16", layout="mono"
+    )
+    frame.sample_rate = sample_rate
+    for packet in stream.encode(frame):
+        output.mux(packet)
+    for packet in stream.encode(None):
+        output.mux(packet)
+    output.close()
+    return buffer.getvalue()
@@ -7,10 +7,12 @@ from deepgram import LiveOptions
 from dotenv import load_dotenv
 from loguru import logger
 from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.observers.base_observer import BaseObserver
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
 from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.processors.frame_processor import FrameProcessor
 from pipecat.services.deepgram import DeepgramSTTService
 from pipecat.services.elevenlabs import ElevenLabsTTSService
 from pipecat.services.openai import OpenAILLMService
@@ -25,43 +27,51 @@ daily_api_key = os.getenv("DAILY_API_KEY", "")
 daily_api_url = os.getenv("DAILY_API_URL", "https://api.daily.co/v1")
 
 
-async def main() -> None:
-    room_url = os.getenv("DAILY_ROOM_URL")
-    if not room_url:
-        raise ValueError("DAILY_ROOM_URL is not set")
+SYSTEM_PROMPT = "You are a helpful LLM in a WebRTC call. Your goal is to demonstrate your capabilities in a succinct way. Your output will be converted to audio so don't include special characters in your answers. Respond to what the user said in a creative and helpful way."
 
-    transport = DailyTransport(
-        room_url=room_url,
-        token=None,
-        bot_name="Chatbot",
-        params=DailyParams(
-            api_url=daily_api_url,
-            api_key=daily_api_key,
-            # audio_in_enabled=True,
-            audio_out_enabled=True,
-            camera_out_enabled=False,
-            vad_enabled=True,
-            vad_analyzer=SileroVADAnalyzer(),
-            transcription_enabled=True,
-        ),
-    )
 
+def create_services(
+    *,
+    deepgram_url: str = "",
+    openai_base_url: str | None = None,
+    elevenlabs_url: str = "wss://api.elevenlabs.io",
+) -> tuple[DeepgramSTTService, OpenAILLMService, ElevenLabsTTSService]:
+    """Create the STT, LLM and TTS services, at their default endpoints unless given."""
     stt = DeepgramSTTService(
         api_key=os.getenv("DEEPGRAM_API_KEY"),
+        url=deepgram_url,
         live_options=LiveOptions(vad_events=True, utterance_end_ms="1000"),
     )
 
-    llm = OpenAILLMService(api_key=os.getenv("OPENAI_API_KEY"), model="gpt-4.1-mini")
+    llm = OpenAILLMService(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=openai_base_url,
+        model="gpt-4.1-mini",
+    )
 
     tts = ElevenLabsTTSService(
         api_key=os.getenv("ELEVENLABS_API_KEY", ""),
         voice_id=os.getenv("ELEVENLABS_VOICE_ID", "EXAVITQu4vr4xnSDxMaL"),
+        url=elevenlabs_url,
     )
+    return stt, llm, tts
+
+
+def create_pipeline(
+    transport_input: FrameProcessor,
+    transport_output: FrameProcessor,
+    stt: DeepgramSTTService,
+    llm: OpenAILLMService,
+    tts: ElevenLabsTTSService,
+) -> tuple[Pipeline, list[dict[str, Any]], Any]:
+    """Wire the services between a transport's input and output.
 
+    Returns the pipeline, its LLM messages and its context aggregator.
+    """
     messages = [
             {
                 "role": "system",
-                "content": "You are a helpful LLM in a WebRTC call. Your goal is to demonstrate your capabilities in a succinct way. Your output will be converted to audio so don't include special characters in your answers. Respond to what the user said in a creative and helpful way.",
+                "content": SYSTEM_PROMPT,
             },
         ]
 
@@ -70,17 +80,22 @@ async def main() -> None:
 
     pipeline = Pipeline(
         [
-            transport.input(),
+            transport_input,
             stt,
             context_aggregator.user(),
             llm,
             tts,
-            transport.output(),
+            transport_output,
             context_aggregator.assistant(),
         ]
     )
+    return pipeline, messages, context_aggregator
 
-    task = PipelineTask(
+
+def create_task(
+    pipeline: Pipeline, observers: list[BaseObserver] | None = None
+) -> PipelineTask:
+    return PipelineTask(
         pipeline,
         params=PipelineParams(
             allow_interruptions=True,
@@ -88,8 +103,39 @@ async def main() -> None:
             enable_usage_metrics=True,
             report_only_initial_ttfb=True,
         ),
+        observers=observers or [],
     )
 
+
+async def main() -> None:
+    room_url = os.getenv("DAILY_ROOM_URL")
+    if not room_url:
+        raise ValueError("DAILY_ROOM_URL is not set")
+
+    transport = DailyTransport(
+        room_url=room_url,
+        token=None,
+        bot_name="Chatbot",
+        params=DailyParams(
+            api_url=daily_api_url,
+            api_key=daily_api_key,
+            # audio_in_enabled=True,
+            audio_out_enabled=True,
+            camera_out_enabled=False,
+            vad_enabled=True,
+            vad_analyzer=SileroVADAnalyzer(),
+            transcription_enabled=True,
+        ),
+    )
+
+    stt, llm, tts = create_services()
+
+    pipeline, messages, context_aggregator = create_pipeline(
+        transport.input(), transport.output(), stt, llm, tts
+    )
+
+    task = create_task(pipeline)
+
     @transport.event_handler("on_first_participant_joined")
     async def on_first_participant_joined(transport: DailyTransport, participant: dict[str, Any]) -> None:
         await transport.capture_participant_transcription(participant["id"])
@@ -0,0 +1,146 @@
+"""Audio.
+
+Helpers for transcribing long recordings in segments.
+
+Recordings are decoded with PyAV to 16 kHz mono as a stream, so
+planning a recording only holds the energy of each of its 30 ms frames
+in memory. A segment is cut in the quietest PAUSE_SECONDS stretch
+between TRANSCRIBE_SEGMENT_MIN_SECONDS and TRANSCRIBE_SEGMENT_MAX_SECONDS
+after the previous cut, which is a pause whenever the window has one.
+Segments are sent to Whisper as 16-bit WAV, 32 kB per second, which
+keeps them under its 25 MB upload limit.
+"""
+
+import io
+import os
+import wave
+from collections.abc import Iterator
+
+import av
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+TRANSCRIBE_SEGMENT_MIN_SECONDS = float(
+    os.getenv("TRANSCRIBE_SEGMENT_MIN_SECONDS", "120")
+)
+TRANSCRIBE_SEGMENT_MAX_SECONDS = float(
+    os.getenv("TRANSCRIBE_SEGMENT_MAX_SECONDS", "300")
+)
+# Length of the quiet stretch segments are cut in; about a short pause
+# between sentences.
+PAUSE_SECONDS = 0.3
+
+
+def decode(
+    path: str, start: float = 0.0, end: float | None = None
+) -> Iterator[np.ndarray]:
+    """16 kHz mono int16 samples of path from start to end seconds, in blocks."""
+    first = round(start * SAMPLE_RATE)
+    last = None if end is None else round(end * SAMPLE_RATE)
+    with av.open(path) as container:
+        stream = container.streams.audio[0]
+        resampler = av.AudioResampler(
+            format="s16", layout="mono", rate=SAMPLE_RATE
+        )
+        if start > 0:
+            # In av.time_base units when no stream is given; lands on
+            # the keyframe before start.
+            container.seek(round(start * av.time_base), backward=True)
+
+        def resampled() -> Iterator[tuple[int, np.ndarray]]:
+            position = None
+            for frame in container.decode(stream):
+                if position is None:
+                    position = round(
+                        (frame.time if frame.time is not None else start)
+                        * SAMPLE_RATE
+                    )
+                for output in resampler.resample(frame):
+                    samples = output.to_ndarray().reshape(-1)
+                    yield position, samples
+                    position += len(samples)
+            for output in resampler.resample(None):
+                samples = output.to_ndarray().reshape(-1)
+                yield position or 0, samples
+                position = (position or 0) + len(samples)
+
+        for position, samples in resampled():
+            if last is not None and position >= last:
+                return
+            block_end = position + len(samples)
+            if block_end <= first:
+                continue
+            samples = samples[
+                max(first - position, 0) : len(samples)
+                if last is None
+                else last - position
+            ]
+            if len(samples):
+                yield samples
+
+
+def frame_energies(path: str) -> tuple[np.ndarray, float]:
+    """Energy in dB of each FRAME_SECONDS frame, and the duration in seconds."""
+    frame_length = round(SAMPLE_RATE * FRAME_SECONDS)
+    energies = []
+    carry = np.empty(0, dtype=np.int16)
+    total = 0
+    for block in decode(path):
+        total += len(block)
+        samples = np.concatenate([carry, block])
+        whole = len(samples) // frame_length * frame_length
+        frames = samples[:whole].reshape(-1, frame_length).astype(np.float32)
+        energies.append(10 * np.log10(np.mean(frames**2, axis=1) + 1e-10))
+        carry = samples[whole:]
+    if not energies:
+        return np.empty(0, dtype=np.float32), 0.0
+    return np.concatenate(energies), total / SAMPLE_RATE
+
+
+def plan_segments(
+    energies: np.ndarray,
+    duration: float,
+    min_seconds: float = TRANSCRIBE_SEGMENT_MIN_SECONDS,
+    max_seconds: float = TRANSCRIBE_SEGMENT_MAX_SECONDS,
+) -> list[tuple[float, float]]:
+    """(start, end) seconds of segments cut on pauses."""
+    if duration <= 0:
+        return []
+    # Mean energy of the PAUSE_SECONDS stretch centred on each frame. The
+    # quietest stretch of a window is its pause, however few pauses the
+    # recording has overall, or the least bad place to cut when it has none.
+    run = max(int(PAUSE_SECONDS / FRAME_SECONDS), 1)
+    padded = np.pad(energies, (run // 2, run - 1 - run // 2), mode="edge")
+    quiet = np.convolve(padded, np.ones(run) / run, mode="valid")
+
+    min_frames = max(int(min_seconds / FRAME_SECONDS), 1)
+    max_frames = max(int(max_seconds / FRAME_SECONDS), min_frames)
+    cuts = [0]
+    while len(energies) - cuts[-1] > max_frames:
+        low, high = cuts[-1] + min_frames, cuts[-1] + max_frames
+        window = quiet[low : high + 1]
+        # The middle of the quietest stretch when it spans several frames,
+        # as in digital silence.
+        quietest = np.flatnonzero(window <= window.min() + 1e-6)
+        runs = np.split(quietest, np.flatnonzero(np.diff(quietest) > 1) + 1)
+        longest = max(runs, key=len)
+        cuts.append(low + int(longest[len(longest) // 2]))
+
+    bounds = [cut * FRAME_SECONDS for cut in cuts] + [duration]
+    return [
+        (round(start, 2), round(end, 2))
+        for start, end in zip(bounds, bounds[1:])
+    ]
+
+
+def extract_wav(path: str, start: float, end: float) -> bytes:
+    """16 kHz mono 16-bit WAV of path from start to end seconds."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        for block in decode(path, start, end):
+            wav.writeframes(block.tobytes())
+    return buffer.getvalue()
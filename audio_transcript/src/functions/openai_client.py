@@ -0,0 +1,14 @@
+from openai import AsyncOpenAI
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_client: AsyncOpenAI | None = None
+
+def openai_client() -> AsyncOpenAI:
+    """Return the process-wide client, so calls share its connection pool."""
+    global _client  # noqa: PLW0603
+    if _client is None:
+        _client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _client
@@ -0,0 +1,19 @@
+import asyncio
+from restack_ai.function import function, log
+from dataclasses import dataclass
+
+from src.functions.audio import frame_energies, plan_segments
+
+@dataclass
+class PlanAudioSegmentsInput:
+    file_path: str
+
+@function.defn()
+async def plan_audio_segments(input: PlanAudioSegmentsInput):
+    # Decoding a long recording takes a while; keep the event loop free.
+    energies, duration = await asyncio.to_thread(frame_energies, input.file_path)
+    segments = plan_segments(energies, duration)
+
+    log.info("plan_audio_segments", extra={"duration": duration, "segments": len(segments)})
+
+    return [{"start": start, "end": end} for start, end in segments]
@@ -1,9 +1,10 @@
 from restack_ai.function import function, FunctionFailure, log
 from dataclasses import dataclass
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+from src.functions.openai_client import openai_client
+
 load_dotenv()
 
 @dataclass
@@ -14,16 +15,16 @@ class TranscribeAudioInput:
 async def transcribe_audio(input: TranscribeAudioInput):    
     if (os.environ.get("OPENAI_API_KEY") is None):
         raise FunctionFailure("OPENAI_API_KEY is not set", non_retryable=True)
-    
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
     try:
-      response = client.audio.transcriptions.create(
-          model="whisper-1",
-          file=open(input.file_path, "rb")
-      )
+      with open(input.file_path, "rb") as file:
+        response = await openai_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=file
+        )
     except Exception as error:
       log.error("An error occurred during transcription", error)
+      raise
 
     return response.text
 
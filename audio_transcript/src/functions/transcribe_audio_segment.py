@@ -0,0 +1,48 @@
+import asyncio
+from restack_ai.function import function, FunctionFailure, log
+from dataclasses import dataclass
+import os
+from dotenv import load_dotenv
+
+from src.functions.audio import extract_wav
+from src.functions.openai_client import openai_client
+
+load_dotenv()
+
+@dataclass
+class TranscribeAudioSegmentInput:
+    file_path: str
+    start: float
+    end: float
+
+@function.defn()
+async def transcribe_audio_segment(input: TranscribeAudioSegmentInput):
+    if (os.environ.get("OPENAI_API_KEY") is None):
+        raise FunctionFailure("OPENAI_API_KEY is not set", non_retryable=True)
+
+    audio = await asyncio.to_thread(extract_wav, input.file_path, input.start, input.end)
+
+    try:
+      response = await openai_client().audio.transcriptions.create(
+          model="whisper-1",
+          file=("segment.wav", audio),
+          response_format="verbose_json",
+      )
+    except Exception as error:
+      log.error("An error occurred during transcription", error)
+      raise
+
+    # Whisper's timestamps are relative to the segment.
+    return {
+        "start": input.start,
+        "end": input.end,
+        "text": response.text.strip(),
+        "timestamps": [
+            {
+                "start": round(input.start + segment.start, 2),
+                "end": round(input.start + segment.end, 2),
+                "text": segment.text.strip(),
+            }
+            for segment in response.segments or []
+        ],
+    }
@@ -1,9 +1,10 @@
 from restack_ai.function import function, log, FunctionFailure
 from dataclasses import dataclass
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+from src.functions.openai_client import openai_client
+
 load_dotenv()
 
 @dataclass
@@ -16,10 +17,8 @@ async def translate_text(input: TranslateTextInput):
     if (os.environ.get("OPENAI_API_KEY") is None):
         raise FunctionFailure("OPENAI_API_KEY is not set", non_retryable=True)
     
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
-
     try:
-      response = client.chat.completions.create(
+      response = await openai_client().chat.completions.create(
           model="gpt-4.1-mini",
           messages=[
               {
@@ -34,6 +33,7 @@ async def translate_text(input: TranslateTextInput):
       )
     except Exception as error:
       log.error("An error occurred during translation", error)
+      raise
 
     return response.choices[0].message.content
 
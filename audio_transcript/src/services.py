@@ -3,6 +3,8 @@ from src.client import client
 from src.workflows.transcribe_translate import TranscribeTranslateWorkflow
 from src.functions.transcribe_audio import transcribe_audio
 from src.functions.translate_text import translate_text
+from src.functions.plan_audio_segments import plan_audio_segments
+from src.functions.transcribe_audio_segment import transcribe_audio_segment
 from watchfiles import run_process
 import webbrowser
 import os
@@ -11,7 +13,7 @@ async def main():
     await asyncio.gather(
         client.start_service(
             workflows=[TranscribeTranslateWorkflow],
-            functions=[transcribe_audio, translate_text]
+            functions=[transcribe_audio, translate_text, plan_audio_segments, transcribe_audio_segment]
         )
     )
 
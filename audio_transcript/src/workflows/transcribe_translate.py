@@ -1,19 +1,77 @@
+import asyncio
+from datetime import timedelta
 from restack_ai.workflow import workflow, import_functions, log
 from pydantic import BaseModel, Field
 with import_functions():
     from src.functions.transcribe_audio import transcribe_audio, TranscribeAudioInput
     from src.functions.translate_text import translate_text, TranslateTextInput
+    from src.functions.plan_audio_segments import plan_audio_segments, PlanAudioSegmentsInput
+    from src.functions.transcribe_audio_segment import transcribe_audio_segment, TranscribeAudioSegmentInput
 
 class WorkflowInputParams(BaseModel):
     file_path: str = Field(default="/test.mp3")
     target_language: str = Field(default="fr")
+    # Transcribe in segments cut on pauses, in parallel, and translate
+    # each segment as soon as it is transcribed.
+    long_audio: bool = Field(default=False)
+    # Segments being transcribed at the same time in long_audio mode.
+    transcribe_concurrency: int = Field(default=8)
 
 @workflow.defn()
 class TranscribeTranslateWorkflow:
+    async def transcribe_translate_segment(self, segment: dict, input: WorkflowInputParams, transcribe_slots: asyncio.Semaphore) -> dict:
+        async with transcribe_slots:
+            transcript = await workflow.step(
+                function=transcribe_audio_segment,
+                function_input=TranscribeAudioSegmentInput(
+                    file_path=input.file_path,
+                    start=segment["start"],
+                    end=segment["end"],
+                ),
+                start_to_close_timeout=timedelta(minutes=5),
+            )
+
+        translation = ""
+        if transcript["text"]:
+            translation = await workflow.step(
+                function=translate_text,
+                function_input=TranslateTextInput(
+                    text=transcript["text"],
+                    target_language=input.target_language,
+                ),
+                start_to_close_timeout=timedelta(minutes=2),
+            )
+        return {**transcript, "translation": translation}
+
+    async def run_long_audio(self, input: WorkflowInputParams):
+        segments = await workflow.step(
+            function=plan_audio_segments,
+            function_input=PlanAudioSegmentsInput(
+                file_path=input.file_path,
+            ),
+            start_to_close_timeout=timedelta(minutes=10),
+        )
+        log.info("Transcribing audio in segments", segments=len(segments))
+
+        transcribe_slots = asyncio.Semaphore(max(input.transcribe_concurrency, 1))
+        results = await asyncio.gather(*(
+            self.transcribe_translate_segment(segment, input, transcribe_slots)
+            for segment in segments
+        ))
+
+        return {
+            "transcription": " ".join(result["text"] for result in results if result["text"]),
+            "translation": "\n".join(result["translation"] for result in results if result["translation"]),
+            "timestamps": [timestamp for result in results for timestamp in result["timestamps"]],
+        }
+
     @workflow.run
     async def run(self, input: WorkflowInputParams):
         log.info("TranscribeTranslateWorkflow started", input=input)
 
+        if input.long_audio:
+            return await self.run_long_audio(input)
+
         transcription = await workflow.step(
             function=transcribe_audio,
             function_input=TranscribeAudioInput(
@@ -1,6 +1,5 @@
 import streamlit as st
 import requests
-import base64
 # Set page title and header
 st.title("Defense Hackathon Quickstart: War Audio Transcription & Translation")
 
@@ -8,23 +7,20 @@ st.title("Defense Hackathon Quickstart: War Audio Transcription & Translation")
 
 uploaded_files = st.file_uploader("Choose a files", accept_multiple_files=True)
 
-if uploaded_files:
-    file_data_list = []
-    for uploaded_file in uploaded_files:
-        audio_data = uploaded_file.read()
-        audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-        file_data_list.append((uploaded_file.name, audio_base64))
-
 if "response_history" not in st.session_state:
     st.session_state.response_history = []
 
 if st.button("Process Audio"):
-    if uploaded_file:
+    if uploaded_files:
         try:
             with st.spinner('Processing audio...'):
+                # Sent as multipart form data, without base64 encoding
                 response = requests.post(
                     "http://localhost:8000/api/process_audio",
-                    json={"file_data": file_data_list}
+                    files=[
+                        ("files", (uploaded_file.name, uploaded_file, uploaded_file.type))
+                        for uploaded_file in uploaded_files
+                    ]
                 )
 
                 if response.status_code == 200:
@@ -32,6 +28,9 @@ if st.button("Process Audio"):
 
                     results = response.json()["result"]
                     for idx, uploaded_file in enumerate(uploaded_files):
+                        if results[idx] is None:
+                            st.error(f"Processing {uploaded_file.name} failed.")
+                            continue
                         st.session_state.response_history.append({
                             "file_name": uploaded_file.name,
                             "file_type": uploaded_file.type,
@@ -1,14 +1,15 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from dataclasses import dataclass
+from dataclasses import asdict
+from src.blob_store import BLOB_CHUNK_BYTES, put_chunks
 from src.client import client
 import time
 import uvicorn
 
 
-@dataclass
-class QueryRequest:
-    file_data: list[tuple[str, str]]
+async def upload_chunks(file: UploadFile):
+    while chunk := await file.read(BLOB_CHUNK_BYTES):
+        yield chunk
 
 app = FastAPI()
 
@@ -26,14 +27,19 @@ async def home():
     return "Welcome to the Quickstart: War Audio Transcription & Translation example!"
 
 @app.post("/api/process_audio")
-async def schedule_workflow(request: QueryRequest):
+async def schedule_workflow(files: list[UploadFile]):
     try:
+        # Workflows are given references to the stored audio, not the audio.
+        blobs = [
+            await put_chunks(upload_chunks(file), file.filename or "")
+            for file in files
+        ]
         workflow_id = f"{int(time.time() * 1000)}-parent_workflow"
         
         runId = await client.schedule_workflow(
             workflow_name="ParentWorkflow",
             workflow_id=workflow_id,
-            input={"file_data": request.file_data}
+            input={"files": [asdict(blob) for blob in blobs]}
         )
         print("Scheduled workflow", runId)
         
@@ -0,0 +1,188 @@
+"""Blob store.
+
+Content-addressed storage for audio, so that workflows pass a small
+BlobRef in their inputs and results, and never the audio itself
+encoded in base64.
+
+A blob is named by the SHA-256 of its content, so storing the same
+audio twice keeps one copy. Blobs are written and read in chunks of
+BLOB_CHUNK_BYTES.
+
+By default blobs are files under BLOB_STORE_DIR, which the app and the
+workers have to share. With BLOB_STORE_URL set to s3://bucket/prefix
+they are objects in that S3-compatible bucket instead. Set
+BLOB_STORE_ENDPOINT_URL to use MinIO or another S3 stand-in.
+"""
+
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+from collections.abc import AsyncIterable, AsyncIterator
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator
+from urllib.parse import urlsplit
+
+BLOB_STORE_DIR = Path(
+    os.getenv("BLOB_STORE_DIR", Path(tempfile.gettempdir()) / "restack_blobs")
+)
+BLOB_STORE_URL = os.getenv("BLOB_STORE_URL", "")
+BLOB_STORE_ENDPOINT_URL = os.getenv("BLOB_STORE_ENDPOINT_URL") or None
+BLOB_CHUNK_BYTES = 1 << 20
+
+_backend: "FileBackend | S3Backend | None" = None
+
+
+@dataclass
+class BlobRef:
+    # SHA-256 of the content, in hex.
+    key: str
+    size: int
+    # Original file name, for APIs that infer the format from it.
+    name: str = ""
+
+
+class FileBackend:
+    """Blobs as files in a local directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def store(self, key: str, staged: Path) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staged, path)
+
+    def open(self, key: str) -> BinaryIO:
+        return self._path(key).open("rb")
+
+    @contextmanager
+    def local_path(self, key: str) -> Iterator[Path]:
+        path = self._path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"No blob {key}")
+        yield path
+
+
+class S3Backend:
+    """Blobs as objects in an S3-compatible bucket."""
+
+    def __init__(self, url: str, endpoint_url: str | None) -> None:
+        import boto3  # only needed with BLOB_STORE_URL
+
+        parsed = urlsplit(url)
+        self.bucket = parsed.netloc
+        self.prefix = parsed.path.strip("/")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.ClientError as error:
+            if error.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def store(self, key: str, staged: Path) -> None:
+        if not self._exists(key):
+            # Multipart for large files, read from disk in parts.
+            self.client.upload_file(str(staged), self.bucket, self._key(key))
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return self.client.get_object(
+                Bucket=self.bucket, Key=self._key(key)
+            )["Body"]
+        except self.client.exceptions.NoSuchKey as error:
+            raise FileNotFoundError(f"No blob {key}") from error
+
+    @contextmanager
+    def local_path(self, key: str) -> Iterator[Path]:
+        _, path = tempfile.mkstemp(dir=_staging_dir())
+        try:
+            with self.open(key) as body, open(path, "wb") as file:
+                shutil.copyfileobj(body, file, BLOB_CHUNK_BYTES)
+            yield Path(path)
+        finally:
+            Path(path).unlink(missing_ok=True)
+
+
+def blob_backend() -> "FileBackend | S3Backend":
+    """Return the process-wide backend, creating it on first use."""
+    global _backend  # noqa: PLW0603
+    if _backend is None:
+        if BLOB_STORE_URL:
+            _backend = S3Backend(BLOB_STORE_URL, BLOB_STORE_ENDPOINT_URL)
+        else:
+            _backend = FileBackend(BLOB_STORE_DIR)
+    return _backend
+
+
+def _staging_dir() -> Path:
+    # Under the store's directory, so a staged file is moved into place
+    # rather than copied.
+    path = BLOB_STORE_DIR / "staging"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+async def put_chunks(chunks: AsyncIterable[bytes], name: str = "") -> BlobRef:
+    """Store the content of chunks as a blob, hashing it as it is written."""
+    digest = hashlib.sha256()
+    size = 0
+    descriptor, staged = tempfile.mkstemp(dir=_staging_dir())
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            async for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                file.write(chunk)
+        key = digest.hexdigest()
+        await asyncio.to_thread(blob_backend().store, key, Path(staged))
+    finally:
+        Path(staged).unlink(missing_ok=True)
+    return BlobRef(key=key, size=size, name=name)
+
+
+async def put_file(path: str | Path, name: str | None = None) -> BlobRef:
+    """Store a local file as a blob."""
+
+    async def chunks() -> AsyncIterator[bytes]:
+        with open(path, "rb") as file:
+            while chunk := await asyncio.to_thread(file.read, BLOB_CHUNK_BYTES):
+                yield chunk
+
+    return await put_chunks(chunks(), Path(path).name if name is None else name)
+
+
+async def read_chunks(ref: BlobRef) -> AsyncIterator[bytes]:
+    """Content of a blob, in chunks."""
+    file = await asyncio.to_thread(blob_backend().open, ref.key)
+    try:
+        while chunk := await asyncio.to_thread(file.read, BLOB_CHUNK_BYTES):
+            yield chunk
+    finally:
+        file.close()
+
+
+@asynccontextmanager
+async def local_path(ref: BlobRef) -> AsyncIterator[Path]:
+    """A local file with the blob's content, for APIs that take a file."""
+    context = blob_backend().local_path(ref.key)
+    path = await asyncio.to_thread(context.__enter__)
+    try:
+        yield path
+    finally:
+        await asyncio.to_thread(context.__exit__, None, None, None)
@@ -2,10 +2,10 @@ from restack_ai.function import function, log
 from dataclasses import dataclass
 from groq import Groq
 import os
-import base64
+from src.blob_store import BlobRef, local_path
 @dataclass
 class FunctionInputParams:
-    file_data: tuple[str, str]
+    file: BlobRef
 
 @function.defn()
 async def transcribe(input: FunctionInputParams):
@@ -17,17 +17,17 @@ async def transcribe(input: FunctionInputParams):
         client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
 
 
-        filename, base64_content = input.file_data
-        file_bytes = base64.b64decode(base64_content)
-        transcription = client.audio.transcriptions.create(
-            file=(filename, file_bytes), # Required audio file
-            model="whisper-large-v3-turbo", # Required model to use for transcription
-            # Best practice is to write the prompt in the language of the audio, use translate.google.com if needed
-            prompt=f"Опиши о чем речь в аудио",  # Translation: Describe what the audio is about
-            language="ru", # Original language of the audio
-            response_format="json",  # Optional
-            temperature=0.0  # Optional
-        )
+        async with local_path(input.file) as path:
+            with open(path, "rb") as audio:
+                transcription = client.audio.transcriptions.create(
+                    file=(input.file.name or path.name, audio), # Required audio file, read from the blob store
+                    model="whisper-large-v3-turbo", # Required model to use for transcription
+                    # Best practice is to write the prompt in the language of the audio, use translate.google.com if needed
+                    prompt=f"Опиши о чем речь в аудио",  # Translation: Describe what the audio is about
+                    language="ru", # Original language of the audio
+                    response_format="json",  # Optional
+                    temperature=0.0  # Optional
+                )
 
         log.info("transcribe function completed", transcription=transcription)
         return transcription
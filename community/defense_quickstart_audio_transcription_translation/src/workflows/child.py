@@ -3,12 +3,13 @@ from dataclasses import dataclass
 from restack_ai.workflow import workflow, import_functions, log
 
 with import_functions():
+    from src.blob_store import BlobRef
     from src.functions.transcribe import transcribe, FunctionInputParams as TranscribeFunctionInputParams
     from src.functions.translate import translate, FunctionInputParams as TranslationFunctionInputParams
     
 @dataclass
 class WorkflowInputParams:
-    file_data: tuple[str, str]
+    file: BlobRef
 
 @dataclass
 class WorkflowOutputParams:
@@ -23,7 +24,7 @@ class ChildWorkflow:
 
         transcription = await workflow.step(
             transcribe,
-            TranscribeFunctionInputParams(file_data=input.file_data),
+            TranscribeFunctionInputParams(file=input.file),
             start_to_close_timeout=timedelta(seconds=120)
         )
 
@@ -1,10 +1,16 @@
-from restack_ai.workflow import workflow, log, workflow_info
+from restack_ai.workflow import workflow, import_functions, log, workflow_info, NonRetryableError
 from dataclasses import dataclass
-from .child import ChildWorkflow
+from .child import ChildWorkflow, WorkflowInputParams as ChildWorkflowInputParams
+from .fan_out import fan_out
+
+with import_functions():
+    from src.blob_store import BlobRef
 
 @dataclass
 class WorkflowInputParams:
-    file_data: list[tuple[str, str]]
+    files: list[BlobRef]
+    # Files being transcribed and translated at the same time.
+    max_in_flight: int = 4
 
 @workflow.defn()
 class ParentWorkflow:
@@ -14,13 +20,18 @@ class ParentWorkflow:
 
         log.info("ParentWorkflow started", input=input)
 
-        child_workflow_results = []
-        for file_data in input.file_data:
-            result = await workflow.child_execute(ChildWorkflow, workflow_id=f"{parent_workflow_id}-child-execute-{file_data[0]}", input=WorkflowInputParams(file_data=file_data))
-            child_workflow_results.append(result)
-
-        log.info("ParentWorkflow completed", results=child_workflow_results)
+        children = await fan_out(
+            [
+                lambda index=index, file=file: workflow.child_execute(ChildWorkflow, workflow_id=f"{parent_workflow_id}-child-execute-{index}-{file.name}", input=ChildWorkflowInputParams(file=file))
+                for index, file in enumerate(input.files)
+            ],
+            max_in_flight=input.max_in_flight,
+        )
+        if input.files and len(children.failures) == len(input.files):
+            raise NonRetryableError(f"All files failed: {children.failures[0].error}")
 
-        return child_workflow_results
+        # Failed files have a None result, in their place.
+        log.info("ParentWorkflow completed", results=children.results, failures=children.failures)
 
+        return children.results
 
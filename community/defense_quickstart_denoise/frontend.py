@@ -41,6 +41,9 @@ if st.button("Process Audio"):
 
                     results = response.json()["result"]
                     for idx, uploaded_file in enumerate(uploaded_files):
+                        if results[idx] is None:
+                            st.error(f"Denoising {uploaded_file.name} failed.")
+                            continue
                         with open(file_paths[idx], "rb") as f:
                             file_bytes = f.read()
                         st.session_state.response_history.append({
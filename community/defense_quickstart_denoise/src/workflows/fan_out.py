@@ -0,0 +1,59 @@
+"""Fan-out.
+
+Runs child workflows, or steps, from a workflow at the same time, with
+at most max_in_flight of them started and not yet finished. Each call
+is given as a function that starts it, so that calls past the window
+are only started when a slot frees up.
+
+Results come back in the order of the calls. A failed call does not
+cancel the others: its error is collected, and its result is None, so
+one bad input does not lose the work done on the rest.
+
+Only asyncio primitives that the workflow event loop runs
+deterministically are used, so this is safe to call from workflow code.
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Generic, TypeVar
+
+from restack_ai.workflow import log
+
+T = TypeVar("T")
+
+
+@dataclass
+class FanOutFailure:
+    index: int
+    error: str
+
+
+@dataclass
+class FanOut(Generic[T]):
+    # One per call, in the order of the calls; None where the call failed.
+    results: list[T | None]
+    failures: list[FanOutFailure] = field(default_factory=list)
+
+
+async def fan_out(
+    calls: Sequence[Callable[[], Awaitable[T]]], max_in_flight: int
+) -> FanOut[T]:
+    """Run calls with at most max_in_flight at a time."""
+    slots = asyncio.Semaphore(max(max_in_flight, 1))
+    results: list[T | None] = [None] * len(calls)
+    failures: list[FanOutFailure] = []
+
+    async def run(index: int, call: Callable[[], Awaitable[T]]) -> None:
+        async with slots:
+            try:
+                results[index] = await call()
+            except Exception as error:  # noqa: BLE001
+                # Child workflow and step errors wrap the actual failure.
+                message = str(error.__cause__ or error)
+                log.warning("fan_out call failed", index=index, error=message)
+                failures.append(FanOutFailure(index=index, error=message))
+
+    await asyncio.gather(*(run(index, call) for index, call in enumerate(calls)))
+    failures.sort(key=lambda failure: failure.index)
+    return FanOut(results=results, failures=failures)
@@ -1,10 +1,13 @@
-from restack_ai.workflow import workflow, log, workflow_info
+from restack_ai.workflow import workflow, log, workflow_info, NonRetryableError
 from dataclasses import dataclass
-from .child import ChildWorkflow
+from .child import ChildWorkflow, WorkflowInputParams as ChildWorkflowInputParams
+from .fan_out import fan_out
 
 @dataclass
 class WorkflowInputParams:
     file_data: list[tuple[str, str]]
+    # Files being denoised at the same time.
+    max_in_flight: int = 4
 
 @workflow.defn()
 class ParentWorkflow:
@@ -14,11 +17,17 @@ class ParentWorkflow:
 
         log.info("ParentWorkflow started", input=input)
 
-        child_workflow_results = []
-        for file_data in input.file_data:
-            result = await workflow.child_execute(ChildWorkflow, workflow_id=f"{parent_workflow_id}-child-execute-{file_data[0]}", input=WorkflowInputParams(file_data=file_data))
-            child_workflow_results.append(result)
+        children = await fan_out(
+            [
+                lambda index=index, file_data=file_data: workflow.child_execute(ChildWorkflow, workflow_id=f"{parent_workflow_id}-child-execute-{index}-{file_data[0]}", input=ChildWorkflowInputParams(file_data=file_data))
+                for index, file_data in enumerate(input.file_data)
+            ],
+            max_in_flight=input.max_in_flight,
+        )
+        if input.file_data and len(children.failures) == len(input.file_data):
+            raise NonRetryableError(f"All files failed: {children.failures[0].error}")
 
-        log.info("ParentWorkflow completed", results=child_workflow_results)
+        # Failed files have a None result, in their place.
+        log.info("ParentWorkflow completed", results=children.results, failures=children.failures)
 
-        return child_workflow_results
\ No newline at end of file
+        return children.results
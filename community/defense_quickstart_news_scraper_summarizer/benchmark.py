@@ -0,0 +1,80 @@
+"""Micro-benchmark of split_text on multi-megabyte articles.
+
+Compares the sentence-aware token splitter with the per-character loop
+it replaced, on synthetic articles of a few megabytes.
+"""
+
+import random
+import timeit
+
+from src.functions.helper.text_splitter import _encoding, count_tokens, split_chunks
+
+ARTICLE_SIZES_MB = [1, 4]
+MAX_TOKENS = 4096
+OVERLAP_TOKENS = 200
+REPEAT = 3
+WORDS = (
+    "the war news front line drone attack report city region minister "
+    "statement energy grid army support allies said today according"
+).split()
+
+
+def baseline_split_text(text: str, average_token_per_character: int = 3, max_tokens: int = 4096) -> list:
+    chunks = []
+    current_chunk = []
+    current_length = 0
+
+    for char in text:
+        current_chunk.append(char)
+        current_length += average_token_per_character
+
+        if current_length >= max_tokens:
+            chunks.append(''.join(current_chunk))
+            current_chunk = []
+            current_length = 0
+
+    if current_chunk:
+        chunks.append(''.join(current_chunk))
+
+    return chunks
+
+
+def synthetic_article(megabytes: int, rng: random.Random) -> str:
+    """Paragraphs of 3-8 sentences of 6-25 words."""
+    paragraphs, size = [], 0
+    while size < megabytes * 1_000_000:
+        sentences = []
+        for _ in range(rng.randint(3, 8)):
+            words = rng.choices(WORDS, k=rng.randint(6, 25))
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraphs.append(" ".join(sentences))
+        size += len(paragraphs[-1]) + 2
+    return "\n\n".join(paragraphs)
+
+
+def best_of(function) -> float:
+    return min(timeit.repeat(function, number=1, repeat=REPEAT))
+
+
+def run_benchmark() -> None:
+    rng = random.Random(0)
+    tokenizer = "tiktoken cl100k_base" if _encoding("cl100k_base") else "approximate (tiktoken files unavailable)"
+    print(f"token counts: {tokenizer}")
+    print(f"{'case':<20}{'baseline':>12}{'current':>12}{'speed-up':>10}{'chunks':>8}{'max tokens':>12}")
+    for megabytes in ARTICLE_SIZES_MB:
+        text = synthetic_article(megabytes, rng)
+        chunks = split_chunks(text, MAX_TOKENS, OVERLAP_TOKENS)
+        largest = max(count_tokens(chunk) for chunk in chunks)
+        assert all(chunk[-1] == "." for chunk in chunks), "a chunk ends mid-sentence"
+
+        baseline_time = best_of(lambda: baseline_split_text(text))
+        current_time = best_of(lambda: split_chunks(text, MAX_TOKENS, OVERLAP_TOKENS))
+        case = f"split {megabytes} MB"
+        print(
+            f"{case:<20}{baseline_time * 1e3:>10.1f}ms{current_time * 1e3:>10.1f}ms"
+            f"{baseline_time / current_time:>9.1f}x{len(chunks):>8}{largest:>12}"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
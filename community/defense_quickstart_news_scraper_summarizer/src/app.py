@@ -11,6 +11,7 @@ import uvicorn
 class QueryRequest:
     url: str
     count: int
+    incremental: bool = False
 
 app = FastAPI()
 
@@ -36,7 +37,7 @@ async def schedule_workflow(request: QueryRequest):
         runId = await client.schedule_workflow(
             workflow_name="RssWorkflow",
             workflow_id=workflow_id,
-            input={"url": request.url, "count": request.count}
+            input={"url": request.url, "count": request.count, "incremental": request.incremental}
         )
         print("Scheduled workflow", runId)
         
@@ -1,29 +1,29 @@
+import asyncio
 from restack_ai.function import function, log
-import requests
-from bs4 import BeautifulSoup
+import httpx
 from pydantic import BaseModel
 
+from src.functions.helper.fetch import fetch
+from src.functions.helper.html_text import html_to_text
+
 class CrawlInput(BaseModel):
     url: str
 
 @function.defn()
 async def crawl_website(input: CrawlInput):
     try:
-        # Send a GET request to the URL
-        response = requests.get(input.url)
-        response.raise_for_status()  # Raise an error for bad responses
-
-        # Parse the content with BeautifulSoup
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Fetch the page through the shared per-host pools and cache
+        page = await fetch(input.url)
 
-        # Extract the text content from the page
-        content = soup.get_text(separator=' ', strip=True)
+        # Extract the text content from the page, off the event loop so
+        # other crawls keep running
+        content = await asyncio.to_thread(html_to_text, page.path, page.charset)
 
-        log.info("crawl_website", extra={"content": content})
+        log.info("crawl_website", extra={"content": content, "cached": page.cached})
 
         return content
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         # Handle any exceptions that occur during the request
         log.error("crawl_website function failed", error=e)
         raise e
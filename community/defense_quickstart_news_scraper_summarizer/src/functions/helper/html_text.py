@@ -0,0 +1,73 @@
+"""HTML to text, streamed through lxml's parser.
+
+The page is fed to the parser in chunks and only its text is kept, so
+no document tree is built, whatever the size of the page.
+"""
+
+import codecs
+from pathlib import Path
+
+from lxml import etree
+
+READ_CHUNK_BYTES = 1 << 16
+# Elements whose text is not page content.
+SKIPPED_TAGS = frozenset({"script", "style", "noscript", "template", "svg"})
+# Elements whose text is a paragraph of its own.
+BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "br", "dd", "div",
+        "dl", "dt", "figcaption", "footer", "form", "h1", "h2", "h3",
+        "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol",
+        "p", "pre", "section", "table", "td", "th", "title", "tr", "ul",
+    }
+)
+
+
+class _TextTarget:
+    """Parser target collecting the text outside skipped elements."""
+
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self._skipping = 0
+
+    def start(self, tag: str, attrib: dict) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skipping += 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def end(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self._skipping = max(self._skipping - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def data(self, data: str) -> None:
+        if not self._skipping:
+            self._parts.append(data)
+
+    def close(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self._parts).split("\n"))
+        return "\n\n".join(line for line in lines if line)
+
+
+def html_to_text(path: Path, encoding: str | None = None) -> str:
+    """Visible text of an HTML file, one paragraph per block element.
+
+    encoding is the charset from the Content-Type header, if any;
+    otherwise the page's own meta charset is used.
+    """
+    if encoding:
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            encoding = None
+    parser = etree.HTMLParser(target=_TextTarget(), encoding=encoding)
+    with path.open("rb") as file:
+        while chunk := file.read(READ_CHUNK_BYTES):
+            parser.feed(chunk)
+    try:
+        return parser.close()
+    except etree.XMLSyntaxError:
+        # Nothing was fed.
+        return ""
@@ -1,28 +1,26 @@
+import asyncio
+
 from restack_ai.function import function
 
 from pydantic import BaseModel
 
+from src.functions.helper.text_splitter import split_chunks
+
 class SplitTextInput(BaseModel):
     text: str
-    average_token_per_character: int = 3
     max_tokens: int = 4096
+    # Tokens of whole sentences repeated at the start of the next chunk.
+    overlap_tokens: int = 0
+    # tiktoken encoding the budgets are counted in.
+    encoding: str = "cl100k_base"
 
 @function.defn()
 async def split_text(input: SplitTextInput) -> list:
-    chunks = []
-    current_chunk = []
-    current_length = 0
-
-    for char in input.text:
-        current_chunk.append(char)
-        current_length += input.average_token_per_character
-
-        if current_length >= input.max_tokens:
-            chunks.append(''.join(current_chunk))
-            current_chunk = []
-            current_length = 0
-
-    if current_chunk:
-        chunks.append(''.join(current_chunk))
-
-    return chunks
\ No newline at end of file
+    # Tokenising a long page takes a while; keep the event loop free.
+    return await asyncio.to_thread(
+        split_chunks,
+        input.text,
+        input.max_tokens,
+        input.overlap_tokens,
+        input.encoding,
+    )
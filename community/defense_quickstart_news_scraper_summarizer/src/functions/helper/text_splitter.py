@@ -0,0 +1,180 @@
+"""Token-budgeted text splitting on paragraph and sentence boundaries.
+
+The text is cut into paragraphs; any paragraph over the budget into
+sentences, any sentence over it into words, and only a single word
+over it is cut mid-word, on a token boundary. The pieces are then
+packed greedily into chunks of at most max_tokens, each chunk being
+one slice of the original text.
+
+The text is tokenised once; the token count of any slice is then read
+from the token offsets, so splitting costs one tokenisation plus a
+pass per boundary level.
+"""
+
+import re
+from bisect import bisect_left
+from collections.abc import Callable
+from functools import lru_cache
+from itertools import accumulate
+
+import tiktoken
+
+# Used when the tiktoken encoding cannot be loaded (e.g. offline workers).
+APPROX_CHARS_PER_TOKEN = 4
+
+_BOUNDARIES = (
+    # Paragraphs.
+    re.compile(r"\n[^\S\n]*\n\s*"),
+    # Sentences: terminal punctuation, closing quotes or brackets, space.
+    re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+"),
+    # Words.
+    re.compile(r"\s+"),
+)
+
+
+@lru_cache(maxsize=8)
+def _encoding(name: str) -> tiktoken.Encoding | None:
+    try:
+        return tiktoken.get_encoding(name)
+    except Exception:
+        # tiktoken downloads its BPE files on first use.
+        return None
+
+
+def count_tokens(text: str, encoding: str = "cl100k_base") -> int:
+    tokenizer = _encoding(encoding)
+    if tokenizer is None:
+        return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+    return len(tokenizer.encode_ordinary(text))
+
+
+@lru_cache(maxsize=8)
+def _byte_lengths(encoding: str) -> list[int]:
+    """Length in bytes of each token of the encoding, by token id."""
+    tokenizer = _encoding(encoding)
+    lengths = [0] * tokenizer.n_vocab
+    for token in range(tokenizer.n_vocab):
+        try:
+            lengths[token] = len(tokenizer.decode_single_token_bytes(token))
+        except KeyError:
+            # Unused ids between the ordinary and the special tokens.
+            continue
+    return lengths
+
+
+def _token_starts(text: str, encoding: str) -> list[int] | None:
+    """Character offset at which each token of text starts."""
+    tokenizer = _encoding(encoding)
+    if tokenizer is None:
+        return None
+    tokens = tokenizer.encode_ordinary(text)
+    if text.isascii():
+        # One byte per character: offsets are running token lengths,
+        # without decode_with_offsets' per-token character scan.
+        lengths = _byte_lengths(encoding)
+        return [0, *accumulate(map(lengths.__getitem__, tokens))][:-1]
+    _, offsets = tokenizer.decode_with_offsets(tokens)
+    return offsets
+
+
+def _span_counter(starts: list[int] | None) -> Callable[[int, int], int]:
+    """Token count of text[start:end], without tokenising it again."""
+    if starts is None:
+        return lambda start, end: -(-(end - start) // APPROX_CHARS_PER_TOKEN)
+    return lambda start, end: bisect_left(starts, end) - bisect_left(starts, start)
+
+
+def _hard_cuts(
+    starts: list[int] | None, start: int, end: int, max_tokens: int
+) -> list[int]:
+    """Offsets cutting text[start:end] into pieces of max_tokens."""
+    if starts is None:
+        return list(range(start, end, max_tokens * APPROX_CHARS_PER_TOKEN))
+    first = bisect_left(starts, start)
+    last = bisect_left(starts, end)
+    return [start, *starts[first + max_tokens : last : max_tokens]]
+
+
+def _pieces(text: str, start: int, end: int, level: int) -> list[int]:
+    """Start offsets of the pieces of text[start:end] at a boundary level.
+
+    Each piece keeps the separator that follows it.
+    """
+    cuts = [start]
+    for match in _BOUNDARIES[level].finditer(text, start, end):
+        if start < match.end() < end:
+            cuts.append(match.end())
+    return cuts
+
+
+def _segments(
+    text: str, max_tokens: int, encoding: str
+) -> list[tuple[int, int, int]]:
+    """(start, end, tokens) of pieces no larger than max_tokens, in order."""
+    starts = _token_starts(text, encoding)
+    tokens_in = _span_counter(starts)
+    spans = [(0, len(text), tokens_in(0, len(text)))]
+    for level in range(len(_BOUNDARIES)):
+        if all(tokens <= max_tokens for _, _, tokens in spans):
+            break
+        split = []
+        for start, end, tokens in spans:
+            if tokens <= max_tokens:
+                split.append((start, end, tokens))
+                continue
+            cuts = [*_pieces(text, start, end, level), end]
+            split.extend(
+                (cut, next_cut, tokens_in(cut, next_cut))
+                for cut, next_cut in zip(cuts, cuts[1:])
+            )
+        spans = split
+
+    segments = []
+    for start, end, tokens in spans:
+        if tokens <= max_tokens:
+            segments.append((start, end, tokens))
+            continue
+        cuts = [*_hard_cuts(starts, start, end, max_tokens), end]
+        segments.extend(
+            (cut, next_cut, tokens_in(cut, next_cut))
+            for cut, next_cut in zip(cuts, cuts[1:])
+        )
+    return segments
+
+
+def split_chunks(
+    text: str,
+    max_tokens: int,
+    overlap_tokens: int = 0,
+    encoding: str = "cl100k_base",
+) -> list[str]:
+    """Split text into chunks of at most max_tokens.
+
+    Consecutive chunks share up to overlap_tokens of whole sentences or
+    paragraphs.
+    """
+    if max_tokens <= 0:
+        raise ValueError("max_tokens must be positive")
+    if not 0 <= overlap_tokens < max_tokens:
+        raise ValueError("overlap_tokens must be at least 0 and below max_tokens")
+
+    segments = _segments(text, max_tokens, encoding)
+    chunks = []
+    first, total = 0, 0
+    for index, (_, _, tokens) in enumerate(segments):
+        if total + tokens > max_tokens and index > first:
+            chunks.append(text[segments[first][0] : segments[index - 1][1]])
+            # Start the next chunk with the tail of this one.
+            overlap, back = 0, index
+            while (
+                back - 1 > first
+                and overlap + segments[back - 1][2] <= overlap_tokens
+                and overlap + segments[back - 1][2] + tokens <= max_tokens
+            ):
+                back -= 1
+                overlap += segments[back][2]
+            first, total = back, overlap
+        total += tokens
+    if segments and first < len(segments):
+        chunks.append(text[segments[first][0] : segments[-1][1]])
+    return [chunk.strip() for chunk in chunks if chunk.strip()]
@@ -1,5 +1,5 @@
 from restack_ai.function import function, log
-from openai import OpenAI
+from openai import AsyncOpenAI
 from dataclasses import dataclass
 import os
 
@@ -14,6 +14,16 @@ class FunctionInputParams:
     user_prompt: str
     model: str | None = None
 
+_client: AsyncOpenAI | None = None
+
+def get_client() -> AsyncOpenAI:
+    # Async and shared, so concurrent runs on the llm_chat queue share
+    # connections instead of blocking each other.
+    global _client
+    if _client is None:
+        _client = AsyncOpenAI(api_key='openbabylon',base_url=os.environ.get("OPENBABYLON_API_URL"))
+    return _client
+
 @function.defn()
 async def llm_chat(input: FunctionInputParams) -> str:
     try:
@@ -22,13 +32,13 @@ async def llm_chat(input: FunctionInputParams) -> str:
         openbabylon_url = os.environ.get("OPENBABYLON_API_URL")
         log.info("openbabylon_url", openbabylon_url=openbabylon_url)
 
-        client = OpenAI(api_key='openbabylon',base_url=os.environ.get("OPENBABYLON_API_URL"))
+        client = get_client()
 
         messages = []
         if input.user_prompt:
             messages.append({"role": "user", "content": input.user_prompt})
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="orpo-mistral-v0.3-ua-tokV2-focus-10B-low-lr-1epoch-aux-merged-1ep",
             messages=messages,
         )
@@ -0,0 +1,19 @@
+import asyncio
+from restack_ai.function import function, log
+
+from .schema import RssMarkSeenInput
+from .seen_index import seen_index
+
+@function.defn()
+async def rss_mark_seen(input: RssMarkSeenInput):
+    try:
+        await asyncio.to_thread(
+            seen_index().mark,
+            input.url,
+            [(item.guid, item.content_hash) for item in input.items],
+        )
+        log.info("rss_mark_seen", extra={"url": input.url, "count": len(input.items)})
+        return len(input.items)
+    except Exception as error:
+        log.error("rss_mark_seen function failed", error=error)
+        raise error
@@ -1,44 +1,66 @@
-import requests
+import asyncio
+import hashlib
 import xml.etree.ElementTree as ET
+from pathlib import Path
 from restack_ai.function import function, log
 
+from src.functions.helper.fetch import fetch
 from .schema import RssInput
+from .seen_index import seen_index
+
+FIELDS = {
+    "title": "title",
+    "link": "link",
+    "description": "description",
+    "category": "category",
+    "creator": "{http://purl.org/dc/elements/1.1/}creator",
+    "pub_date": "pubDate",
+    "content_encoded": "{http://purl.org/rss/1.0/modules/content/}encoded",
+}
+
+def content_hash(item: dict) -> str:
+    content = "\0".join(item[field] or "" for field in ("title", "link", "description", "content_encoded"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def parse_items(path: Path, count: int | None, seen: dict[str, str] | None) -> tuple[list[dict], list[str]]:
+    """Parse the feed's items as they stream from disk.
+
+    With seen, only items whose key is not in it, or whose content hash
+    differs, are returned, along with the keys of the unchanged ones.
+    Parsing stops once count items are found.
+    """
+    items, unchanged = [], []
+    for _, element in ET.iterparse(path):
+        if element.tag != "item":
+            continue
+        item = {field: element.findtext(tag) for field, tag in FIELDS.items()}
+        item["content_hash"] = content_hash(item)
+        item["guid"] = element.findtext("guid") or item["link"] or item["content_hash"]
+        # The item is done with; drop its subtree to keep memory flat.
+        element.clear()
+
+        if seen is not None and seen.get(item["guid"]) == item["content_hash"]:
+            unchanged.append(item["guid"])
+            continue
+        items.append(item)
+        if count is not None and len(items) >= count:
+            break
+    return items, unchanged
 
 @function.defn()
 async def rss_pull(input:RssInput):
     try:
         # Fetch the RSS feed
-        response = requests.get(input.url)
-        response.raise_for_status()  # Raise an error for bad responses
+        feed = await fetch(input.url)
 
         # Parse the RSS feed
-        root = ET.fromstring(response.content)
-        items = []
-        for item in root.findall(".//item"):
-            title = item.find("title").text
-            link = item.find("link").text
-            description = item.find("description").text
-            category = item.find("category").text if item.find("category") is not None else None
-            creator = item.find("{http://purl.org/dc/elements/1.1/}creator").text if item.find("{http://purl.org/dc/elements/1.1/}creator") is not None else None
-            pub_date = item.find("pubDate").text if item.find("pubDate") is not None else None
-            content_encoded = item.find("{http://purl.org/rss/1.0/modules/content/}encoded").text if item.find("{http://purl.org/rss/1.0/modules/content/}encoded") is not None else None
-
-            items.append({
-                "title": title,
-                "link": link,
-                "description": description,
-                "category": category,
-                "creator": creator,
-                "pub_date": pub_date,
-                "content_encoded": content_encoded
-            })
-
-        # Limit the number of items based on input.count
-        max_count = input.count if input.count is not None else len(items)
-        items = items[:max_count]
-
-        log.info("rss_pull", extra={"data": items})
+        seen = await asyncio.to_thread(seen_index().hashes, input.url) if input.incremental else None
+        items, unchanged = await asyncio.to_thread(parse_items, feed.path, input.count, seen)
+        if unchanged:
+            await asyncio.to_thread(seen_index().touch, input.url, unchanged)
+
+        log.info("rss_pull", extra={"data": items, "unchanged": len(unchanged)})
         return items
     except Exception as error:
         log.error("rss_pull function failed", error=error)
-        raise error
\ No newline at end of file
+        raise error
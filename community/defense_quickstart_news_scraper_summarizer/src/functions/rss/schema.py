@@ -2,4 +2,13 @@ from pydantic import BaseModel, Field
 
 class RssInput(BaseModel):
     url: str = Field(default=None, description="The url to get rss from")
-    count: int | None = Field(default=None, description="The number of results to return")
\ No newline at end of file
+    count: int | None = Field(default=None, description="The number of results to return")
+    incremental: bool = Field(default=False, description="Only return items that are new or changed since they were marked seen")
+
+class RssSeenItem(BaseModel):
+    guid: str
+    content_hash: str
+
+class RssMarkSeenInput(BaseModel):
+    url: str = Field(description="The url of the feed the items are from")
+    items: list[RssSeenItem] = Field(description="The items to mark as seen")
@@ -0,0 +1,75 @@
+"""Index of the feed items already summarised.
+
+Items are keyed by feed and by their guid, or link when they have none,
+and store a hash of their content, so an item is new when its key is
+unknown and changed when its hash differs. The index lives in a local
+SQLite file. Entries not seen in their feed for RSS_SEEN_RETENTION_DAYS
+are dropped.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+RSS_SEEN_PATH = os.getenv("RSS_SEEN_PATH", ".rss_seen.sqlite3")
+RSS_SEEN_RETENTION_DAYS = float(os.getenv("RSS_SEEN_RETENTION_DAYS", "90"))
+
+_index: "SeenIndex | None" = None
+
+
+class SeenIndex:
+    def __init__(self, path: str, retention_days: float) -> None:
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS seen "
+            "(feed TEXT NOT NULL, key TEXT NOT NULL, content_hash TEXT NOT NULL, "
+            "seen_at REAL NOT NULL, PRIMARY KEY (feed, key))"
+        )
+        self._retention = retention_days * 86400
+        self._lock = threading.Lock()
+
+    def hashes(self, feed: str) -> dict[str, str]:
+        """Content hash of each item of the feed, by key."""
+        with self._lock:
+            return dict(
+                self._connection.execute(
+                    "SELECT key, content_hash FROM seen WHERE feed = ?", (feed,)
+                )
+            )
+
+    def touch(self, feed: str, keys: list[str]) -> None:
+        """Keep items still in the feed from expiring."""
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE seen SET seen_at = ? WHERE feed = ? AND key = ?",
+                [(time.time(), feed, key) for key in keys],
+            )
+
+    def mark(self, feed: str, items: list[tuple[str, str]]) -> None:
+        """Record (key, content hash) items as summarised."""
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                "INSERT INTO seen VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (feed, key) DO UPDATE SET "
+                "content_hash = excluded.content_hash, seen_at = excluded.seen_at",
+                [(feed, key, content_hash, now) for key, content_hash in items],
+            )
+            self._connection.execute(
+                "DELETE FROM seen WHERE feed = ? AND seen_at < ?",
+                (feed, now - self._retention),
+            )
+            self._connection.execute("COMMIT")
+
+
+def seen_index() -> SeenIndex:
+    """Return the process-wide index, opening it on first use."""
+    global _index  # noqa: PLW0603
+    if _index is None:
+        _index = SeenIndex(RSS_SEEN_PATH, RSS_SEEN_RETENTION_DAYS)
+    return _index
@@ -1,7 +1,9 @@
 import asyncio
+import os
 from src.client import client
 from src.functions.llm.chat import llm_chat
 from src.functions.rss.pull import rss_pull
+from src.functions.rss.mark_seen import rss_mark_seen
 from src.workflows.workflow import RssWorkflow
 from src.functions.crawl.website import crawl_website
 from src.functions.helper.split_text import split_text
@@ -11,14 +13,14 @@ async def main():
     await asyncio.gather(
         client.start_service(
             workflows=[RssWorkflow],
-            functions=[rss_pull, crawl_website, split_text]
+            functions=[rss_pull, rss_mark_seen, crawl_website, split_text]
         ),
         client.start_service(
             functions=[llm_chat],
             task_queue="llm_chat",
             options=ServiceOptions(
-                rate_limit=1,
-                max_concurrent_function_runs=1
+                rate_limit=int(os.getenv("LLM_CHAT_RATE_LIMIT", "4")),
+                max_concurrent_function_runs=int(os.getenv("LLM_CHAT_CONCURRENCY", "4"))
             )
         )
     )
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 from restack_ai.workflow import workflow, import_functions, log
 
@@ -6,16 +7,98 @@ with import_functions():
     from src.functions.crawl.website import crawl_website, CrawlInput
     from src.functions.helper.split_text import split_text, SplitTextInput
     from src.functions.llm.chat import llm_chat, FunctionInputParams
-    from src.functions.rss.schema import RssInput
+    from src.functions.rss.mark_seen import rss_mark_seen
+    from src.functions.rss.schema import RssInput, RssMarkSeenInput, RssSeenItem
 
 from pydantic import BaseModel
 
 class RssWorkflowInput(BaseModel):
     url: str
     count: int
+    # Articles crawled at the same time.
+    crawl_concurrency: int = 10
+    # Chunks being translated and summarised at the same time.
+    llm_window: int = 4
+    # Summaries combined by each step of the daily digest.
+    digest_fan_in: int = 10
+    # Only digest the articles that are new or changed since the last
+    # incremental run on this feed.
+    incremental: bool = False
 
 @workflow.defn()
 class RssWorkflow:
+    async def summarize_chunk(self, content: str, llm_slots: asyncio.Semaphore) -> str:
+        async with llm_slots:
+            user_prompt = f"Provide a translation of the news article. Translate the following content to English: {content}"
+            translation = await workflow.step(
+                function=llm_chat,
+                function_input=FunctionInputParams(user_prompt=user_prompt),
+                task_queue="llm_chat",
+                start_to_close_timeout=timedelta(seconds=120))
+
+            user_prompt = f"Provide a summary of the news found on rss feed. Summarize the following content: {translation} in maxium 1 sentence with no more than 20 words"
+            return await workflow.step(
+                function=llm_chat,
+                function_input=FunctionInputParams(user_prompt=user_prompt),
+                task_queue="llm_chat",
+                start_to_close_timeout=timedelta(seconds=120))
+
+    async def summarize_article(self, item: dict, crawl_slots: asyncio.Semaphore, llm_slots: asyncio.Semaphore) -> list[str] | None:
+        """Summaries of the article's chunks, or None if it could not be crawled.
+
+        Items without a link have nothing to crawl and get no summaries.
+        """
+        url = item.get('link')
+        log.info("rss_result", extra={"url": url})
+        if not url:
+            return []
+        async with crawl_slots:
+            try:
+                content = await workflow.step(
+                    function=crawl_website,
+                    function_input=CrawlInput(url=url),
+                    start_to_close_timeout=timedelta(seconds=30))
+                split_content = await workflow.step(
+                    function=split_text,
+                    function_input=SplitTextInput(text=f"{item.get('title', '')}\n\n{content}"),
+                    start_to_close_timeout=timedelta(seconds=30))
+            except Exception as e:
+                log.error(f"Failed to crawl {url}: {str(e)}")
+                return None
+
+        # Chunks go to translation as soon as their article is split,
+        # without waiting for the other articles.
+        return list(await asyncio.gather(*(
+            self.summarize_chunk(content, llm_slots) for content in split_content
+        )))
+
+    async def digest(self, summaries: list[str], fan_in: int, llm_slots: asyncio.Semaphore) -> str:
+        # Combine summaries in groups, in parallel, until one prompt can
+        # hold them all.
+        while len(summaries) > fan_in:
+            async def combine(group: list[str]) -> str:
+                async with llm_slots:
+                    user_prompt = f"Combine these news summaries into a short digest that keeps every distinct story: {group}."
+                    return await workflow.step(
+                        function=llm_chat,
+                        function_input=FunctionInputParams(user_prompt=user_prompt),
+                        task_queue="llm_chat",
+                        start_to_close_timeout=timedelta(seconds=120))
+
+            summaries = list(await asyncio.gather(*(
+                combine(summaries[start:start + fan_in])
+                for start in range(0, len(summaries), fan_in)
+            )))
+
+        user_prompt = f"Make a daily digest of all the news and tell me what is the most important news. Here are the summaries of the articles: {summaries}."
+
+        return await workflow.step(
+            function=llm_chat,
+            function_input=FunctionInputParams(user_prompt=user_prompt),
+            task_queue="llm_chat",
+            start_to_close_timeout=timedelta(seconds=120)
+        )
+
     @workflow.run
     async def run(self, input: RssWorkflowInput):
 
@@ -23,51 +106,36 @@ class RssWorkflow:
         count = input.count
         rss_results = await workflow.step(
             function=rss_pull,
-            function_input=RssInput(url=url, count=count),
+            function_input=RssInput(url=url, count=count, incremental=input.incremental),
             start_to_close_timeout=timedelta(seconds=10))
-        urls = [item['link'] for item in rss_results if 'link' in item]
-        titles = [item['title'] for item in rss_results if 'title' in item]
-
-
-        crawled_contents = []
-        for url in urls:
-            log.info("rss_result", extra={"url": url})
-            if url:
-                try:
-                    content = await workflow.step(
-                        function=crawl_website,
-                        function_input=CrawlInput(url),
-                        start_to_close_timeout=timedelta(seconds=30))
-                    split_content = await workflow.step(
-                        function=split_text,
-                        function_input=SplitTextInput(text=f"{titles[urls.index(url)]}\n\n{content}"),
-                        start_to_close_timeout=timedelta(seconds=30))
-                    crawled_contents.append(split_content)
-                except Exception as e:
-                    log.error(f"Failed to crawl {url}: {str(e)}")
-                    continue
-        summaries = []
-        for split_content in crawled_contents:
-            for content in split_content:
-                user_prompt = f"Provide a translation of the news article. Translate the following content to English: {content}"
-                translation = await workflow.step(
-                    function=llm_chat,
-                    function_input=FunctionInputParams(user_prompt=user_prompt),
-                    task_queue="llm_chat",
-                    start_to_close_timeout=timedelta(seconds=120))
-
-                user_prompt = f"Provide a summary of the news found on rss feed. Summarize the following content: {translation} in maxium 1 sentence with no more than 20 words"
-                summary = await workflow.step(
-                    function=llm_chat,
-                    function_input=FunctionInputParams(user_prompt=user_prompt),
-                    task_queue="llm_chat",start_to_close_timeout=timedelta(seconds=120))
-                summaries.append(summary)
 
-        user_prompt = f"Make a daily digest of all the news and tell me what is the most important news. Here are the summaries of the articles: {summaries}."
+        if not rss_results:
+            return "No new articles since the last digest."
 
-        return await workflow.step(
-            function=llm_chat, 
-            funcion_input=FunctionInputParams(user_prompt=user_prompt),
-            task_queue="llm_chat",
-            start_to_close_timeout=timedelta(seconds=120)
-        )
\ No newline at end of file
+        crawl_slots = asyncio.Semaphore(input.crawl_concurrency)
+        llm_slots = asyncio.Semaphore(input.llm_window)
+        article_summaries = await asyncio.gather(*(
+            self.summarize_article(item, crawl_slots, llm_slots) for item in rss_results
+        ))
+        summaries = [summary for article in article_summaries if article for summary in article]
+
+        if summaries:
+            digest = await self.digest(summaries, max(input.digest_fan_in, 2), llm_slots)
+        else:
+            digest = "None of the new articles could be summarised."
+
+        if input.incremental:
+            # Only once the digest is made, and only the items that are done
+            # with, so failed runs and articles are retried.
+            done = [
+                RssSeenItem(guid=item["guid"], content_hash=item["content_hash"])
+                for item, article in zip(rss_results, article_summaries)
+                if article is not None
+            ]
+            if done:
+                await workflow.step(
+                    function=rss_mark_seen,
+                    function_input=RssMarkSeenInput(url=url, items=done),
+                    start_to_close_timeout=timedelta(seconds=10))
+
+        return digest
@@ -1,6 +1,12 @@
 import asyncio
 import time
 from restack_ai import Restack
+from src.blob_store import BlobRef, read_chunks
+
+async def save_blob(blob: dict, path: str):
+    with open(path, "wb") as file:
+        async for chunk in read_chunks(BlobRef(**blob)):
+            file.write(chunk)
 
 async def main():
 
@@ -12,11 +18,14 @@ async def main():
         workflow_id=workflow_id
     )
 
-    await client.get_workflow_result(
+    result = await client.get_workflow_result(
         workflow_id=workflow_id,
         run_id=run_id
     )
 
+    await save_blob(result["media"]["blob"], "output.mp3")
+    print("Audio saved to output.mp3")
+
     exit(0)
 
 def run_schedule_workflow():
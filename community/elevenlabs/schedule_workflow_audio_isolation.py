@@ -1,8 +1,11 @@
 import asyncio
 import time
+from dataclasses import asdict
 from restack_ai import Restack
 from dotenv import load_dotenv
 import os
+from src.blob_store import put_file
+from schedule_workflow import save_blob
 # Load the environment variables
 load_dotenv()
 # Define the audio path and API key
@@ -20,13 +23,16 @@ async def main(audio_path, api_key):
     if not api_key:
         raise ValueError("API key not found. Set ELEVEN_LABS_API_KEY environment variable.")
 
+    # Store the audio and pass the workflow a reference to it
+    audio = await put_file(audio_path)
+
     # Schedule the workflow with parameters
     run_id = await client.schedule_workflow(
         workflow_name="AudioIsolationWorkflow",
         workflow_id=workflow_id,
         input={
             "api_key": api_key,
-            "audio_file_path": audio_path
+            "audio": asdict(audio)
         }
     )
 
@@ -39,6 +45,9 @@ async def main(audio_path, api_key):
     # Log the result
     print(f"Workflow Result: {result}")
 
+    await save_blob(result["media"]["blob"], "isolated.mp3")
+    print("Isolated audio saved to isolated.mp3")
+
 
 def run_schedule_workflow_audio_isolation():
     asyncio.run(main(audio_path, api_key))
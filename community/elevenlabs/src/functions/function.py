@@ -1,8 +1,66 @@
-from restack_ai.function import function, log
-import requests
+from restack_ai.function import function, function_info, heartbeat, log
+from collections.abc import AsyncIterator
+from contextlib import AsyncExitStack
+from dataclasses import asdict
+from pathlib import Path
+import asyncio
 import base64
+import httpx
 import json
 import logging
+import time
+import websockets
+
+from src.blob_store import BlobRef, local_path, put_chunks
+
+# Generous, as audio is streamed for as long as it is being generated.
+ELEVENLABS_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+
+def speech_request(input: dict, stream: bool = False) -> dict:
+    """
+    Build the ElevenLabs text-to-speech request for a text_to_speech input.
+    Args:
+        input (dict): The text_to_speech input.
+        stream (bool): Use the streaming endpoint, which sends audio as it is generated.
+    Returns:
+        dict: The url, params, headers and json of the request.
+    """
+    # Extract input parameters
+    text = input.get("text", "")
+    api_key = input.get("api_key")
+    voice_id = input.get("voice_id", "JBFqnCBsd6RMkjVDRZzb")
+    model_id = input.get("model_id", "eleven_monolingual_v1")
+    twilio_encoding = input.get("twilio_encoding", False)
+
+    # Validate input
+    if not text:
+        raise ValueError("Text is empty.")
+    if not api_key:
+        raise ValueError("API key is missing.")
+
+    # Prepare request details
+    base_url = "https://api.elevenlabs.io/v1"
+    url = f"{base_url}/text-to-speech/{voice_id}"
+    if stream:
+        url += "/stream"
+    return {
+        "url": url,
+        "params": {"output_format": "ulaw_8000" if twilio_encoding else "mp3_44100_128"},
+        "headers": {
+            "Accept": "audio/mpeg",
+            "Content-Type": "application/json",
+            "xi-api-key": api_key
+        },
+        "json": {
+            "text": text,
+            "model_id": model_id,
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.5
+            }
+        },
+    }
 
 
 @function.defn()
@@ -17,60 +75,133 @@ async def text_to_speech(input: dict) -> dict:
             - model_id (str, optional): Model ID to use. Defaults to "eleven_monolingual_v1".
             - twilio_encoding (bool, optional): If True, use Twilio-compatible output format.
     Returns:
-        dict: A dictionary containing the base64-encoded audio payload.
+        dict: A dictionary containing a reference to the audio in the blob store.
     """
     try:
         # Log the start of the function
         log.info("text_to_speech function started", input=input)
 
-        # Extract input parameters
-        text = input.get("text", "")
-        api_key = input.get("api_key")
-        voice_id = input.get("voice_id", "JBFqnCBsd6RMkjVDRZzb")
-        model_id = input.get("model_id", "eleven_monolingual_v1")
-        twilio_encoding = input.get("twilio_encoding", False)
+        request = speech_request(input)
 
-        # Validate input
-        if not text:
-            raise ValueError("Text is empty.")
-        if not api_key:
-            raise ValueError("API key is missing.")
+        # Send the request and stream the audio into the blob store as it
+        # arrives, so the workflow result only holds a reference to it
+        async with httpx.AsyncClient(timeout=ELEVENLABS_TIMEOUT) as client:
+            async with client.stream("POST", **request) as response:
+                response.raise_for_status()
+                audio = await put_chunks(response.aiter_bytes(), speech_name(input))
 
-        # Prepare request details
-        base_url = "https://api.elevenlabs.io/v1"
-        url = f"{base_url}/text-to-speech/{voice_id}"
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": api_key
-        }
-        data = {
-            "text": text,
-            "model_id": model_id,
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.5
+        log.info("ElevenLabs conversion successful", audio_size=audio.size)
+        return {
+            "media": {
+                "blob": asdict(audio)
             }
         }
-        if twilio_encoding:
-            data["output_format"] = "ulaw_8000"
+    except Exception as e:
+        log.error("text_to_speech function failed", error=str(e))
+        raise e
+
 
-        # Send the request
-        response = requests.post(url, json=data, headers=headers, stream=True)
-        response.raise_for_status()
+def speech_name(input: dict) -> str:
+    return "speech.ulaw" if input.get("twilio_encoding") else "speech.mp3"
 
-        # Collect response chunks and convert to base64
-        content = b''.join(response.iter_content(chunk_size=1024))
-        base64_audio = base64.b64encode(content).decode('utf-8')
 
-        log.info("ElevenLabs conversion successful", audio_length=len(base64_audio))
+async def websocket_sink(api_address: str | None, audio_format: str) -> AsyncIterator[None]:
+    """
+    Send audio chunks to the workflow's stream on the Restack websocket.
+
+    Same endpoint and "[DONE]" end marker as restack_ai's stream_to_websocket.
+    Each chunk is a JSON message with the audio in base64.
+    """
+    if api_address is None:
+        api_address = "localhost:9233"
+    info = function_info()
+    protocol = "ws" if api_address.startswith("localhost") else "wss"
+    websocket_url = f"{protocol}://{api_address}/stream/ws/agent?agentId={info.workflow_id}&runId={info.workflow_run_id}"
+
+    async with websockets.connect(websocket_url) as websocket:
+        try:
+            while True:
+                chunk = yield
+                await websocket.send(json.dumps({
+                    "audio": base64.b64encode(chunk).decode(),
+                    "format": audio_format,
+                }))
+        finally:
+            await websocket.send("[DONE]")
+
+
+async def file_sink(path: str) -> AsyncIterator[None]:
+    """Write audio chunks to a new file at path, replacing any file there, as they arrive."""
+    with open(path, "wb") as file:
+        while True:
+            chunk = yield
+            await asyncio.to_thread(file.write, chunk)
+            await asyncio.to_thread(file.flush)
+
+
+@function.defn()
+async def text_to_speech_stream(input: dict) -> dict:
+    """
+    Convert text to speech using ElevenLabs API, forwarding the audio as it is generated.
+    Args:
+        input (dict): The text_to_speech input, and:
+            - sink (str, optional): "websocket" to send the audio to the workflow's
+              stream on the Restack websocket, or "file" to write it to output_path.
+              Defaults to "websocket".
+            - api_address (str, optional): Restack engine API address. Defaults to "localhost:9233".
+            - output_path (str, optional): File written by the "file" sink.
+    Returns:
+        dict: A dictionary containing a reference to the audio in the blob store,
+            and the time to the first audio chunk in seconds.
+    """
+    try:
+        # Log the start of the function
+        log.info("text_to_speech_stream function started", input=input)
+
+        request = speech_request(input, stream=True)
+        sink_name = input.get("sink", "websocket")
+        if sink_name == "websocket":
+            sink = websocket_sink(input.get("api_address"), request["params"]["output_format"])
+        elif sink_name == "file":
+            if not input.get("output_path"):
+                raise ValueError("Output path is missing.")
+            sink = file_sink(input["output_path"])
+        else:
+            raise ValueError(f"Unknown sink {sink_name}.")
+
+        started = time.monotonic()
+        first_chunk_seconds = None
+
+        async def forwarded(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+            nonlocal first_chunk_seconds
+            async for chunk in chunks:
+                if first_chunk_seconds is None:
+                    first_chunk_seconds = round(time.monotonic() - started, 3)
+                    log.info("First audio chunk", seconds=first_chunk_seconds)
+                await sink.asend(chunk)
+                heartbeat(len(chunk))
+                yield chunk
+
+        # The sink gets each chunk as it arrives, and the audio is also kept
+        # in the blob store; only one chunk is held in memory at a time
+        await sink.asend(None)
+        try:
+            async with httpx.AsyncClient(timeout=ELEVENLABS_TIMEOUT) as client:
+                async with client.stream("POST", **request) as response:
+                    response.raise_for_status()
+                    audio = await put_chunks(forwarded(response.aiter_bytes()), speech_name(input))
+        finally:
+            await sink.aclose()
+
+        log.info("ElevenLabs streaming conversion successful", audio_size=audio.size)
         return {
             "media": {
-                "payload": base64_audio
+                "blob": asdict(audio),
+                "first_chunk_seconds": first_chunk_seconds
             }
         }
     except Exception as e:
-        log.error("text_to_speech function failed", error=str(e))
+        log.error("text_to_speech_stream function failed", error=str(e))
         raise e
 
 # Initialize logger
@@ -79,13 +210,14 @@ async def text_to_speech(input: dict) -> dict:
 @function.defn()
 async def isolate_audio(input: dict) -> dict:
     """
-    Perform audio isolation using the ElevenLabs API via direct HTTP POST request and return Base64-encoded audio.
+    Perform audio isolation using the ElevenLabs API via direct HTTP POST request and store the isolated audio.
     Args:
         input (dict): A dictionary containing:
             - api_key (str): The ElevenLabs API key.
-            - audio_file_path (str): Path to the audio file to isolate.
+            - audio (dict): Reference to the audio to isolate in the blob store.
+            - audio_file_path (str, optional): Path to a local audio file to isolate instead.
     Returns:
-        dict: A dictionary containing the Base64-encoded audio payload.
+        dict: A dictionary containing a reference to the isolated audio in the blob store.
     """
     try:
         # Log the start of the function
@@ -93,44 +225,48 @@ async def isolate_audio(input: dict) -> dict:
 
         # Extract input parameters
         api_key = input.get("api_key")
+        audio = BlobRef(**input["audio"]) if input.get("audio") else None
         audio_file_path = input.get("audio_file_path")
 
         # Validate input
         if not api_key:
             raise ValueError("API key is missing.")
-        if not audio_file_path:
-            raise ValueError("Audio file path is missing.")
+        if not audio and not audio_file_path:
+            raise ValueError("Audio is missing.")
 
         # Endpoint for ElevenLabs Audio Isolation
         url = "https://api.elevenlabs.io/v1/audio-isolation"
 
-        # Read the audio file
-        with open(audio_file_path, "rb") as audio_file:
-            # The `requests` library automatically handles the boundary for multipart requests
-            files = {"audio": audio_file}
-            headers = {
-                "xi-api-key": api_key  # Use the correct header key
-            }
+        headers = {
+            "xi-api-key": api_key  # Use the correct header key
+        }
+
+        async with AsyncExitStack() as stack:
+            path = await stack.enter_async_context(local_path(audio)) if audio else audio_file_path
+            # httpx reads the file in chunks as it sends the multipart body
+            audio_file = stack.enter_context(open(path, "rb"))
+            files = {"audio": (audio.name if audio and audio.name else Path(path).name, audio_file)}
 
             # Make the POST request to the ElevenLabs API
             log.info("Sending request to ElevenLabs API...")
-            response = requests.post(url, headers=headers, files=files)
-
-        # Check response status
-        if response.status_code != 200:
-            log.error("Audio isolation failed", status_code=response.status_code, response=response.text)
-            raise ValueError(f"API request failed with status code {response.status_code}: {response.text}")
+            client = await stack.enter_async_context(httpx.AsyncClient(timeout=ELEVENLABS_TIMEOUT))
+            response = await stack.enter_async_context(
+                client.stream("POST", url, headers=headers, files=files)
+            )
 
-        # Extract the audio payload
-        isolated_audio = response.content
+            # Check response status
+            if response.status_code != 200:
+                await response.aread()
+                log.error("Audio isolation failed", status_code=response.status_code, response=response.text)
+                raise ValueError(f"API request failed with status code {response.status_code}: {response.text}")
 
-        # Convert isolated audio to Base64
-        base64_audio = base64.b64encode(isolated_audio).decode("utf-8")
+            # Stream the isolated audio into the blob store
+            isolated_audio = await put_chunks(response.aiter_bytes(), "isolated.mp3")
 
-        log.info("Audio isolation successful", base64_audio_length=len(base64_audio))
+        log.info("Audio isolation successful", audio_size=isolated_audio.size)
         return {
             "media": {
-                "payload": base64_audio
+                "blob": asdict(isolated_audio)
             }
         }
     except Exception as e:
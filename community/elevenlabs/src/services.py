@@ -1,14 +1,14 @@
 import asyncio
 import os
-from src.functions.function import text_to_speech,isolate_audio
+from src.functions.function import text_to_speech,text_to_speech_stream,isolate_audio
 from src.client import client
-from src.workflows.workflow import TextToSpeechWorkflow,AudioIsolationWorkflow
+from src.workflows.workflow import TextToSpeechWorkflow,TextToSpeechStreamWorkflow,AudioIsolationWorkflow
 from watchfiles import run_process
 async def main():
 
     await client.start_service(
-        workflows=[TextToSpeechWorkflow,AudioIsolationWorkflow],
-        functions=[text_to_speech,isolate_audio]
+        workflows=[TextToSpeechWorkflow,TextToSpeechStreamWorkflow,AudioIsolationWorkflow],
+        functions=[text_to_speech,text_to_speech_stream,isolate_audio]
     )
 
 def run_services():
@@ -9,10 +9,11 @@ load_dotenv()
 
 # Import the function
 with import_functions():
-    from src.functions.function import text_to_speech, isolate_audio
+    from src.functions.function import text_to_speech, text_to_speech_stream, isolate_audio
 
 
 api_key = os.getenv("ELEVEN_LABS_API_KEY")
+api_address = os.getenv("RESTACK_ENGINE_API_ADDRESS")
 
 @workflow.defn()
 class TextToSpeechWorkflow:
@@ -36,20 +37,46 @@ class TextToSpeechWorkflow:
             start_to_close_timeout=timedelta(seconds=120)
         )
 
-        # Save the audio file (optional)
-        #try:
-            #log.info("Saving audio file")
-            #audio_data = base64.b64decode(result["media"]["payload"])
-            #with open("output.mp3", "wb") as f:
-               # f.write(audio_data)
-           # log.info("Audio file saved successfully", file_path="output.mp3")
-       # except Exception as e:
-           # log.error("Failed to save the audio file", error=str(e))
-           # raise e
+        # The audio is in the blob store; result["media"]["blob"] references it.
+        # schedule_workflow.py saves it to output.mp3.
 
         log.info("TextToSpeechWorkflow completed", result=result)
         return result
     
+@workflow.defn()
+class TextToSpeechStreamWorkflow:
+    @workflow.run
+    async def run(self, input: dict):
+        """
+        Workflow to convert text to speech, forwarding the audio as it is generated.
+
+        :param input: A dictionary containing `text`, and optionally `sink`,
+            "websocket" (default) or "file", and the `output_path` of the file sink.
+        """
+        log.info("TextToSpeechStreamWorkflow started")
+
+        input_data = {
+            "text": input.get("text", "Hello, this is a test of the ElevenLabs text-to-speech converter using restack SDK."),
+            "api_key": api_key,
+            "voice_id": "JBFqnCBsd6RMkjVDRZzb",
+            "model_id": "eleven_monolingual_v1",
+            "sink": input.get("sink", "websocket"),
+            "output_path": input.get("output_path"),
+            "api_address": api_address
+        }
+
+        # Heartbeats on every chunk, so a stalled stream fails fast
+        result = await workflow.step(
+            function=text_to_speech_stream,
+            function_input=input_data,
+            schedule_to_close_timeout=timedelta(seconds=300),
+            start_to_close_timeout=timedelta(seconds=300),
+            heartbeat_timeout=timedelta(seconds=30)
+        )
+
+        log.info("TextToSpeechStreamWorkflow completed", result=result)
+        return result
+
 @workflow.defn()
 class AudioIsolationWorkflow:
     @workflow.run
@@ -57,9 +84,11 @@ class AudioIsolationWorkflow:
         """
         Workflow to isolate audio from a given file path.
 
-        :param input: A dictionary containing `api_key` and `audio_file_path`.
+        :param input: A dictionary containing `api_key` and either `audio`, a
+            reference to the audio in the blob store, or `audio_file_path`.
         """
         api_key = input.get("api_key")
+        audio = input.get("audio")
         audio_file_path = input.get("audio_file_path")
 
         log.info("AudioIsolationWorkflow started")
@@ -67,6 +96,7 @@ class AudioIsolationWorkflow:
         # Define input parameters for the `isolate_audio` function
         input_data = {
             "api_key": api_key,
+            "audio": audio,
             "audio_file_path": audio_file_path
         }
 
@@ -77,8 +107,7 @@ class AudioIsolationWorkflow:
             start_to_close_timeout=timedelta(seconds=120)
         )
 
-        # Log the Base64-encoded audio payload
-        log.info("Audio isolation completed successfully", base64_audio=result)
+        log.info("Audio isolation completed successfully", result=result)
 
-        # Return the Base64-encoded audio directly
+        # Return the reference to the isolated audio
         return result
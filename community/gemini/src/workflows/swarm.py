@@ -1,34 +1,43 @@
 from restack_ai.workflow import workflow, import_functions, log, RetryPolicy, workflow_info
 from pydantic import BaseModel
 from datetime import timedelta
-import asyncio
 from src.functions.tools import USTopCities
-from src.workflows.multi_function_call_advanced import GeminiMultiFunctionCallAdvancedWorkflow, MultiFunctionCallAdvancedInputParams        
+from src.workflows.multi_function_call_advanced import GeminiMultiFunctionCallAdvancedWorkflow, MultiFunctionCallAdvancedInputParams
+from src.workflows.fan_out import fan_out
 
 class WorkflowInputParams(BaseModel):
     num_cities: int = 50
+    # Agents running at the same time, to stay under the Gemini rate limit.
+    max_in_flight: int = 10
 
 @workflow.defn()
 class GeminiSwarmWorkflow:
     @workflow.run
     async def run(self, input: WorkflowInputParams):
         parent_workflow_id = workflow_info().workflow_id
-        
+
         # Get all available cities from USTopCities enum
         all_cities = [city.value for city in USTopCities]
-        
+
         # Take the first n cities based on input
         selected_cities = all_cities[:input.num_cities]
 
-        results_tasks = await asyncio.gather(*[
-            workflow.child_execute(
-                GeminiMultiFunctionCallAdvancedWorkflow,
-                input=MultiFunctionCallAdvancedInputParams(user_content=f"What's the weather in {city}?"),
-                workflow_id=f"{parent_workflow_id}-child-{city.replace(', ', '-')}"
-            ) for city in selected_cities
-        ])
+        children = await fan_out(
+            [
+                lambda city=city: workflow.child_execute(
+                    GeminiMultiFunctionCallAdvancedWorkflow,
+                    input=MultiFunctionCallAdvancedInputParams(user_content=f"What's the weather in {city}?"),
+                    workflow_id=f"{parent_workflow_id}-child-{city.replace(', ', '-')}"
+                ) for city in selected_cities
+            ],
+            max_in_flight=input.max_in_flight,
+        )
+        errors = {failure.index: failure.error for failure in children.failures}
+
+        results = [
+            {"city": city, "result": result, **({"error": errors[index]} if index in errors else {})}
+            for index, (city, result) in enumerate(zip(selected_cities, children.results))
+        ]
 
-        results = [{"city": city, "result": result} for city, result in zip(selected_cities, results_tasks)]
-        
         log.info("GeminiSwarmWorkflow completed", results=results)
         return results
@@ -0,0 +1,203 @@
+"""Fetch.
+
+Shared HTTP layer for the functions that download pages and feeds.
+
+Each host gets its own pooled client, kept alive between calls, with at
+most FETCH_HOST_CONNECTIONS requests in flight and at least
+FETCH_HOST_INTERVAL seconds between their starts, so a crawl does not
+hammer one site and a slow site only holds up its own requests.
+
+Response bodies are streamed to a disk cache. A cached response is
+reused without a request while its Cache-Control max-age lasts, then
+revalidated with its ETag or Last-Modified, and a 304 reuses the body.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import httpx
+
+FETCH_CACHE_DIR = Path(
+    os.getenv(
+        "FETCH_CACHE_DIR",
+        Path(tempfile.gettempdir()) / "llama_quickstart_fetch",
+    )
+)
+# Cached responses kept on disk, least recently used are removed first.
+FETCH_CACHE_FILES = int(os.getenv("FETCH_CACHE_FILES", "1024"))
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", "20"))
+FETCH_HOST_CONNECTIONS = int(os.getenv("FETCH_HOST_CONNECTIONS", "4"))
+FETCH_HOST_INTERVAL = float(os.getenv("FETCH_HOST_INTERVAL", "0.2"))
+USER_AGENT = "restack-llama-quickstart/0.0.1"
+DOWNLOAD_CHUNK_BYTES = 1 << 16
+
+
+@dataclass
+class Fetched:
+    """A response body on disk."""
+
+    url: str
+    path: Path
+    content_type: str
+    # Whether the body was reused from the cache.
+    cached: bool
+
+    @property
+    def charset(self) -> str | None:
+        for parameter in self.content_type.split(";")[1:]:
+            name, _, value = parameter.partition("=")
+            if name.strip().lower() == "charset":
+                return value.strip().strip('"') or None
+        return None
+
+    def read(self) -> bytes:
+        return self.path.read_bytes()
+
+    def json(self):
+        return json.loads(self.read())
+
+
+class _Host:
+    """Connection pool and request spacing for one host."""
+
+    def __init__(self) -> None:
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(FETCH_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=FETCH_HOST_CONNECTIONS,
+                max_keepalive_connections=FETCH_HOST_CONNECTIONS,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+        )
+        self.slots = asyncio.Semaphore(FETCH_HOST_CONNECTIONS)
+        self._next_start = 0.0
+
+    async def wait_turn(self) -> None:
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + FETCH_HOST_INTERVAL
+        await asyncio.sleep(start - now)
+
+
+_hosts: dict[str, _Host] = {}
+_entries: dict[str, asyncio.Lock] = {}
+
+
+def _host(url: str) -> _Host:
+    netloc = urlsplit(url).netloc
+    if netloc not in _hosts:
+        _hosts[netloc] = _Host()
+    return _hosts[netloc]
+
+
+def _max_age(headers: httpx.Headers) -> float:
+    """Seconds the response may be reused without revalidation."""
+    directives = [
+        directive.strip()
+        for directive in headers.get("cache-control", "").lower().split(",")
+    ]
+    if "no-cache" in directives or "no-store" in directives:
+        return 0.0
+    for directive in directives:
+        if directive.startswith("max-age="):
+            try:
+                return float(directive.removeprefix("max-age="))
+            except ValueError:
+                return 0.0
+    return 0.0
+
+
+def _validators(headers: httpx.Headers) -> dict:
+    if "no-store" in headers.get("cache-control", "").lower():
+        # Still written to disk to be read back, but never reused.
+        return {"etag": None, "last_modified": None}
+    return {
+        "etag": headers.get("etag"),
+        "last_modified": headers.get("last-modified"),
+    }
+
+
+def _evict_cache() -> None:
+    bodies = sorted(
+        FETCH_CACHE_DIR.glob("*.body"), key=lambda path: path.stat().st_mtime
+    )
+    for path in bodies[: max(len(bodies) - FETCH_CACHE_FILES, 0)]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".json").unlink(missing_ok=True)
+
+
+def _load_entry(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+
+async def fetch(url: str, params: dict | None = None) -> Fetched:
+    """GET url through the per-host pools and the disk cache.
+
+    Raises httpx.HTTPError on network errors and error statuses.
+    """
+    url = str(httpx.URL(url, params=params))
+    key = hashlib.sha256(url.encode()).hexdigest()
+    body = FETCH_CACHE_DIR / f"{key}.body"
+    entry_path = body.with_suffix(".json")
+
+    async with _entries.setdefault(key, asyncio.Lock()):
+        entry = _load_entry(entry_path) if body.exists() else None
+        if entry and time.time() < entry["fetched_at"] + entry["max_age"]:
+            body.touch()
+            return Fetched(url, body, entry["content_type"], cached=True)
+
+        headers = {}
+        if entry and entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        host = _host(url)
+        FETCH_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        partial = body.with_suffix(".part")
+        async with host.slots:
+            await host.wait_turn()
+            async with host.client.stream(
+                "GET", url, headers=headers
+            ) as response:
+                if entry and response.status_code == httpx.codes.NOT_MODIFIED:
+                    entry["fetched_at"] = time.time()
+                    entry["max_age"] = _max_age(response.headers)
+                    entry.update(
+                        {
+                            name: value
+                            for name, value in _validators(response.headers).items()
+                            if value
+                        }
+                    )
+                    entry_path.write_text(json.dumps(entry))
+                    body.touch()
+                    return Fetched(url, body, entry["content_type"], cached=True)
+
+                response.raise_for_status()
+                with partial.open("wb") as file:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                        file.write(chunk)
+
+        partial.replace(body)
+        entry = {
+            "url": url,
+            "content_type": response.headers.get("content-type", ""),
+            "fetched_at": time.time(),
+            "max_age": _max_age(response.headers),
+            **_validators(response.headers),
+        }
+        entry_path.write_text(json.dumps(entry))
+        _evict_cache()
+        return Fetched(url, body, entry["content_type"], cached=False)
@@ -0,0 +1,26 @@
+import asyncio
+
+from restack_ai.function import function
+
+from pydantic import BaseModel
+
+from src.functions.helper.text_splitter import split_chunks
+
+class SplitTextInput(BaseModel):
+    text: str
+    max_tokens: int = 4096
+    # Tokens of whole sentences repeated at the start of the next chunk.
+    overlap_tokens: int = 0
+    # tiktoken encoding the budgets are counted in.
+    encoding: str = "cl100k_base"
+
+@function.defn()
+async def split_text(input: SplitTextInput) -> list:
+    # Tokenising a long page takes a while; keep the event loop free.
+    return await asyncio.to_thread(
+        split_chunks,
+        input.text,
+        input.max_tokens,
+        input.overlap_tokens,
+        input.encoding,
+    )
@@ -4,13 +4,14 @@ from src.functions.llm.chat import llm_chat
 from src.functions.hn.search import hn_search
 from src.workflows.workflow import HnWorkflow
 from src.functions.crawl.website import crawl_website
+from src.functions.helper.split_text import split_text
 from restack_ai.restack import ServiceOptions
 
 async def main():
     await asyncio.gather(
         client.start_service(
             workflows=[HnWorkflow],
-            functions=[hn_search, crawl_website]
+            functions=[hn_search, crawl_website, split_text]
         ),
         client.start_service(
             functions=[llm_chat],
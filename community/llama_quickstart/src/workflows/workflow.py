@@ -5,6 +5,7 @@ with import_functions():
     from src.functions.hn.search import hn_search
     from src.functions.hn.schema import HnSearchInput
     from src.functions.crawl.website import crawl_website
+    from src.functions.helper.split_text import split_text, SplitTextInput
     from src.functions.llm.chat import llm_chat, FunctionInputParams
 
 @workflow.defn()
@@ -22,7 +23,11 @@ class HnWorkflow:
             log.info("hn_result", extra={"url": url})
             if url:
                 content = await workflow.step(crawl_website, url, start_to_close_timeout=timedelta(seconds=30))
-                crawled_contents.append(content)
+                # Keep each page within the prompt budget: its first chunk
+                # is where a project's page says what the project is.
+                chunks = await workflow.step(split_text, SplitTextInput(text=content), start_to_close_timeout=timedelta(seconds=30))
+                if chunks:
+                    crawled_contents.append(chunks[0])
         
         summaries = []
         for content in crawled_contents:
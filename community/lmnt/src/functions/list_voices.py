@@ -6,13 +6,10 @@ from .utils.client import lmnt_client
 
 @function.defn()
 async def lmnt_list_voices() -> Dict[str, Any]:
-    client = None
     try:
+        # Shared client, kept open for the worker's other calls.
         client = await lmnt_client()
         voices = await client.list_voices()
         return {"voices": voices}
     except Exception as e:
         raise FunctionFailure(f"Failed to list voices: {str(e)}", non_retryable=True) from e
-    finally:
-        if client and hasattr(client, 'close'):
-            await client.close()
\ No newline at end of file
@@ -1,30 +1,53 @@
 """Module for LMNT speech synthesis functionality."""
+import asyncio
 import os
-from typing import Optional, Dict, Any
+import shutil
+from typing import Optional, Dict, Any, List
 from pydantic import BaseModel, Field
-from restack_ai.function import function, FunctionFailure
-from .utils.client import lmnt_client
+from restack_ai.function import function, log, FunctionFailure
+from .utils.synthesis import synthesis_service
 
 class SynthesizeInputParams(BaseModel):
     user_content: str = Field(description="The text content to synthesize")
     voice: str = Field(description="The voice to use for synthesis")
-    filename: str = Field(description="The output filename")
+    filename: Optional[str] = Field(default=None, description="Output filename in src/media, if the audio should also be copied there")
     options: Optional[Dict[str, Any]] = Field(default=None, description="Optional synthesis parameters")
 
-@function.defn()
-async def lmnt_synthesize(params: SynthesizeInputParams) -> str:
-    client = None
-    try:
-        client = await lmnt_client()
-        synthesis = await client.synthesize(params.user_content, params.voice)
+class SynthesizeBatchInputParams(BaseModel):
+    items: List[SynthesizeInputParams] = Field(description="The syntheses to run")
+
+async def synthesize_one(params: SynthesizeInputParams) -> str:
+    path, cached = await synthesis_service().synthesize(params.user_content, params.voice, params.options)
+    log.info("lmnt synthesis", voice=params.voice, path=str(path), cached=cached)
+    if params.filename:
         media_path = os.path.join('src', 'media')
         os.makedirs(media_path, exist_ok=True)
         file_path = os.path.join(media_path, params.filename)
-        with open(file_path, 'wb') as f:
-            f.write(synthesis['audio'])
-        return params.filename
+        await asyncio.to_thread(shutil.copyfile, path, file_path)
+        return file_path
+    return str(path)
+
+@function.defn()
+async def lmnt_synthesize(params: SynthesizeInputParams) -> str:
+    """Synthesize params.user_content, returning the path of the audio.
+
+    The audio is named after its text, voice and options, so repeated
+    phrases are read from the cache and different phrases never overwrite
+    each other.
+    """
+    try:
+        return await synthesize_one(params)
     except Exception as e:
         raise FunctionFailure(f"Synthesis failed: {str(e)}") from e
-    finally:
-        if client and hasattr(client, 'close'):
-            await client.close()
\ No newline at end of file
+
+@function.defn()
+async def lmnt_synthesize_batch(params: SynthesizeBatchInputParams) -> List[str]:
+    """Synthesize several texts in one step, concurrently over the shared client.
+
+    Returns the path of each item's audio, in order. Identical items are
+    synthesized once.
+    """
+    try:
+        return list(await asyncio.gather(*(synthesize_one(item) for item in params.items)))
+    except Exception as e:
+        raise FunctionFailure(f"Batch synthesis failed: {str(e)}") from e
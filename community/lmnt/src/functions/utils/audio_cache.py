@@ -0,0 +1,82 @@
+"""Module for the on-disk cache of synthesized audio.
+
+Audio is stored under the SHA-256 of the text, voice and synthesis
+options it was made from, so a phrase already synthesized is read from
+disk instead of calling LMNT again, and two different phrases never
+share a file. The least recently used files are removed once the
+cache is over LMNT_CACHE_MAX_BYTES.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+LMNT_CACHE_DIR = Path(os.getenv('LMNT_CACHE_DIR', os.path.join('src', 'media')))
+LMNT_CACHE_MAX_BYTES = int(os.getenv('LMNT_CACHE_MAX_BYTES', str(1 << 30)))
+
+# Only cache entries are evicted, not other files in the directory.
+_ENTRY = re.compile(r'[0-9a-f]{64}\.\w+')
+
+_cache: Optional['AudioCache'] = None
+
+def cache_key(text: str, voice: str, options: Optional[Dict[str, Any]]) -> str:
+    content = json.dumps([text, voice, options or {}], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+class AudioCache:
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def path(self, key: str, format: str) -> Path:
+        return self.root / f"{key}.{format}"
+
+    def get(self, key: str, format: str) -> Optional[Path]:
+        """Path of the cached audio, or None when it is not cached."""
+        path = self.path(key, format)
+        try:
+            # Mark the entry as recently used.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, format: str, audio: bytes) -> Path:
+        """Store audio, evicting the least recently used entries if needed."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(key, format)
+        # Written under a temporary name, so readers never see half a file.
+        descriptor, staged = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(audio)
+            os.replace(staged, path)
+        except BaseException:
+            Path(staged).unlink(missing_ok=True)
+            raise
+        self._evict(keep=path)
+        return path
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for entry in os.scandir(self.root):
+            if _ENTRY.fullmatch(entry.name):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, Path(entry.path)))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                path.unlink(missing_ok=True)
+                total -= size
+
+def audio_cache() -> AudioCache:
+    """Return the process-wide audio cache."""
+    global _cache  # noqa: PLW0603
+    if _cache is None:
+        _cache = AudioCache(LMNT_CACHE_DIR, LMNT_CACHE_MAX_BYTES)
+    return _cache
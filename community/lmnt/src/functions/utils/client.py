@@ -1,21 +1,37 @@
 """Client module for LMNT API integration."""
 import os
+import aiohttp
+from typing import Optional
 from lmnt.api import Speech
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Connections kept open to the LMNT API, shared by all functions of the worker.
+LMNT_MAX_CONNECTIONS = int(os.getenv('LMNT_MAX_CONNECTIONS', '4'))
+
+_client: Optional[Speech] = None
+
 async def lmnt_client() -> Speech:
-    """Initialize and return LMNT Speech client.
-    
+    """Return the worker's LMNT Speech client, initializing it on first use.
+
+    The client is shared by all functions and never closed, so requests
+    reuse its pooled keep-alive connections instead of opening a new
+    session each time.
+
     Raises:
         ValueError: If LMNT_API_KEY environment variable is not set
         RuntimeError: If client initialization fails
     """
+    global _client  # noqa: PLW0603
+    if _client is not None:
+        return _client
     api_key = os.getenv('LMNT_API_KEY')
     if not api_key:
         raise ValueError("LMNT_API_KEY environment variable is not set")
     try:
-        return Speech(api_key)
+        # The connector is created here, in the worker's event loop.
+        _client = Speech(api_key, connector=aiohttp.TCPConnector(limit=LMNT_MAX_CONNECTIONS))
+        return _client
     except Exception as e:
         raise RuntimeError(f"Failed to initialize LMNT client: {str(e)}") from e
@@ -0,0 +1,63 @@
+"""Module for the worker's LMNT synthesis service.
+
+All synthesis of a worker goes through one service, on the shared LMNT
+client. Cached phrases are served from disk. Identical requests in
+flight at the same time, from any function, share one LMNT call, and
+at most LMNT_MAX_CONNECTIONS calls run at once over the client's
+pooled connections.
+"""
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from .audio_cache import AudioCache, audio_cache, cache_key
+from .client import LMNT_MAX_CONNECTIONS, lmnt_client
+
+_service: Optional['SynthesisService'] = None
+
+class SynthesisService:
+    def __init__(self, cache: AudioCache, max_concurrency: int):
+        self.cache = cache
+        self._slots = asyncio.Semaphore(max(max_concurrency, 1))
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def synthesize(self, text: str, voice: str, options: Optional[Dict[str, Any]] = None) -> Tuple[Path, bool]:
+        """Path of the audio for text in voice, and whether it came from the cache."""
+        options = options or {}
+        format = options.get('format', 'mp3')
+        key = cache_key(text, voice, options)
+
+        path = await asyncio.to_thread(self.cache.get, key, format)
+        if path is not None:
+            return path, True
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            return await asyncio.shield(in_flight), False
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            async with self._slots:
+                client = await lmnt_client()
+                synthesis = await client.synthesize(text, voice, **options)
+            path = await asyncio.to_thread(self.cache.put, key, format, synthesis['audio'])
+            future.set_result(path)
+            return path, False
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here, so it is not reported as never retrieved
+            # when no other request shares it.
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+def synthesis_service() -> SynthesisService:
+    """Return the worker's synthesis service."""
+    global _service  # noqa: PLW0603
+    if _service is None:
+        _service = SynthesisService(audio_cache(), LMNT_MAX_CONNECTIONS)
+    return _service
@@ -6,7 +6,7 @@ from src.client import client
 from restack_ai.restack import ServiceOptions
 
 from src.functions.function import example_function
-from src.functions.synthesize import lmnt_synthesize
+from src.functions.synthesize import lmnt_synthesize, lmnt_synthesize_batch
 from src.functions.list_voices import lmnt_list_voices
 
 from src.workflows.workflow import ExampleWorkflow, ChildWorkflow
@@ -26,7 +26,7 @@ async def main():
         ),
         client.start_service(
             task_queue="lmnt",
-            functions=[lmnt_synthesize, lmnt_list_voices],
+            functions=[lmnt_synthesize, lmnt_synthesize_batch, lmnt_list_voices],
             options=ServiceOptions(
                 rate_limit=2,
                 max_concurrent_function_runs=4
@@ -23,8 +23,7 @@ class ChildWorkflow:
             lmnt_synthesize,
             SynthesizeInputParams(
                 user_content=input.name,
-                voice=input.voice,
-                filename=f"{input.voice.lower().replace(' ', '_')}.mp3"
+                voice=input.voice
             ),
             task_queue="lmnt",
             start_to_close_timeout=timedelta(minutes=2)
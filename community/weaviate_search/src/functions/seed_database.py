@@ -1,7 +1,6 @@
-import json
-import requests
 from restack_ai.function import function, log
 import weaviate.classes as wvc
+from src.functions.fetch import fetch
 from src.functions.weaviate_client import get_weaviate_client
 
 
@@ -21,8 +20,8 @@ async def seed_database() -> str:
 
         fname = "jeopardy_tiny_with_vectors_all-OpenAI-ada-002.json"  # This file includes pre-generated vectors
         url = f"https://raw.githubusercontent.com/weaviate-tutorials/quickstart/main/data/{fname}"
-        resp = requests.get(url)
-        data = json.loads(resp.text)  # Load data
+        resp = await fetch(url)  # Cached, so seeding again does not download it again
+        data = resp.json()  # Load data
 
         question_objs = list()
         for i, d in enumerate(data):
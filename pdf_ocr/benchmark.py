@@ -0,0 +1,141 @@
+"""Micro-benchmark of DocumentExtractionService pre- and post-processing.
+
+Compares the histogram/lookup-table contrast stretch and the flat-array
+prediction filter with the implementations they replaced, on synthetic
+multi-megapixel scans and a synthetic OCR result.
+"""
+
+import timeit
+from typing import Any
+
+import numpy as np
+from doctr.io.elements import Block, Document, Line, Page, Word
+from PIL import Image
+from pydantic import BaseModel, Field
+
+from src.functions.torch_ocr import DocumentExtractionService
+
+# A4 at 300 and 600 dpi.
+SCAN_SIZES = [(2480, 3508), (4960, 7016)]
+# Pages, blocks per page, lines per block, words per line.
+RESULT_SHAPE = (20, 20, 10, 10)
+REPEAT = 5
+
+
+class OCRPrediction(BaseModel):
+    pages: list[dict[str, Any]] = Field(
+        description="List of pages with OCR predictions"
+    )
+
+
+def baseline_preprocess_image(image: Image.Image) -> np.ndarray:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    img_array = np.array(image)
+    p2, p98 = np.percentile(img_array, (2, 98))
+    img_array = np.clip(img_array, p2, p98)
+    return ((img_array - p2) / (p98 - p2) * 255).astype(np.uint8)
+
+
+def baseline_process_predictions(
+    document: Document, confidence_threshold: float = 0.3
+) -> str:
+    json_output = OCRPrediction.model_validate(document.export())
+    processed_text: list[str] = []
+
+    for page in json_output.pages:
+        page_text: list[str] = []
+        for block in page["blocks"]:
+            for line in block["lines"]:
+                line_text: list[str] = []
+                for word in line["words"]:
+                    if word["confidence"] > confidence_threshold:
+                        line_text.append(word["value"])
+                if line_text:
+                    page_text.append(" ".join(line_text))
+        processed_text.append("\n".join(page_text))
+
+    return "\n\n=== PAGE BREAK ===\n\n".join(processed_text)
+
+
+def synthetic_scan(width: int, height: int, rng: np.random.Generator) -> Image.Image:
+    """Greyish paper with dark speckles, like a low-contrast scan."""
+    paper = rng.normal(200, 12, size=(height, width, 1))
+    ink = rng.random((height, width, 1)) < 0.08
+    pixels = np.where(ink, rng.normal(70, 20, size=(height, width, 1)), paper)
+    pixels = np.repeat(pixels, 3, axis=2) + rng.normal(0, 3, size=(height, width, 3))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), "RGB")
+
+
+def synthetic_result(rng: np.random.Generator) -> Document:
+    page_count, block_count, line_count, word_count = RESULT_SHAPE
+    image = np.zeros((1, 1, 3), dtype=np.uint8)
+    geometry = ((0.0, 0.0), (1.0, 1.0))
+    pages = []
+    for page_index in range(page_count):
+        blocks = [
+            Block(
+                lines=[
+                    Line(
+                        [
+                            Word(
+                                value=f"word{rng.integers(10_000)}",
+                                confidence=float(rng.random()),
+                                geometry=geometry,
+                                objectness_score=1.0,
+                                crop_orientation={"value": 0, "confidence": None},
+                            )
+                            for _ in range(word_count)
+                        ]
+                    )
+                    for _ in range(line_count)
+                ]
+            )
+            for _ in range(block_count)
+        ]
+        pages.append(
+            Page(image, blocks, page_idx=page_index, dimensions=(1000, 1000))
+        )
+    return Document(pages)
+
+
+def best_of(function: Any) -> float:
+    return min(timeit.repeat(function, number=1, repeat=REPEAT))
+
+
+def run_benchmark() -> None:
+    rng = np.random.default_rng(0)
+    service = DocumentExtractionService()
+
+    print(f"{'case':<32}{'baseline':>12}{'current':>12}{'speed-up':>10}")
+    for width, height in SCAN_SIZES:
+        image = synthetic_scan(width, height, rng)
+        baseline = baseline_preprocess_image(image)
+        current = service._preprocess_image(image)
+        max_difference = np.abs(baseline.astype(np.int16) - current).max()
+        assert max_difference <= 1, f"outputs differ by {max_difference}"
+
+        baseline_time = best_of(lambda: baseline_preprocess_image(image))
+        current_time = best_of(lambda: service._preprocess_image(image))
+        case = f"preprocess {width * height / 1e6:.1f} MP"
+        print(
+            f"{case:<32}{baseline_time * 1e3:>10.1f}ms{current_time * 1e3:>10.1f}ms"
+            f"{baseline_time / current_time:>9.1f}x"
+        )
+
+    document = synthetic_result(rng)
+    assert baseline_process_predictions(document) == service._process_predictions(
+        document.pages
+    )
+    baseline_time = best_of(lambda: baseline_process_predictions(document))
+    current_time = best_of(lambda: service._process_predictions(document.pages))
+    case = f"predictions {np.prod(RESULT_SHAPE)} words"
+    print(
+        f"{case:<32}{baseline_time * 1e3:>10.1f}ms{current_time * 1e3:>10.1f}ms"
+        f"{baseline_time / current_time:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark()
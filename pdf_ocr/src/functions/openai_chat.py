@@ -1,10 +1,12 @@
 import os
 
 from dotenv import load_dotenv
-from openai import OpenAI
 from pydantic import BaseModel
 from restack_ai.function import NonRetryableError, function, log
 
+from src.functions.utils.llm_client import create_chat_completion
+from src.functions.utils.response_cache import response_cache
+
 load_dotenv()
 
 class OpenAiChatInput(BaseModel):
@@ -20,19 +22,23 @@ async def openai_chat(input: OpenAiChatInput) -> str:
         if (os.environ.get("RESTACK_API_KEY") is None):
             raise NonRetryableError("RESTACK_API_KEY is not set")
 
-        client = OpenAI(base_url="https://ai.restack.io", api_key=os.environ.get("RESTACK_API_KEY"))
-
         messages = []
         if input.system_content:
             messages.append({"role": "system", "content": input.system_content})
         messages.append({"role": "user", "content": input.user_content})
 
-        response = client.chat.completions.create(
-            model=input.model or "gpt-4.1-mini",
-            messages=messages
-        )
+        request = {"model": input.model or "gpt-4.1-mini", "messages": messages}
+        cache = response_cache()
+        if cache and (content := cache.lookup(request)) is not None:
+            log.info("openai_chat cache hit", cache_stats=cache.stats())
+            return content
+
+        response = await create_chat_completion(**request)
         log.info("openai_chat function completed", response=response)
-        return response.choices[0].message.content
+        content = response.choices[0].message.content
+        if cache:
+            cache.store(request, content)
+        return content
     except Exception as e:
         log.error("openai_chat function failed", error=e)
         raise e
@@ -0,0 +1,126 @@
+"""Uploaded documents on the worker's local disk.
+
+Files are streamed from the Restack download API to a local cache in
+chunks, so several steps over the same PDF download it once and never
+hold the whole body in memory. A cached copy is only reused while the
+upload's ETag, Last-Modified and size are unchanged, or, when the API
+reports none of them, within the workflow run that downloaded it. PDF pages are rasterised one at a time,
+only when OCR asks for them.
+"""
+
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pypdfium2 as pdfium
+from numpy.typing import NDArray
+from restack_ai.function import function_info
+
+from ...client import api_address
+
+OCR_DOWNLOAD_DIR = Path(
+    os.getenv("OCR_DOWNLOAD_DIR", Path(tempfile.gettempdir()) / "pdf_ocr")
+)
+# Downloaded files kept on disk, least recently used are removed first.
+OCR_DOWNLOAD_CACHE_FILES = int(os.getenv("OCR_DOWNLOAD_CACHE_FILES", "64"))
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+# Same resolution DocumentFile.from_pdf renders at.
+PDF_RENDER_SCALE = 2
+
+_downloads: dict[str, asyncio.Lock] = {}
+
+
+def download_url(file_name: str) -> str:
+    if api_address:
+        return f"https://{api_address}/api/download/{file_name}"
+    return f"http://localhost:6233/api/download/{file_name}"
+
+
+def _evict_downloads() -> None:
+    files = sorted(
+        (path for path in OCR_DOWNLOAD_DIR.iterdir() if path.suffix != ".part"),
+        key=lambda path: path.stat().st_mtime,
+    )
+    for path in files[: max(len(files) - OCR_DOWNLOAD_CACHE_FILES, 0)]:
+        path.unlink(missing_ok=True)
+
+
+async def _version(http_client: httpx.AsyncClient, url: str) -> str:
+    """What identifies the current content of an upload.
+
+    The ETag, Last-Modified and size the download API reports for it, or,
+    if it reports none, the workflow run, so that a copy is only reused
+    by the steps of the run that downloaded it.
+    """
+    try:
+        response = await http_client.head(url)
+        response.raise_for_status()
+        validators = [
+            response.headers.get(header, "")
+            for header in ("etag", "last-modified", "content-length")
+        ]
+        if any(validators):
+            return "\0".join(validators)
+    except httpx.HTTPError:
+        pass
+    return f"run:{function_info().workflow_run_id}"
+
+
+async def download(file_name: str) -> Path:
+    """Return a local copy of an uploaded file, downloading it once.
+
+    Copies are keyed by the file name and the content's version, so a new
+    upload under the same name, or another upload with the same base
+    name, is downloaded again rather than served the old file.
+    """
+    url = download_url(file_name)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(60.0)) as http_client:
+        version = await _version(http_client, url)
+        key = hashlib.sha256(f"{file_name}\0{version}".encode()).hexdigest()[:16]
+        path = OCR_DOWNLOAD_DIR / f"{key}-{Path(file_name).name}"
+        lock = _downloads.setdefault(key, asyncio.Lock())
+        async with lock:
+            if path.exists():
+                path.touch()
+                return path
+
+            OCR_DOWNLOAD_DIR.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{path.name}.part")
+            async with http_client.stream("GET", url) as response:
+                response.raise_for_status()
+                with partial.open("wb") as file:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                        file.write(chunk)
+            partial.replace(path)
+            _evict_downloads()
+            return path
+
+
+class PdfPages:
+    """Rasterises pages of a PDF on demand."""
+
+    def __init__(self, path: Path) -> None:
+        self._document = pdfium.PdfDocument(path)
+        # pdfium is not thread-safe; OCR threads render through this lock.
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._document)
+
+    def render(self, index: int) -> NDArray[np.uint8]:
+        with self._lock:
+            page = self._document[index]
+            try:
+                return page.render(
+                    scale=PDF_RENDER_SCALE, rev_byteorder=True
+                ).to_numpy()
+            finally:
+                page.close()
+
+    def close(self) -> None:
+        self._document.close()
@@ -0,0 +1,126 @@
+"""Process-wide doctr OCR engine.
+
+The detection and recognition models are loaded once per worker process
+instead of once per call. Pages from any number of documents are run
+through the predictor in fixed-size batches on a small thread pool, so
+torch keeps the CPU busy while the event loop stays free for other
+functions.
+"""
+
+import asyncio
+import os
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from queue import Queue
+from typing import Any
+
+import numpy as np
+import torch
+from doctr.io.elements import Page
+from doctr.models import ocr_predictor
+from numpy.typing import NDArray
+
+# Predictor instances, each running one batch at a time on its own thread.
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "1"))
+# Pages per predictor call (and detection batch size).
+OCR_BATCH_PAGES = int(os.getenv("OCR_BATCH_PAGES", "8"))
+# Word crops per recognition batch.
+OCR_RECOGNITION_BATCH = int(os.getenv("OCR_RECOGNITION_BATCH", "256"))
+# Intra-op CPU threads shared by all predictors.
+OCR_TORCH_THREADS = int(os.getenv("OCR_TORCH_THREADS", str(os.cpu_count() or 1)))
+
+_engine: "OcrEngine | None" = None
+
+
+def load_predictor() -> Any:
+    return ocr_predictor(
+        det_arch="db_resnet50",
+        reco_arch="crnn_vgg16_bn",
+        pretrained=True,
+        assume_straight_pages=False,
+        det_bs=OCR_BATCH_PAGES,
+        reco_bs=OCR_RECOGNITION_BATCH,
+    )
+
+
+class OcrEngine:
+    def __init__(self, workers: int, batch_pages: int) -> None:
+        torch.set_num_threads(max(OCR_TORCH_THREADS // workers, 1))
+        self._predictors: Queue[Any] = Queue()
+        for _ in range(workers):
+            self._predictors.put(load_predictor())
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ocr"
+        )
+        self._batch_pages = batch_pages
+
+    def _predict(self, pages: list[NDArray[np.uint8]]) -> list[Page]:
+        predictor = self._predictors.get()
+        try:
+            with torch.inference_mode():
+                return predictor(pages).pages
+        finally:
+            self._predictors.put(predictor)
+
+    async def extract(
+        self,
+        documents: list[list[NDArray[np.uint8]]],
+        on_batch: Callable[[], None] | None = None,
+    ) -> list[list[Page]]:
+        """OCR every page of every document, returning doctr pages.
+
+        Pages of different documents share batches; results are
+        regrouped per document in input order. on_batch, if given, is
+        called on the event loop as each batch finishes.
+        """
+        pages = [page for document in documents for page in document]
+        loop = asyncio.get_running_loop()
+
+        async def predict(batch: list[NDArray[np.uint8]]) -> list[Page]:
+            result = await loop.run_in_executor(self._executor, self._predict, batch)
+            if on_batch is not None:
+                on_batch()
+            return result
+
+        batches = await asyncio.gather(
+            *(
+                predict(pages[start : start + self._batch_pages])
+                for start in range(0, len(pages), self._batch_pages)
+            )
+        )
+        results = iter(page for batch in batches for page in batch)
+        return [[next(results) for _ in document] for document in documents]
+
+    def _render_and_predict(
+        self, render: Callable[[int], NDArray[np.uint8]], indices: range
+    ) -> list[Page]:
+        return self._predict([render(index) for index in indices])
+
+    async def extract_pages(
+        self, render: Callable[[int], NDArray[np.uint8]], pages: range
+    ) -> list[Page]:
+        """OCR the given pages, rendering each only when its batch runs.
+
+        At most one batch of pages per predictor is held in memory.
+        """
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self._executor,
+                    self._render_and_predict,
+                    render,
+                    pages[start : start + self._batch_pages],
+                )
+                for start in range(0, len(pages), self._batch_pages)
+            )
+        )
+        return [page for batch in batches for page in batch]
+
+
+def ocr_engine() -> OcrEngine:
+    """Return the process-wide engine, loading the models on first use."""
+    global _engine  # noqa: PLW0603
+    if _engine is None:
+        _engine = OcrEngine(OCR_WORKERS, OCR_BATCH_PAGES)
+    return _engine
@@ -6,17 +6,31 @@ from watchfiles import run_process
 
 from src.client import client
 from src.functions.openai_chat import openai_chat
-from src.functions.torch_ocr import torch_ocr
+from src.functions.torch_ocr import (
+    pdf_page_count,
+    torch_ocr,
+    torch_ocr_batch,
+    torch_ocr_pages,
+)
+from src.functions.utils.ocr_engine import ocr_engine
 from src.workflows.files import FilesWorkflow
 from src.workflows.pdf import PdfWorkflow
 
 
 async def main():
+    # Load the OCR models before taking work rather than on the first file.
+    ocr_engine()
 
     await asyncio.gather(
       await client.start_service(
           workflows= [PdfWorkflow, FilesWorkflow],
-          functions= [torch_ocr, openai_chat]
+          functions= [
+              pdf_page_count,
+              torch_ocr,
+              torch_ocr_batch,
+              torch_ocr_pages,
+              openai_chat,
+          ]
       )
     )
 
@@ -1,10 +1,24 @@
 import asyncio
+from datetime import timedelta
 
 from pydantic import BaseModel, Field
-from restack_ai.workflow import NonRetryableError, log, workflow, workflow_info
+from restack_ai.workflow import (
+    NonRetryableError,
+    import_functions,
+    log,
+    workflow,
+    workflow_info,
+)
 
-from .pdf import PdfWorkflow, PdfWorkflowInput
+from src.workflows.pdf import PdfWorkflow, PdfWorkflowInput
 
+with import_functions():
+    from src.functions.openai_chat import OpenAiChatInput, openai_chat
+    from src.functions.torch_ocr import OcrBatchInput, OcrInput, torch_ocr_batch
+
+# Images sent to one torch_ocr_batch step. Their pages share OCR batches on
+# the worker, which loads the models once.
+OCR_BATCH_FILES = 8
 
 class FilesWorkflowInput(BaseModel):
     files_upload: list[dict] = Field(files=True)
@@ -13,33 +27,93 @@ class FilesWorkflowInput(BaseModel):
 class FilesWorkflow:
     @workflow.run
     async def run(self, input: FilesWorkflowInput):
-        tasks = []
+        # PDFs are summarised by PdfWorkflow, part by part, so a long PDF is
+        # never OCR'd in one step or summarised in one prompt. Images are
+        # OCR'd in batches.
+        pdfs = [
+            (index, file_upload)
+            for index, file_upload in enumerate(input.files_upload)
+            if file_upload["type"] == "application/pdf"
+        ]
+        images = [
+            (index, OcrInput(file_type=file_upload["type"], file_name=file_upload["name"]))
+            for index, file_upload in enumerate(input.files_upload)
+            if file_upload["type"] != "application/pdf"
+        ]
+        batches = [
+            images[start : start + OCR_BATCH_FILES]
+            for start in range(0, len(images), OCR_BATCH_FILES)
+        ]
+
+        log.info(
+            f"Queue {len(pdfs)} PDFs, and {len(images)} images for OCR in {len(batches)} batches"
+        )
+        # In the order of the files; None, and an entry in errors, for
+        # files that could not be summarised.
+        results: list[str | None] = [None] * len(input.files_upload)
+        errors: dict[str, str] = {}
         parent_workflow_id = workflow_info().workflow_id
 
-        for index, pdf_input in enumerate(input.files_upload, start=1):
-            log.info(f"Queue PdfWorkflow {index} for execution")
-            # Ensure child workflows are started and return an awaitable
+        async def summarise_pdf(index: int, file_upload: dict) -> None:
             try:
-                task = workflow.child_execute(
+                results[index] = await workflow.child_execute(
                     workflow=PdfWorkflow,
                     workflow_id=f"{parent_workflow_id}-pdf-{index}",
-                    input=PdfWorkflowInput(
-                        file_upload=[pdf_input]
-                    )
+                    workflow_input=PdfWorkflowInput(file_upload=[file_upload]),
+                )
+            except Exception as e:  # noqa: BLE001
+                # The child's error wraps the actual failure.
+                error = str(e.__cause__ or e)
+                log.error("PdfWorkflow failed", file_name=file_upload["name"], error=error)
+                errors[file_upload["name"]] = error
+
+        async def summarise_image(index: int, file: OcrInput, ocr_result: str | None) -> None:
+            if ocr_result is None:
+                errors[file.file_name] = "OCR failed"
+            else:
+                results[index] = await self.summarise(ocr_result)
+
+        async def summarise_images(batch: list[tuple[int, OcrInput]]) -> None:
+            try:
+                ocr_results = await workflow.step(
+                    function=torch_ocr_batch,
+                    function_input=OcrBatchInput(files=[file for _, file in batch]),
+                    start_to_close_timeout=timedelta(seconds=120 * len(batch)),
+                    heartbeat_timeout=timedelta(seconds=120),
                 )
             except Exception as e:
-                error_message = f"Failed to execute PdfWorkflow {index}: {e}"
+                error_message = f"torch_ocr_batch function failed: {e}"
                 raise NonRetryableError(error_message) from e
-            else:
-                # Wrap the task in an asyncio.ensure_future to ensure it's awaitable
-                tasks.append(asyncio.ensure_future(task))
+            await asyncio.gather(
+                *(
+                    summarise_image(index, file, ocr_result)
+                    for (index, file), ocr_result in zip(batch, ocr_results, strict=True)
+                )
+            )
 
-        # Await all tasks at once to run them in parallel
-        results = await asyncio.gather(*tasks)
+        await asyncio.gather(
+            *(summarise_pdf(index, file_upload) for index, file_upload in pdfs),
+            *(summarise_images(batch) for batch in batches),
+        )
 
         for i, result in enumerate(results, start=1):
-            log.info(f"PdfWorkflow {i} completed", result=result)
+            log.info(f"File {i} summarised", result=result)
 
         return {
-            "results": results
+            "results": results,
+            "errors": errors,
         }
+
+    async def summarise(self, ocr_result: str) -> str:
+        try:
+            return await workflow.step(
+                function=openai_chat,
+                function_input=OpenAiChatInput(
+                    user_content=f"Make a summary of that PDF. Here is the OCR result: {ocr_result}",
+                    model="gpt-4.1-mini"
+                ),
+                start_to_close_timeout=timedelta(seconds=120)
+            )
+        except Exception as e:
+            error_message = f"openai_chat function failed: {e}"
+            raise NonRetryableError(error_message) from e
@@ -1,3 +1,4 @@
+import asyncio
 from datetime import timedelta
 
 from pydantic import BaseModel, Field
@@ -5,7 +6,18 @@ from restack_ai.workflow import NonRetryableError, import_functions, log, workfl
 
 with import_functions():
     from src.functions.openai_chat import OpenAiChatInput, openai_chat
-    from src.functions.torch_ocr import OcrInput, torch_ocr
+    from src.functions.torch_ocr import (
+        OcrInput,
+        OcrPagesInput,
+        PdfPagesInput,
+        pdf_page_count,
+        torch_ocr,
+        torch_ocr_pages,
+    )
+
+# Pages OCR'd and summarised per step. Each part is summarised as soon as
+# its OCR finishes, while later parts are still being OCR'd.
+PAGES_PER_PART = 8
 
 class PdfWorkflowInput(BaseModel):
     file_upload: list[dict] = Field(files=True)
@@ -15,32 +27,97 @@ class PdfWorkflow:
     @workflow.run
     async def run(self, input: PdfWorkflowInput):
         log.info("PdfWorkflow started")
+        file_type = input.file_upload[0]["type"]
+        file_name = input.file_upload[0]["name"]
+
+        if file_type != "application/pdf":
+            try:
+                ocr_result = await workflow.step(
+                    function=torch_ocr,
+                    function_input=OcrInput(file_type=file_type, file_name=file_name),
+                    start_to_close_timeout=timedelta(seconds=120)
+                )
+            except Exception as e:
+                error_message = f"torch_ocr function failed: {e}"
+                raise NonRetryableError(error_message) from e
+            llm_result = await self.summarise(
+                f"Make a summary of that PDF. Here is the OCR result: {ocr_result}"
+            )
+            log.info("PdfWorkflow completed")
+            return llm_result
+
+        try:
+            page_count = await workflow.step(
+                function=pdf_page_count,
+                function_input=PdfPagesInput(file_name=file_name),
+                start_to_close_timeout=timedelta(seconds=120)
+            )
+        except Exception as e:
+            error_message = f"pdf_page_count function failed: {e}"
+            raise NonRetryableError(error_message) from e
+        if page_count == 0:
+            error_message = f"{file_name} has no pages to summarise"
+            raise NonRetryableError(error_message)
+
+        parts = [
+            (first_page, min(first_page + PAGES_PER_PART, page_count))
+            for first_page in range(0, page_count, PAGES_PER_PART)
+        ]
+        summaries = await asyncio.gather(
+            *(
+                self.summarise_part(file_name, first_page, last_page, len(parts))
+                for first_page, last_page in parts
+            )
+        )
+
+        if len(summaries) == 1:
+            llm_result = summaries[0]
+        else:
+            joined = "\n\n".join(
+                f"Pages {first_page + 1}-{last_page}: {summary}"
+                for (first_page, last_page), summary in zip(parts, summaries, strict=True)
+            )
+            llm_result = await self.summarise(
+                f"Here are summaries of consecutive parts of a PDF. Combine them into one summary of the whole PDF.\n\n{joined}"
+            )
+        log.info("PdfWorkflow completed")
+        return llm_result
+
+    async def summarise_part(
+        self, file_name: str, first_page: int, last_page: int, part_count: int
+    ) -> str:
         try:
             ocr_result = await workflow.step(
-                function=torch_ocr,
-                function_input=OcrInput(
-                    file_type=input.file_upload[0]["type"],
-                    file_name=input.file_upload[0]["name"]
+                function=torch_ocr_pages,
+                function_input=OcrPagesInput(
+                    file_name=file_name,
+                    first_page=first_page,
+                    last_page=last_page
                 ),
                 start_to_close_timeout=timedelta(seconds=120)
             )
         except Exception as e:
-            error_message = f"torch_ocr function failed: {e}"
+            error_message = f"torch_ocr_pages function failed: {e}"
             raise NonRetryableError(error_message) from e
+
+        if part_count == 1:
+            prompt = f"Make a summary of that PDF. Here is the OCR result: {ocr_result}"
         else:
+            prompt = f"Make a summary of pages {first_page + 1}-{last_page} of a PDF. Here is the OCR result: {ocr_result}"
+        summary = await self.summarise(prompt)
+        log.info(f"Pages {first_page + 1}-{last_page} summarised")
+        return summary
 
-            try:
-                llm_result = await workflow.step(
-                    function=openai_chat,
-                    function_input=OpenAiChatInput(
-                        user_content=f"Make a summary of that PDF. Here is the OCR result: {ocr_result}",
-                        model="gpt-4.1-mini"
-                    ),
-                    start_to_close_timeout=timedelta(seconds=120)
-                )
-            except Exception as e:
-                error_message = f"openai_chat function failed: {e}"
-                raise NonRetryableError(error_message) from e
-            else:
-                log.info("PdfWorkflow completed")
-                return llm_result
+    async def summarise(self, user_content: str) -> str:
+        try:
+            return await workflow.step(
+                function=openai_chat,
+                function_input=OpenAiChatInput(
+                    user_content=user_content,
+                    model="gpt-4.1-mini"
+                ),
+                start_to_close_timeout=timedelta(seconds=120)
+            )
+        except Exception as e:
+            error_message = f"openai_chat function failed: {e}"
+            raise NonRetryableError(error_message) from e
@@ -3,6 +3,8 @@ from openai import OpenAI
 
 from pydantic import BaseModel
 
+from src.functions.utils.response_cache import response_cache
+
 class GenerateInput(BaseModel):
     prompt: str
 
@@ -15,20 +17,30 @@ async def llm_generate(input: GenerateInput) -> str:
         log.error(f"Failed to create LLM client {e}")
         raise FunctionFailure(f"Failed to create OpenAI client {e}", non_retryable=True) from e
 
+    request = {
+        "model": "llama-3.2-3b-instruct",
+        "messages": [
+            {
+                "role": "user",
+                "content": input.prompt
+            }
+        ],
+        "temperature": 0.5,
+    }
+
+    cache = response_cache()
+    if cache and (content := cache.lookup(request)) is not None:
+        log.info("llm_generate cache hit", cache_stats=cache.stats())
+        return content
+
     try:
-        response = client.chat.completions.create(
-            model="llama-3.2-3b-instruct",
-            messages=[
-                {
-                    "role": "user",
-                    "content": input.prompt
-                }
-            ],
-            temperature=0.5,
-        )
+        response = client.chat.completions.create(**request)
     
     except Exception as e:
         log.error(f"Failed to generate {e}")
     
-    return response.choices[0].message.content
+    content = response.choices[0].message.content
+    if cache:
+        cache.store(request, content)
+    return content
 
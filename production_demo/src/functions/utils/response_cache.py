@@ -0,0 +1,289 @@
+"""Response cache for chat completions.
+
+A request is looked up by the hash of its normalised form first, then,
+if its last message is short, by similarity of that message to earlier
+requests that share the same model, parameters and preceding messages.
+Longer messages, such as documents, only match exactly: two documents
+that differ in a few numbers or names are near identical by similarity
+but need different answers.
+
+Entries are kept in an in-process LRU backed by a local SQLite file,
+expire after a TTL, and the least recently used ones are evicted once a
+tier is full.
+
+The cache is off unless LLM_CACHE_ENABLED is set: with a non-zero
+temperature a cached answer is not what the model would say this time.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "86400"))
+LLM_CACHE_MEMORY_SIZE = int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "100000"))
+# Cosine similarity above which a cached answer is reused; 1 disables
+# similarity lookups and only exact (normalised) matches are served.
+LLM_CACHE_SIMILARITY = float(os.getenv("LLM_CACHE_SIMILARITY", "0.95"))
+# Longest last message, in characters, looked up by similarity.
+LLM_CACHE_SIMILARITY_MAX_CHARS = int(
+    os.getenv("LLM_CACHE_SIMILARITY_MAX_CHARS", "256")
+)
+# Most recently used entries of a scope compared on an exact miss.
+LLM_CACHE_SIMILARITY_CANDIDATES = int(
+    os.getenv("LLM_CACHE_SIMILARITY_CANDIDATES", "256")
+)
+
+EMBEDDING_BUCKETS = 1 << 12
+
+_WHITESPACE = re.compile(r"\s+")
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+_cache: "ResponseCache | None" = None
+
+
+def normalise(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def _digest(value: Any) -> str:
+    body = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def embed(text: str) -> dict[int, float]:
+    """Sparse hashed word and character-trigram vector of text."""
+    vector: dict[int, float] = {}
+    for token in _TOKEN_PATTERN.findall(text.casefold()):
+        bucket = zlib.crc32(token.encode()) % EMBEDDING_BUCKETS
+        vector[bucket] = vector.get(bucket, 0.0) + 1.0
+        padded = f"#{token}#"
+        for start in range(len(padded) - 2):
+            trigram = padded[start : start + 3]
+            bucket = zlib.crc32(trigram.encode()) % EMBEDDING_BUCKETS
+            vector[bucket] = vector.get(bucket, 0.0) + 0.5
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {bucket: weight / norm for bucket, weight in vector.items()} if norm else {}
+
+
+def similarity(left: dict[int, float], right: dict[int, float]) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(bucket, 0.0) for bucket, weight in left.items())
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str,
+        ttl: float,
+        memory_size: int,
+        max_entries: int,
+        threshold: float,
+        candidates: int,
+        max_similar_chars: int,
+    ) -> None:
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, scope TEXT NOT NULL, embedding TEXT NOT NULL, "
+            "response TEXT NOT NULL, expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS responses_scope "
+            "ON responses (scope, accessed_at)"
+        )
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._ttl = ttl
+        self._memory_size = memory_size
+        self._max_entries = max_entries
+        self._threshold = threshold
+        self._candidates = candidates
+        self._max_similar_chars = max_similar_chars
+        self._lock = threading.Lock()
+        self._entries = self._connection.execute(
+            "SELECT COUNT(*) FROM responses"
+        ).fetchone()[0]
+        self.counters: Counter[str] = Counter()
+
+    @staticmethod
+    def _keys(request: dict[str, Any]) -> tuple[str, str, str]:
+        """Return (key, scope, last message text) for a request."""
+        messages = [
+            {**message, "content": normalise(message.get("content") or "")}
+            for message in request.get("messages") or []
+        ]
+        last = messages.pop() if messages else {"role": "user", "content": ""}
+        params = {name: value for name, value in request.items() if name != "messages"}
+        scope = _digest(
+            {
+                "params": params,
+                "messages": messages,
+                "last": {**last, "content": None},
+            }
+        )
+        return _digest([scope, last["content"]]), scope, last["content"]
+
+    def _similar_lookups(self, text: str) -> bool:
+        return self._threshold < 1 and len(text) <= self._max_similar_chars
+
+    def _remember(self, key: str, expires_at: float, response: str) -> None:
+        self._memory[key] = (expires_at, response)
+        self._memory.move_to_end(key)
+        if len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def lookup(self, request: dict[str, Any]) -> Any | None:
+        """Return the cached response for request, or None on a miss."""
+        key, scope, text = self._keys(request)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return json.loads(entry[1])
+            if entry is not None:
+                del self._memory[key]
+
+            row = self._connection.execute(
+                "SELECT expires_at, response FROM responses "
+                "WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            kind, stored_key = "disk_hits", key
+            if row is None and self._similar_lookups(text):
+                row, stored_key = self._similar(scope, text, now)
+                kind = "similar_hits"
+            if row is None:
+                self.counters["misses"] += 1
+                return None
+
+            expires_at, response = row
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?",
+                (now, stored_key),
+            )
+            # Keyed by this request so a repeat of a near match is an
+            # in-process hit too.
+            self._remember(key, expires_at, response)
+            self.counters[kind] += 1
+            return json.loads(response)
+
+    def _similar(
+        self, scope: str, text: str, now: float
+    ) -> tuple[tuple[float, str] | None, str]:
+        query = embed(text)
+        if not query:
+            return None, ""
+        rows = self._connection.execute(
+            "SELECT key, embedding, expires_at, response FROM responses "
+            "WHERE scope = ? AND expires_at > ? "
+            "ORDER BY accessed_at DESC LIMIT ?",
+            (scope, now, self._candidates),
+        ).fetchall()
+        best, best_score = None, self._threshold
+        for key, embedding, expires_at, response in rows:
+            vector = {int(bucket): weight for bucket, weight in json.loads(embedding).items()}
+            score = similarity(query, vector)
+            if score >= best_score:
+                best, best_score = (key, expires_at, response), score
+        if best is None:
+            return None, ""
+        key, expires_at, response = best
+        return (expires_at, response), key
+
+    def store(self, request: dict[str, Any], response: Any) -> None:
+        key, scope, text = self._keys(request)
+        now = time.time()
+        expires_at = now + self._ttl
+        body = json.dumps(response)
+        # Entries that are never compared by similarity need no embedding.
+        embedding = embed(text) if self._similar_lookups(text) else {}
+        with self._lock:
+            self._remember(key, expires_at, body)
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO responses "
+                "(key, scope, embedding, response, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, scope, json.dumps(embedding), body, expires_at, now),
+            )
+            if cursor.rowcount:
+                self._entries += 1
+            else:
+                self._connection.execute(
+                    "UPDATE responses SET response = ?, expires_at = ?, "
+                    "accessed_at = ? WHERE key = ?",
+                    (body, expires_at, now, key),
+                )
+            self.counters["stores"] += 1
+            if self._entries > self._max_entries:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the least recently used tenth."""
+        with self._connection:
+            self._connection.execute("BEGIN")
+            expired = self._connection.execute(
+                "DELETE FROM responses WHERE expires_at <= ?", (now,)
+            ).rowcount
+            self._entries -= expired
+            excess = self._entries - self._max_entries
+            evicted = 0
+            if excess > 0:
+                evicted = self._connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM "
+                    "responses ORDER BY accessed_at LIMIT ?)",
+                    (excess + self._max_entries // 10,),
+                ).rowcount
+                self._entries -= evicted
+        self.counters["expired"] += expired
+        self.counters["evictions"] += evicted
+
+    def stats(self) -> dict[str, Any]:
+        hits = sum(
+            self.counters[kind]
+            for kind in ("memory_hits", "disk_hits", "similar_hits")
+        )
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "entries": self._entries,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+def response_cache() -> ResponseCache | None:
+    """Return the process-wide cache, or None when it is disabled."""
+    global _cache  # noqa: PLW0603
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ResponseCache(
+            LLM_CACHE_PATH,
+            LLM_CACHE_TTL,
+            LLM_CACHE_MEMORY_SIZE,
+            LLM_CACHE_MAX_ENTRIES,
+            LLM_CACHE_SIMILARITY,
+            LLM_CACHE_SIMILARITY_CANDIDATES,
+            LLM_CACHE_SIMILARITY_MAX_CHARS,
+        )
+    return _cache
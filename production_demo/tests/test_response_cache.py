@@ -0,0 +1,43 @@
+from src.functions.utils.response_cache import ResponseCache
+
+INVOICE = (
+    "Make a summary of that PDF. Here is the OCR result: "
+    "Invoice {number}\nBill to: Acme Corp, 12 Main Street, Springfield\n"
+    "Date: {date}\n"
+    + "Item: consulting services, 10 hours at the agreed rate\n" * 8
+    + "Total: {amount} {currency}\n"
+)
+
+
+def make_cache(tmp_path) -> ResponseCache:
+    return ResponseCache(
+        str(tmp_path / "cache.sqlite3"),
+        ttl=60,
+        memory_size=16,
+        max_entries=100,
+        threshold=0.95,
+        candidates=16,
+        max_similar_chars=256,
+    )
+
+
+def request(content: str) -> dict:
+    return {"model": "gpt-4.1-mini", "messages": [{"role": "user", "content": content}]}
+
+
+def test_near_duplicate_documents_miss(tmp_path):
+    cache = make_cache(tmp_path)
+    first = INVOICE.format(number="INV-1001", date="2024-03-01", amount="1200.00", currency="USD")
+    second = INVOICE.format(number="INV-1002", date="2024-04-01", amount="1350.00", currency="EUR")
+    cache.store(request(first), "summary of INV-1001")
+
+    assert cache.lookup(request(second)) is None
+    assert cache.lookup(request(first)) == "summary of INV-1001"
+
+
+def test_short_prompts_match_by_similarity(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store(request("What is the capital of France?"), "Paris")
+
+    assert cache.lookup(request("what is the capital of france")) == "Paris"
+    assert cache.counters["similar_hits"] == 1